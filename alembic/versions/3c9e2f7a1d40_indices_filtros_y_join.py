@@ -0,0 +1,41 @@
+"""indices para filtros, JOIN y GROUP BY
+
+Revision ID: 3c9e2f7a1d40
+Revises: b721b9fa881f
+Create Date: 2026-10-18 10:05:12.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e2f7a1d40'
+down_revision: Union[str, Sequence[str], None] = 'b721b9fa881f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index('ix_usuarios_nombre', ['nombre'], unique=False)
+
+    with op.batch_alter_table('incidencias', schema=None) as batch_op:
+        batch_op.create_index('ix_incidencias_usuario_id', ['usuario_id'], unique=False)
+        batch_op.create_index('ix_incidencias_prioridad', ['prioridad'], unique=False)
+        batch_op.create_index('ix_incidencias_usuario_prioridad_id',
+                              ['usuario_id', 'prioridad', sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('incidencias', schema=None) as batch_op:
+        batch_op.drop_index('ix_incidencias_usuario_prioridad_id')
+        batch_op.drop_index('ix_incidencias_prioridad')
+        batch_op.drop_index('ix_incidencias_usuario_id')
+
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index('ix_usuarios_nombre')
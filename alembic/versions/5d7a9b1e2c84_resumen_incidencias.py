@@ -0,0 +1,72 @@
+"""contadores precalculados por usuario y prioridad
+
+Revision ID: 5d7a9b1e2c84
+Revises: 8f41c2d9e6b3
+Create Date: 2026-10-18 14:02:09.551370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7a9b1e2c84'
+down_revision: Union[str, Sequence[str], None] = '8f41c2d9e6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resumen_incidencias',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('prioridad', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('usuario_id', 'prioridad')
+    )
+    with op.batch_alter_table('resumen_incidencias', schema=None) as batch_op:
+        batch_op.create_index('ix_resumen_prioridad', ['prioridad', 'total'], unique=False)
+
+    # Los contadores se mantienen en la misma transacción que cada escritura,
+    # venga de crud.py, de la importación masiva o de otra instancia.
+    op.execute("""
+        CREATE TRIGGER resumen_incidencias_ai AFTER INSERT ON incidencias BEGIN
+            INSERT INTO resumen_incidencias(usuario_id, prioridad, total)
+            VALUES (new.usuario_id, new.prioridad, 1)
+            ON CONFLICT(usuario_id, prioridad) DO UPDATE SET total = total + 1;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER resumen_incidencias_ad AFTER DELETE ON incidencias BEGIN
+            UPDATE resumen_incidencias SET total = total - 1
+            WHERE usuario_id = old.usuario_id AND prioridad = old.prioridad;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER resumen_incidencias_au AFTER UPDATE OF usuario_id, prioridad ON incidencias
+        WHEN old.usuario_id IS NOT new.usuario_id OR old.prioridad IS NOT new.prioridad BEGIN
+            UPDATE resumen_incidencias SET total = total - 1
+            WHERE usuario_id = old.usuario_id AND prioridad = old.prioridad;
+            INSERT INTO resumen_incidencias(usuario_id, prioridad, total)
+            VALUES (new.usuario_id, new.prioridad, 1)
+            ON CONFLICT(usuario_id, prioridad) DO UPDATE SET total = total + 1;
+        END
+    """)
+    op.execute("""
+        INSERT INTO resumen_incidencias(usuario_id, prioridad, total)
+        SELECT usuario_id, prioridad, COUNT(*) FROM incidencias GROUP BY usuario_id, prioridad
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS resumen_incidencias_au")
+    op.execute("DROP TRIGGER IF EXISTS resumen_incidencias_ad")
+    op.execute("DROP TRIGGER IF EXISTS resumen_incidencias_ai")
+    with op.batch_alter_table('resumen_incidencias', schema=None) as batch_op:
+        batch_op.drop_index('ix_resumen_prioridad')
+
+    op.drop_table('resumen_incidencias')
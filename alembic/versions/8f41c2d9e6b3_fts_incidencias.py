@@ -0,0 +1,59 @@
+"""busqueda de texto completo (FTS5) sobre titulo y descripcion
+
+Revision ID: 8f41c2d9e6b3
+Revises: 3c9e2f7a1d40
+Create Date: 2026-10-18 12:31:47.918422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41c2d9e6b3'
+down_revision: Union[str, Sequence[str], None] = '3c9e2f7a1d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice externo (content=incidencias): el texto no se duplica, sólo el índice.
+    # prefix='2 3' acelera las búsquedas por prefijo ("impre*").
+    op.execute("""
+        CREATE VIRTUAL TABLE incidencias_fts USING fts5(
+            titulo, descripcion,
+            content='incidencias', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER incidencias_fts_ai AFTER INSERT ON incidencias BEGIN
+            INSERT INTO incidencias_fts(rowid, titulo, descripcion)
+            VALUES (new.id, new.titulo, new.descripcion);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER incidencias_fts_ad AFTER DELETE ON incidencias BEGIN
+            INSERT INTO incidencias_fts(incidencias_fts, rowid, titulo, descripcion)
+            VALUES ('delete', old.id, old.titulo, old.descripcion);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER incidencias_fts_au AFTER UPDATE OF titulo, descripcion ON incidencias BEGIN
+            INSERT INTO incidencias_fts(incidencias_fts, rowid, titulo, descripcion)
+            VALUES ('delete', old.id, old.titulo, old.descripcion);
+            INSERT INTO incidencias_fts(rowid, titulo, descripcion)
+            VALUES (new.id, new.titulo, new.descripcion);
+        END
+    """)
+    op.execute("INSERT INTO incidencias_fts(incidencias_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS incidencias_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS incidencias_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS incidencias_fts_ai")
+    op.execute("DROP TABLE IF EXISTS incidencias_fts")
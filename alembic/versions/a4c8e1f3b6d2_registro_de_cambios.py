@@ -0,0 +1,60 @@
+"""registro de cambios para otras instancias
+
+Revision ID: a4c8e1f3b6d2
+Revises: 5d7a9b1e2c84
+Create Date: 2026-10-18 16:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e1f3b6d2'
+down_revision: Union[str, Sequence[str], None] = '5d7a9b1e2c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, columnas cuya edición se anota en UPDATE)
+TABLAS = (
+    ("usuarios", "nombre, email"),
+    ("incidencias", "titulo, prioridad, usuario_id"),   # lo que muestra el listado
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cambios',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('tabla', sa.String(length=20), nullable=False),
+    sa.Column('fila_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('cambios', schema=None) as batch_op:
+        batch_op.create_index('ux_cambios_tabla_fila', ['tabla', 'fila_id'], unique=True)
+
+    # Una fila por registro tocado: REPLACE borra la anotación previa y la vuelve
+    # a insertar con un seq nuevo. Quien lee sólo necesita el id; si ya no existe
+    # en su tabla, fue borrado.
+    for tabla, columnas in TABLAS:
+        for evento, sufijo, fila in (("INSERT", "ai", "new"), (f"UPDATE OF {columnas}", "au", "new"),
+                                     ("DELETE", "ad", "old")):
+            op.execute(f"""
+                CREATE TRIGGER cambios_{tabla}_{sufijo} AFTER {evento} ON {tabla} BEGIN
+                    INSERT OR REPLACE INTO cambios(tabla, fila_id) VALUES ('{tabla}', {fila}.id);
+                END
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla, _ in TABLAS:
+        for sufijo in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS cambios_{tabla}_{sufijo}")
+    with op.batch_alter_table('cambios', schema=None) as batch_op:
+        batch_op.drop_index('ux_cambios_tabla_fila')
+
+    op.drop_table('cambios')
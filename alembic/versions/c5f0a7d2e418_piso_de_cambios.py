@@ -0,0 +1,34 @@
+"""piso del registro de cambios (poda)
+
+Revision ID: c5f0a7d2e418
+Revises: e93b5d0c7f21
+Create Date: 2026-10-18 21:12:33.470915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f0a7d2e418'
+down_revision: Union[str, Sequence[str], None] = 'e93b5d0c7f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Una sola fila: hasta qué seq se podó `cambios` (crud.podar_cambios)
+    op.create_table('cambios_piso',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO cambios_piso(id, seq) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cambios_piso')
@@ -0,0 +1,72 @@
+"""estado, fechas de creación/cierre y tabla de archivo
+
+Revision ID: e93b5d0c7f21
+Revises: a4c8e1f3b6d2
+Create Date: 2026-10-18 18:05:47.902613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b5d0c7f21'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e1f3b6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _trigger_cambios(columnas: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS cambios_incidencias_au")
+    op.execute(f"""
+        CREATE TRIGGER cambios_incidencias_au AFTER UPDATE OF {columnas} ON incidencias BEGIN
+            INSERT OR REPLACE INTO cambios(tabla, fila_id) VALUES ('incidencias', new.id);
+        END
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ADD COLUMN simple (sin batch): recrear la tabla borraría los triggers de
+    # FTS, resumen y cambios. SQLite no admite CURRENT_TIMESTAMP como default en
+    # ADD COLUMN: creado_en lo pone el modelo al insertar y aquí se rellena.
+    op.add_column('incidencias', sa.Column('estado', sa.String(length=20), server_default='Abierta', nullable=False))
+    op.add_column('incidencias', sa.Column('creado_en', sa.DateTime(), nullable=True))
+    op.add_column('incidencias', sa.Column('cerrado_en', sa.DateTime(), nullable=True))
+    op.execute("UPDATE incidencias SET creado_en = CURRENT_TIMESTAMP WHERE creado_en IS NULL")
+    op.create_index('ix_incidencias_estado_cerrado_en', 'incidencias', ['estado', 'cerrado_en'], unique=False)
+
+    op.create_table('incidencias_archivo',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('titulo', sa.String(length=150), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('prioridad', sa.String(length=20), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('creado_en', sa.DateTime(), nullable=True),
+    sa.Column('cerrado_en', sa.DateTime(), nullable=True),
+    sa.Column('archivado_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('incidencias_archivo', schema=None) as batch_op:
+        batch_op.create_index('ix_incidencias_archivo_usuario_id', ['usuario_id', sa.text('id DESC')], unique=False)
+
+    # el estado se muestra en el listado: otras instancias deben enterarse
+    _trigger_cambios("titulo, prioridad, estado, usuario_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _trigger_cambios("titulo, prioridad, usuario_id")
+    with op.batch_alter_table('incidencias_archivo', schema=None) as batch_op:
+        batch_op.drop_index('ix_incidencias_archivo_usuario_id')
+
+    op.drop_table('incidencias_archivo')
+    # DROP COLUMN (SQLite >= 3.35) tampoco recrea la tabla
+    op.drop_index('ix_incidencias_estado_cerrado_en', table_name='incidencias')
+    op.drop_column('incidencias', 'cerrado_en')
+    op.drop_column('incidencias', 'creado_en')
+    op.drop_column('incidencias', 'estado')
@@ -0,0 +1,66 @@
+"""incidencias con AUTOINCREMENT: ids que no se reutilizan
+
+Revision ID: f2b8d4a6c913
+Revises: c5f0a7d2e418
+Create Date: 2026-10-18 22:04:51.208377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4a6c913'
+down_revision: Union[str, Sequence[str], None] = 'c5f0a7d2e418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = "id, titulo, descripcion, prioridad, usuario_id, estado, creado_en, cerrado_en"
+
+
+def _reconstruir(autoincremento: bool) -> None:
+    # SQLite no agrega AUTOINCREMENT con ALTER: se recrea la tabla. Sus índices y
+    # triggers (FTS, resumen, cambios) se leen de sqlite_master y se vuelven a
+    # crear tal cual; incidencias_fts es de contenido externo y sólo la nombra.
+    objetos = [sql for (sql,) in op.get_bind().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'incidencias' "
+        "AND type IN ('index', 'trigger') AND sql IS NOT NULL")]
+    op.create_table('incidencias_nueva',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=150), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=False),
+    sa.Column('prioridad', sa.String(length=20), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('estado', sa.String(length=20), server_default='Abierta', nullable=False),
+    sa.Column('creado_en', sa.DateTime(), nullable=True),
+    sa.Column('cerrado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=autoincremento
+    )
+    op.execute(f"INSERT INTO incidencias_nueva({COLUMNAS}) SELECT {COLUMNAS} FROM incidencias")
+    op.execute("DROP TABLE incidencias")
+    op.execute("ALTER TABLE incidencias_nueva RENAME TO incidencias")
+    for sql in objetos:
+        op.execute(sql)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sin AUTOINCREMENT, borrar la incidencia de id máximo (o archivarla) hacía que
+    # la siguiente reutilizara su id y chocara con incidencias_archivo. El
+    # contador arranca sobre el mayor id de ambas tablas.
+    _reconstruir(True)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'incidencias'")
+    op.execute("""
+        INSERT INTO sqlite_sequence(name, seq)
+        SELECT 'incidencias', MAX((SELECT COALESCE(MAX(id), 0) FROM incidencias),
+                                  (SELECT COALESCE(MAX(id), 0) FROM incidencias_archivo))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _reconstruir(False)
@@ -0,0 +1,69 @@
+# Archivado de incidencias cerradas: las que llevan más de DIAS cerradas pasan
+# de `incidencias` a `incidencias_archivo`, por lotes de LOTE en transacciones
+# cortas (la app sigue usando la BD entre lote y lote). Así la tabla caliente,
+# sus índices, el FTS y los contadores de resumen sólo cargan el trabajo vigente;
+# los listados de crud leen el archivo sólo con archivo=True.
+#
+#   python archivo.py                   # cerradas hace más de 90 días
+#   python archivo.py --dias 30 --lote 500
+import argparse
+import sys
+
+from sqlalchemy import delete, func, insert, select
+from crud import podar_cambios
+from db import SessionLocal
+from models import Incidencia, IncidenciaArchivada, CERRADA
+
+DIAS = 90
+LOTE = 1000
+
+# columnas que se copian tal cual (archivado_en la pone el default del modelo)
+COLUMNAS = ("id", "titulo", "descripcion", "prioridad", "estado", "usuario_id", "creado_en", "cerrado_en")
+
+def _select_candidatas(dias):
+    # Por ix_incidencias_estado_cerrado_en. `incidencias` es AUTOINCREMENT: un id
+    # archivado no se vuelve a asignar.
+    return select(Incidencia.id).where(
+        Incidencia.estado == CERRADA,
+        Incidencia.cerrado_en < func.datetime("now", f"-{int(dias)} days"),
+    )
+
+def pendientes(dias: int = DIAS) -> int:
+    with SessionLocal() as s:
+        return s.scalar(select(func.count()).select_from(_select_candidatas(dias).subquery()))
+
+def archivar(dias: int = DIAS, lote: int = LOTE, on_progreso=None) -> int:
+    # Devuelve cuántas se archivaron; on_progreso(hechas, total) tras cada lote
+    total = pendientes(dias); hechas = 0
+    while True:
+        with SessionLocal() as s, s.begin():
+            ids = s.scalars(_select_candidatas(dias).order_by(Incidencia.cerrado_en).limit(lote)).all()
+            if not ids: break
+            cols = [getattr(Incidencia, c) for c in COLUMNAS]
+            s.execute(insert(IncidenciaArchivada).from_select(COLUMNAS, select(*cols).where(Incidencia.id.in_(ids))))
+            # los triggers sacan cada una del FTS y de resumen_incidencias, y la anotan en `cambios`
+            s.execute(delete(Incidencia).where(Incidencia.id.in_(ids)))
+        hechas += len(ids)
+        if on_progreso: on_progreso(hechas, max(total, hechas))
+    podar_cambios()     # cada archivada dejó su anotación en `cambios`
+    return hechas
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Mueve las incidencias cerradas antiguas a incidencias_archivo.")
+    ap.add_argument("--dias", type=int, default=DIAS, help="días desde el cierre (por defecto %(default)s)")
+    ap.add_argument("--lote", type=int, default=LOTE)
+    ap.add_argument("--simular", action="store_true", help="sólo cuenta las candidatas")
+    args = ap.parse_args(argv)
+    if args.simular:
+        print(f"{pendientes(args.dias)} incidencias para archivar.")
+        return 0
+
+    def progreso(hechas, total):
+        print(f"\r{hechas}/{total} archivadas", end="", file=sys.stderr, flush=True)
+
+    n = archivar(args.dias, args.lote, progreso)
+    print(f"\n{n} incidencias archivadas.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
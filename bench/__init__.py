@@ -0,0 +1,5 @@
+# Benchmarks reproducibles de crud.py y de la recarga de los Treeview.
+#
+#   python -m bench correr --incidencias 1000 10000 100000 -o base.json
+#   python -m bench comparar base.json nuevo.json
+#   python -m bench arranque --incidencias 100000
@@ -0,0 +1,150 @@
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy
+
+from db import SessionLocal, engine as engine_app
+from bench.generador import generar
+from bench.medicion import medir_crud
+from bench.treeview import medir_treeview
+from bench.indice import medir_indice
+from bench.concurrencia import medir_concurrencia
+from bench.arranque import medir_arranque
+
+# Diferencias menores a esto (ms) se consideran ruido aunque el % sea grande
+PISO_RUIDO_MS = 0.05
+
+def _meta(semilla):
+    return {"fecha": datetime.now().isoformat(timespec="seconds"), "semilla": semilla,
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__, "plataforma": platform.platform()}
+
+def correr(tamanos, usuarios=None, repeticiones=20, semilla=42, filtro=None):
+    resultados = []
+    try:
+        for n in tamanos:
+            nu = usuarios or max(10, n // 100)
+            with tempfile.TemporaryDirectory() as tmp:
+                t0 = time.perf_counter()
+                engine = generar(Path(tmp) / "bench.db", nu, n, semilla)
+                print(f"[{n} incidencias / {nu} usuarios] generado en {time.perf_counter() - t0:.1f}s",
+                      file=sys.stderr)
+                SessionLocal.configure(bind=engine)
+                filas = medir_crud(engine, nu, n, repeticiones, semilla, filtro)
+                if not filtro or filtro.startswith("treeview"):
+                    filas += medir_treeview(max(1, repeticiones // 4))
+                if not filtro or filtro.startswith("indice"):
+                    filas += medir_indice(max(1, repeticiones // 4))
+                resultados += [{"incidencias": n, "usuarios": nu, **f} for f in filas]
+                engine.dispose()
+    finally:
+        SessionLocal.configure(bind=engine_app)
+    return {"meta": _meta(semilla), "resultados": resultados}
+
+def concurrencia(n, usuarios=None, niveles=(1, 8, 32, 64), peticiones=2000, semilla=42):
+    nu = usuarios or max(10, n // 100)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = Path(tmp) / "bench.db"
+            generar(ruta, nu, n, semilla).dispose()
+            filas = medir_concurrencia(ruta, nu, n, niveles, peticiones, semilla)
+    finally:
+        SessionLocal.configure(bind=engine_app)
+    return {"meta": _meta(semilla), "resultados": [{"incidencias": n, "usuarios": nu, **f} for f in filas]}
+
+def arranque(n, usuarios=None, repeticiones=10, semilla=42):
+    nu = usuarios or max(10, n // 100)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        generar(ruta, nu, n, semilla).dispose()
+        filas = medir_arranque(ruta, repeticiones)
+    return {"meta": _meta(semilla), "resultados": [{"incidencias": n, "usuarios": nu, **f} for f in filas]}
+
+def _indexar(datos):
+    return {(r["funcion"], r["incidencias"]): r for r in datos["resultados"]}
+
+def comparar(base, nuevo, umbral=0.2):
+    # Devuelve (filas de la tabla, regresiones); una regresión es una mediana que
+    # crece más del umbral, o más sentencias SQL / llamadas Tk por operación
+    a, b = _indexar(base), _indexar(nuevo)
+    filas = []; regresiones = []
+    for clave in sorted(a.keys() & b.keys(), key=lambda k: (k[1], k[0])):
+        ra, rb = a[clave], b[clave]
+        ma, mb = ra["mediana_ms"], rb["mediana_ms"]
+        cambio = (mb - ma) / ma if ma else 0.0
+        peor = cambio > umbral and mb - ma > PISO_RUIDO_MS
+        for campo in ("sentencias", "llamadas_tk"):
+            if campo in ra and campo in rb and rb[campo] > ra[campo]:
+                peor = True
+        if "bytes_por_fila" in ra and "bytes_por_fila" in rb and rb["bytes_por_fila"] > ra["bytes_por_fila"] * (1 + umbral):
+            peor = True
+        filas.append((clave, ma, mb, cambio, peor))
+        if peor: regresiones.append(clave)
+    return filas, regresiones
+
+def _imprimir(datos):
+    for r in datos["resultados"]:
+        extra = (f"sql={r['sentencias']:g}" if "sentencias" in r else f"tk={r['llamadas_tk']:g}" if "llamadas_tk" in r
+                 else f"{r['peticiones_s']:.0f} pet/s" if "peticiones_s" in r
+                 else f"filas={r['filas']}" if "filas" in r else "")
+        if "bytes_por_fila" in r: extra += f" mem={r['bytes_por_fila']:.0f}B/fila"
+        print(f"{r['incidencias']:>9} {r['funcion']:<42} p50={r['mediana_ms']:9.3f}ms "
+              f"p95={r['p95_ms']:9.3f}ms {extra}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks de crud.py y de los Treeview.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("correr", help="genera BDs de prueba y mide")
+    c.add_argument("--incidencias", type=int, nargs="+", default=[1000, 10000, 100000])
+    c.add_argument("--usuarios", type=int, help="por defecto incidencias/100")
+    c.add_argument("--repeticiones", type=int, default=20)
+    c.add_argument("--semilla", type=int, default=42)
+    c.add_argument("--filtro", help="sólo casos cuyo nombre contenga este texto")
+    c.add_argument("-o", "--salida", help="archivo JSON con los resultados")
+    q = sub.add_parser("concurrencia", help="crud_async contra crud síncrono con muchas peticiones en vuelo")
+    q.add_argument("--incidencias", type=int, default=100000)
+    q.add_argument("--usuarios", type=int)
+    q.add_argument("--en-vuelo", type=int, nargs="+", default=[1, 8, 32, 64])
+    q.add_argument("--peticiones", type=int, default=2000)
+    q.add_argument("--semilla", type=int, default=42)
+    q.add_argument("-o", "--salida")
+    a = sub.add_parser("arranque", help="import de main/crud y tiempo hasta el primer pintado, en procesos nuevos")
+    a.add_argument("--incidencias", type=int, default=100000)
+    a.add_argument("--usuarios", type=int)
+    a.add_argument("--repeticiones", type=int, default=10)
+    a.add_argument("--semilla", type=int, default=42)
+    a.add_argument("-o", "--salida")
+    k = sub.add_parser("comparar", help="compara dos corridas y marca regresiones")
+    k.add_argument("base"); k.add_argument("nuevo")
+    k.add_argument("--umbral", type=float, default=0.2, help="crecimiento relativo tolerado (0.2 = 20%%)")
+    args = ap.parse_args(argv)
+
+    if args.cmd in ("correr", "concurrencia", "arranque"):
+        if args.cmd == "correr":
+            datos = correr(args.incidencias, args.usuarios, args.repeticiones, args.semilla, args.filtro)
+        elif args.cmd == "arranque":
+            datos = arranque(args.incidencias, args.usuarios, args.repeticiones, args.semilla)
+        else:
+            datos = concurrencia(args.incidencias, args.usuarios, args.en_vuelo, args.peticiones, args.semilla)
+        _imprimir(datos)
+        if args.salida:
+            Path(args.salida).write_text(json.dumps(datos, indent=2, ensure_ascii=False), encoding="utf-8")
+        return 0
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    nuevo = json.loads(Path(args.nuevo).read_text(encoding="utf-8"))
+    filas, regresiones = comparar(base, nuevo, args.umbral)
+    for (funcion, n), ma, mb, cambio, peor in filas:
+        print(f"{n:>9} {funcion:<42} {ma:9.3f} -> {mb:9.3f}ms {cambio:+7.1%}{'  REGRESIÓN' if peor else ''}")
+    print(f"{len(regresiones)} regresiones (umbral {args.umbral:.0%})")
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+# Tiempo de arranque de la app, cada repetición en un proceso nuevo (import en frío
+# de los módulos, como al abrir el programa):
+#   arranque.import_main   import de main.py (lo que se paga antes de crear la ventana)
+#   arranque.import_crud   import de crud.py (SQLAlchemy + mappers), que ahora corre en segundo plano
+#   arranque.<evento>      `main.py --medir-arranque`: primer pintado y primera página;
+#                          sólo si hay pantalla (Tk no arranca sin DISPLAY)
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+SCRIPT_IMPORT = "import time; t0 = time.perf_counter(); import {m}; print((time.perf_counter() - t0) * 1000)"
+
+def _resumen(nombre, tiempos):
+    tiempos.sort()
+    return {"funcion": f"arranque.{nombre}", "repeticiones": len(tiempos),
+            "mediana_ms": statistics.median(tiempos),
+            "p95_ms": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], "min_ms": tiempos[0]}
+
+def _proceso(args, env):
+    r = subprocess.run([sys.executable, *args], cwd=RAIZ, env=env, capture_output=True, text=True, timeout=120)
+    return r.stdout.strip().splitlines()[-1] if r.returncode == 0 and r.stdout.strip() else None
+
+def medir_arranque(ruta, repeticiones=10):
+    env = {**os.environ, "TICKETS_DB": str(ruta)}
+    resultados = []
+    for m in ("main", "crud"):
+        tiempos = [float(_proceso(["-c", SCRIPT_IMPORT.format(m=m)], env)) for _ in range(repeticiones)]
+        resultados.append(_resumen(f"import_{m}", tiempos))
+    eventos = {}
+    for _ in range(repeticiones):
+        salida = _proceso(["main.py", "--medir-arranque"], env)
+        if salida is None:
+            print("arranque: la ventana no pudo abrirse (¿sin pantalla?); sólo se midió el import", file=sys.stderr)
+            break
+        for k, v in json.loads(salida).items():
+            eventos.setdefault(k.removesuffix("_ms"), []).append(v)
+    resultados += [_resumen(k, v) for k, v in eventos.items() if k != "import"]
+    return resultados
@@ -0,0 +1,76 @@
+# Rendimiento con muchas peticiones en vuelo: crud_async (aiosqlite) contra crud
+# síncrono atendido por un pool de hilos, como lo haría un servicio web.
+# Cada petición es una lectura de la mezcla MEZCLA (página filtrada, detalle,
+# búsqueda, reporte), elegida con la misma semilla en ambas variantes.
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+
+import crud
+from db import SessionLocal
+
+TAM_PAGINA = 50
+
+def _mezcla(rnd, usuarios, incidencias, n):
+    # [(nombre de la función, args, kwargs)]
+    ops = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.4: ops.append(("listar_filas_incidencias", (rnd.randint(1, usuarios),), {"limite": TAM_PAGINA}))
+        elif r < 0.7: ops.append(("obtener_incidencia", (rnd.randint(1, incidencias),), {}))
+        elif r < 0.9: ops.append(("buscar_incidencias", ("impresora bloqueado vpn",), {"limite": TAM_PAGINA}))
+        else: ops.append(("conteo_incidencias_por_prioridad", (), {}))
+    return ops
+
+def _resumen(variante, en_vuelo, latencias, segundos):
+    latencias.sort()
+    return {"funcion": f"concurrencia.{variante}[{en_vuelo} en vuelo]", "repeticiones": len(latencias),
+            "mediana_ms": statistics.median(latencias) * 1000,
+            "p95_ms": latencias[int(len(latencias) * 0.95) - 1] * 1000,
+            "min_ms": latencias[0] * 1000, "peticiones_s": len(latencias) / segundos}
+
+def correr_sync(ops, en_vuelo):
+    def una(op):
+        nombre, args, kw = op
+        t0 = time.perf_counter(); getattr(crud, nombre)(*args, **kw)
+        return time.perf_counter() - t0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=en_vuelo) as pool:
+        latencias = list(pool.map(una, ops))
+    return _resumen("sync", en_vuelo, latencias, time.perf_counter() - t0)
+
+async def _correr_async(ca, ops, en_vuelo):
+    limite = asyncio.Semaphore(en_vuelo)
+    async def una(op):
+        nombre, args, kw = op
+        async with limite:
+            t0 = time.perf_counter(); await getattr(ca, nombre)(*args, **kw)
+            return time.perf_counter() - t0
+    t0 = time.perf_counter()
+    latencias = await asyncio.gather(*(una(op) for op in ops))
+    return _resumen("async", en_vuelo, list(latencias), time.perf_counter() - t0)
+
+def medir_concurrencia(ruta, usuarios, incidencias, niveles=(1, 8, 32, 64), peticiones=2000, semilla=42):
+    import crud_async as ca     # requiere aiosqlite: sólo se importa si se pide
+    ops = _mezcla(random.Random(semilla), usuarios, incidencias, peticiones)
+    resultados = []
+    for n in niveles:
+        # mismo tamaño de pool en ambas variantes
+        eng = create_engine(f"sqlite:///{ruta.as_posix()}", future=True, pool_size=n, max_overflow=n)
+        SessionLocal.configure(bind=eng)
+        resultados.append(correr_sync(ops, n))
+        eng.dispose()
+
+        async def variante_async():
+            eng_a = ca.crear_engine(ruta, tam_pool=n)
+            ca.SessionAsync.configure(bind=eng_a)
+            try:
+                return await _correr_async(ca, ops, n)
+            finally:
+                await eng_a.dispose()
+        resultados.append(asyncio.run(variante_async()))
+    return resultados
@@ -0,0 +1,73 @@
+# Generador sembrado de datos sintéticos sobre una BD de prueba.
+# El esquema se crea con `alembic upgrade head`, así la BD lleva los mismos
+# índices, FTS y triggers que app.db. Prioridades y dueños de tickets siguen
+# una distribución sesgada (pocos usuarios concentran muchos tickets). Los tickets
+# se reparten en DIAS_HISTORIA días (id mayor = más reciente) y la mayoría de los
+# viejos están cerrados, como en una BD con años de uso (ver archivo.py).
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert
+
+from db import BASE_DIR
+from models import Usuario, Incidencia
+
+PESOS_PRIORIDAD = {"Baja": 0.50, "Media": 0.35, "Alta": 0.15}
+SESGO_USUARIOS = 1.1     # exponente Zipf: peso del usuario k = 1 / k**s
+DIAS_HISTORIA = 3 * 365
+DIAS_HASTA_CIERRE = 30   # un ticket cerrado se cerró entre 0 y esto días después de creado
+LOTE = 50_000
+
+PALABRAS = (
+    "impresora red correo contraseña acceso servidor sistema pantalla teclado equipo "
+    "lento error falla usuario cuenta archivo carpeta respaldo licencia instalación "
+    "actualización conexión internet wifi vpn reporte factura nómina almacén ventas "
+    "compras inventario cliente proveedor telefono extensión cámara sala proyector "
+    "bloqueado reinicio permiso configuración navegador página cobro"
+).split()
+
+def crear_esquema(ruta) -> str:
+    url = f"sqlite:///{Path(ruta).as_posix()}"
+    cfg = Config(str(BASE_DIR / "alembic.ini"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    cfg.attributes["configure_logger"] = False
+    command.upgrade(cfg, "head")
+    return url
+
+def _texto(rnd, minimo, maximo):
+    return " ".join(rnd.choices(PALABRAS, k=rnd.randint(minimo, maximo)))
+
+def generar(ruta, usuarios: int, incidencias: int, semilla: int = 42):
+    # Crea la BD en `ruta` y la llena; devuelve un engine listo para usar
+    url = crear_esquema(ruta)
+    engine = create_engine(url, future=True)
+    rnd = random.Random(semilla)
+    with engine.begin() as c:
+        for i in range(0, usuarios, LOTE):
+            c.execute(insert(Usuario), [{"nombre": f"Usuario {k % (usuarios // 2 or 1)}",   # hay homónimos
+                                         "email": f"usuario{k}@bench.local"}
+                                        for k in range(i, min(i + LOTE, usuarios))])
+    acum_usr = list(accumulate(1 / (k ** SESGO_USUARIOS) for k in range(1, usuarios + 1)))
+    orden_usr = list(range(1, usuarios + 1)); rnd.shuffle(orden_usr)   # el sesgo no sigue al id
+    prioridades = list(PESOS_PRIORIDAD); acum_pri = list(accumulate(PESOS_PRIORIDAD.values()))
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0); paso = timedelta(days=DIAS_HISTORIA) / max(incidencias, 1)
+    for i in range(0, incidencias, LOTE):
+        n = min(LOTE, incidencias - i)
+        duenos = rnd.choices(orden_usr, cum_weights=acum_usr, k=n)
+        pris = rnd.choices(prioridades, cum_weights=acum_pri, k=n)
+        filas = []
+        for k, (u, p) in enumerate(zip(duenos, pris), start=i):
+            creado = ahora - paso * (incidencias - k)
+            cierre = creado + timedelta(days=rnd.uniform(0, DIAS_HASTA_CIERRE))
+            # cerrado si ya pasó su fecha de cierre, salvo algunos que siguen abiertos
+            cerrada = cierre < ahora and rnd.random() < 0.9
+            filas.append({"titulo": _texto(rnd, 3, 6), "descripcion": _texto(rnd, 10, 40), "prioridad": p,
+                          "usuario_id": u, "estado": "Cerrada" if cerrada else rnd.choice(("Abierta", "En proceso")),
+                          "creado_en": creado, "cerrado_en": cierre if cerrada else None})
+        with engine.begin() as c:
+            c.execute(insert(Incidencia), filas)
+    return engine
@@ -0,0 +1,71 @@
+# Índice en memoria de la UI (indice.py): carga de MAX_FILAS incidencias (lo más
+# que la UI indexa) y filtrado por usuario/prioridad/texto y orden sobre lo
+# cargado, como al elegir un filtro, escribir en "Buscar" o hacer clic en un
+# encabezado de tv_i. La búsqueda FTS (Enter) está en bench consultas.
+# Objetivo: menos de 50 ms por consulta (por tecla, al escribir).
+import statistics
+import time
+
+from crud import listar_filas_indice
+from indice import IndiceIncidencias, MAX_FILAS
+
+def _medir(fn, repeticiones):
+    tiempos = []; filas = 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); filas = len(fn())
+        tiempos.append(time.perf_counter() - t0)
+    return _resumen(tiempos, filas)
+
+def _resumen(tiempos, filas):
+    repeticiones = len(tiempos); tiempos = sorted(tiempos)
+    return {"repeticiones": repeticiones, "mediana_ms": statistics.median(tiempos) * 1000,
+            "p95_ms": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000,
+            "min_ms": tiempos[0] * 1000, "filas": filas}
+
+def medir_indice(repeticiones=5):
+    t0 = time.perf_counter(); ix = IndiceIncidencias(listar_filas_indice(limite=MAX_FILAS))
+    carga = time.perf_counter() - t0
+    uid = ix.usuarios[0] if len(ix) else None
+    # texto que existe en los datos: la primera palabra del título y el nombre de la primera fila
+    titulo = (ix._titulos_n[0].split() or ["x"])[0] if len(ix) else "x"
+    usuario = ix._nombres_n[0] if len(ix) else "x"
+
+    def consulta(*args, **kw):
+        def fn():
+            ix._ultima = None     # sin reutilizar la consulta anterior
+            return ix.consultar(*args, **kw)
+        return fn
+
+    def reordenar():
+        # dos consultas con los mismos filtros: la segunda (otra columna) reutiliza
+        # las posiciones ya filtradas
+        ix._ultima = None; ix.consultar(prioridad="Alta")
+        return ix.consultar(prioridad="Alta", orden="titulo", descendente=False)
+
+    def escribir():
+        # "Buscar" tecla a tecla: cada consulta parte de la anterior (ver indice.py)
+        tiempos = []; filas = 0
+        for _ in range(repeticiones):
+            ix._ultima = None
+            for i in range(1, len(titulo) + 1):
+                t0 = time.perf_counter(); filas = len(ix.consultar(texto=titulo[:i]))
+                tiempos.append(time.perf_counter() - t0)
+        return _resumen(tiempos, filas)
+
+    resultados = [{"funcion": "indice.cargar", "repeticiones": 1, "mediana_ms": carga * 1000,
+                   "p95_ms": carga * 1000, "min_ms": carga * 1000, "filas": len(ix)}]
+    for nombre, fn in (("indice.consultar[todo]", consulta()),
+                       ("indice.consultar[usuario]", consulta(usuario_id=uid)),
+                       ("indice.consultar[prioridad]", consulta(prioridad="Alta")),
+                       ("indice.consultar[orden titulo]", consulta(orden="titulo", descendente=False)),
+                       ("indice.consultar[prioridad+orden usuario]", consulta(prioridad="Alta", orden="usuario")),
+                       ("indice.consultar[reordenar]", reordenar),
+                       ("indice.consultar[texto una letra]", consulta(texto=titulo[:1])),
+                       ("indice.consultar[texto titulo]", consulta(texto=titulo)),
+                       ("indice.consultar[texto usuario]", consulta(texto=usuario)),
+                       ("indice.consultar[texto dos palabras+orden titulo]",
+                        consulta(texto=f"{titulo} {usuario}", orden="titulo", descendente=False)),
+                       ("indice.consultar[prioridad+texto]", consulta(prioridad="Alta", texto=titulo))):
+        resultados.append({"funcion": nombre, **_medir(fn, repeticiones)})
+    resultados.append({"funcion": "indice.consultar[texto tecla a tecla]", **escribir()})
+    return resultados
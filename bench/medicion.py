@@ -0,0 +1,197 @@
+# Medición de cada función pública de crud.py sobre una BD generada.
+# Cada caso es (nombre, preparar, operacion): `preparar` corre fuera del
+# cronómetro y devuelve los argumentos de `operacion`, que es lo que se mide.
+# Además del tiempo se cuentan las sentencias SQL que emite cada operación.
+import random
+import statistics
+import time
+import tracemalloc
+from itertools import count
+
+from sqlalchemy import event
+
+import crud
+from directorio import directorio
+from indice import MAX_FILAS
+from main import LOTE_INDICE
+
+TAM_PAGINA = 200
+TEXTO_BUSQUEDA = "impresora"
+LOTE_UOW = 100
+EDICIONES = 20    # cambios que otra instancia ve en una revisión de cambios_desde
+
+class ContadorSentencias:
+    def __init__(self, engine):
+        self.n = 0
+        event.listen(engine, "before_cursor_execute", self._contar)
+        self.engine = engine
+
+    def _contar(self, *_):
+        self.n += 1
+
+    def cerrar(self):
+        event.remove(self.engine, "before_cursor_execute", self._contar)
+
+class Contexto:
+    # Estado compartido entre casos: ids existentes y generadores de datos únicos
+    def __init__(self, usuarios, incidencias, semilla):
+        self.usuarios = usuarios; self.incidencias = incidencias
+        self.rnd = random.Random(semilla)
+        self.seq = count()
+        self.creados = []    # usuarios creados por el benchmark (se pueden editar/borrar)
+
+    def uid(self):
+        return self.rnd.randint(1, self.usuarios)
+
+    def inc_id(self):
+        return self.rnd.randint(1, self.incidencias)
+
+    def nuevo_usuario(self):
+        n = next(self.seq)
+        return (f"Bench {n}", f"bench{n}@bench.local")
+
+def _sin_args():
+    return ()
+
+def casos(ctx: Contexto):
+    def nuevo_para_borrar():
+        return (crud.crear_usuario(*ctx.nuevo_usuario()).id,)
+
+    def editar_creado():
+        if not ctx.creados: ctx.creados.append(crud.crear_usuario(*ctx.nuevo_usuario()))
+        u = ctx.rnd.choice(ctx.creados)
+        return (u.id, u.nombre + "*", u.email)
+
+    def crear_usuario(*a):
+        ctx.creados.append(crud.crear_usuario(*a))
+
+    def crear_lote(uid):
+        # varias altas en un solo commit
+        with crud.unidad_de_trabajo() as uow:
+            for _ in range(LOTE_UOW): uow.crear_incidencia("Bench", "lote", "Baja", uid)
+
+    def editar_varias(n):
+        # n ediciones en un commit: cada una deja su fila en `cambios`
+        with crud.unidad_de_trabajo() as uow:
+            for _ in range(n): uow.editar_incidencia(ctx.inc_id(), prioridad=ctx.rnd.choice(("Baja", "Media", "Alta")))
+
+    def quitar_del_directorio():
+        # como con más de directorio.CAPACIDAD usuarios: faltan algunos dueños
+        uids = {ctx.uid() for _ in range(EDICIONES)}
+        for u in uids: directorio.quitar(u)
+        directorio.completo = False
+        return (uids,)
+
+    def cambios_pendientes():
+        seq = crud.cambios_desde(None).seq
+        editar_varias(EDICIONES)
+        return (seq,)
+
+    def sin_poda():
+        crud.podar_cambios()     # la primera vez poda lo que dejó el generador
+        return ()
+
+    def para_podar():
+        # podar_cambios(LOTE_UOW) sólo escribe pasado el doble: se deja el triple
+        crud.podar_cambios(LOTE_UOW); editar_varias(3 * LOTE_UOW)
+        return ()
+
+    return [
+        ("crear_usuario", ctx.nuevo_usuario, crear_usuario),
+        ("listar_usuarios", _sin_args, crud.listar_usuarios),
+        ("obtener_usuario", lambda: (ctx.uid(),), crud.obtener_usuario),
+        ("cargar_directorio", _sin_args, crud.cargar_directorio),
+        ("directorio.prefijo", _sin_args, lambda: directorio.prefijo("usuario 1")),
+        ("buscar_usuarios_prefijo", _sin_args, lambda: crud.buscar_usuarios_prefijo("Usuario 1")),
+        ("completar_directorio[%d]" % EDICIONES, quitar_del_directorio, crud.completar_directorio),
+        ("editar_usuario", editar_creado, crud.editar_usuario),
+        ("eliminar_usuario", nuevo_para_borrar, crud.eliminar_usuario),
+        ("crear_incidencia", lambda: ("Bench", "descripción de prueba", "Media", ctx.uid()), crud.crear_incidencia),
+        ("listar_incidencias[pagina]", _sin_args, lambda: crud.listar_incidencias(limite=TAM_PAGINA)),
+        ("listar_incidencias[usuario]", lambda: (ctx.uid(),), lambda u: crud.listar_incidencias(u, limite=TAM_PAGINA)),
+        ("listar_incidencias[prioridad]", _sin_args, lambda: crud.listar_incidencias(prioridad="Alta", limite=TAM_PAGINA)),
+        ("listar_incidencias[usuario+prioridad]", lambda: (ctx.uid(),),
+         lambda u: crud.listar_incidencias(u, "Alta", limite=TAM_PAGINA)),
+        ("listar_incidencias[completo]", _sin_args, crud.listar_incidencias),
+        ("listar_filas_incidencias[pagina]", _sin_args, lambda: crud.listar_filas_incidencias(limite=TAM_PAGINA)),
+        ("listar_filas_incidencias[usuario]", lambda: (ctx.uid(),),
+         lambda u: crud.listar_filas_incidencias(u, limite=TAM_PAGINA)),
+        ("listar_filas_incidencias[completo]", _sin_args, crud.listar_filas_incidencias),
+        ("listar_filas_incidencias[pagina+archivo]", _sin_args,
+         lambda: crud.listar_filas_incidencias(limite=TAM_PAGINA, archivo=True)),
+        ("listar_filas_indice[lote]", _sin_args, lambda: crud.listar_filas_indice(limite=LOTE_INDICE)),
+        ("listar_filas_indice[usuario]", lambda: (ctx.uid(),), lambda u: crud.listar_filas_indice(u, limite=LOTE_INDICE)),
+        ("listar_filas_indice[completo]", _sin_args, lambda: crud.listar_filas_indice(limite=MAX_FILAS)),
+        ("contar_incidencias[tope]", _sin_args, lambda: crud.contar_incidencias(tope=MAX_FILAS)),
+        ("contar_incidencias[usuario+tope]", lambda: (ctx.uid(),), lambda u: crud.contar_incidencias(u, tope=MAX_FILAS)),
+        ("contar_incidencias[archivo+tope]", _sin_args, lambda: crud.contar_incidencias(archivo=True, tope=MAX_FILAS)),
+        ("obtener_incidencia", lambda: (ctx.inc_id(),), crud.obtener_incidencia),
+        ("editar_incidencia", lambda: (ctx.inc_id(),),
+         lambda i: crud.editar_incidencia(i, titulo="Editada", prioridad="Baja")),
+        ("eliminar_incidencia", lambda: (crud.crear_incidencia("x", "y", "Baja", ctx.uid()).id,),
+         crud.eliminar_incidencia),
+        ("incidencias_join_con_usuario[pagina]", _sin_args, lambda: crud.incidencias_join_con_usuario(limite=TAM_PAGINA)),
+        ("incidencias_join_con_usuario[completo]", _sin_args, crud.incidencias_join_con_usuario),
+        ("conteo_incidencias_por_usuario", _sin_args, crud.conteo_incidencias_por_usuario),
+        ("conteo_incidencias_por_prioridad", _sin_args, crud.conteo_incidencias_por_prioridad),
+        ("buscar_incidencias", _sin_args, lambda: crud.buscar_incidencias(TEXTO_BUSQUEDA, limite=TAM_PAGINA)),
+        ("unidad_de_trabajo[%d altas]" % LOTE_UOW, lambda: (ctx.uid(),), crear_lote),
+        # lo que cada instancia abierta consulta cada segundo si otra escribió
+        ("cambios_desde[sin cambios]", lambda: (crud.cambios_desde(None).seq,), crud.cambios_desde),
+        ("cambios_desde[%d ediciones]" % EDICIONES, cambios_pendientes, crud.cambios_desde),
+        ("podar_cambios[sin poda]", sin_poda, crud.podar_cambios),
+        ("podar_cambios[%d filas]" % (3 * LOTE_UOW), para_podar, lambda: crud.podar_cambios(LOTE_UOW)),
+    ]
+
+# Casos que recorren toda la tabla: se repiten menos para no dominar la corrida
+PESADOS = {"incidencias_join_con_usuario[completo]", "listar_usuarios", "cargar_directorio",
+           "listar_incidencias[completo]", "listar_filas_incidencias[completo]", "listar_filas_indice[completo]",
+           "podar_cambios[%d filas]" % (3 * LOTE_UOW)}
+# Casos que además reportan la memoria retenida por fila devuelta
+MEMORIA = {"listar_incidencias[completo]", "listar_filas_incidencias[completo]"}
+
+def medir(preparar, operacion, repeticiones, contador) -> dict:
+    tiempos = []; sentencias = 0
+    for _ in range(repeticiones):
+        args = preparar()
+        antes = contador.n
+        t0 = time.perf_counter()
+        operacion(*args)
+        tiempos.append(time.perf_counter() - t0)
+        sentencias += contador.n - antes
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "mediana_ms": statistics.median(tiempos) * 1000,
+        "p95_ms": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))] * 1000,
+        "min_ms": tiempos[0] * 1000,
+        "sentencias": sentencias / repeticiones,
+    }
+
+def bytes_por_fila(operacion) -> float:
+    # Memoria que sigue ocupada por el resultado (lo que la UI retiene) / filas
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        res = operacion()
+        despues = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (despues - antes) / max(1, len(res))
+
+def medir_crud(engine, usuarios, incidencias, repeticiones=20, semilla=42, filtro=None):
+    ctx = Contexto(usuarios, incidencias, semilla)
+    contador = ContadorSentencias(engine)
+    try:
+        resultados = []
+        for nombre, preparar, operacion in casos(ctx):
+            if filtro and filtro not in nombre:
+                continue
+            reps = max(1, repeticiones // 5) if nombre in PESADOS else repeticiones
+            fila = {"funcion": nombre, **medir(preparar, operacion, reps, contador)}
+            if nombre in MEMORIA:
+                fila["bytes_por_fila"] = bytes_por_fila(lambda: operacion(*preparar()))
+            resultados.append(fila)
+        return resultados
+    finally:
+        contador.cerrar()
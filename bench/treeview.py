@@ -0,0 +1,104 @@
+# Costo de llenar/actualizar los Treeview de main.App sin abrir la ventana.
+# Con pantalla disponible se usa un ttk.Treeview real (ventana oculta); sin ella
+# (servidores, CI) se usa un Treeview simulado. En ambos casos se reporta el
+# número de llamadas a Tk, que no depende de la máquina.
+import statistics
+import time
+
+import crud
+from main import FilasTreeview, TAM_PAGINA, _fila_usuario, _pagina_incs
+
+class TreeviewSimulado:
+    # Misma interfaz que usa FilasTreeview, sin Tk
+    def __init__(self):
+        self.filas = []
+
+    def insert(self, _padre, indice, iid, values):
+        self.filas.insert(len(self.filas) if indice == "end" else indice, iid)
+
+    def item(self, iid, values):
+        pass
+
+    def delete(self, *iids):
+        quitar = set(iids)
+        self.filas = [i for i in self.filas if i not in quitar]
+
+    def move(self, iid, _padre, indice):
+        self.filas.remove(iid); self.filas.insert(indice, iid)
+
+    def get_children(self):
+        return tuple(self.filas)
+
+class _Contado:
+    # Envuelve un Treeview y cuenta las llamadas que modifican filas
+    def __init__(self, tv):
+        self.tv = tv; self.llamadas = 0
+
+    def __getattr__(self, nombre):
+        attr = getattr(self.tv, nombre)
+        if nombre in ("insert", "item", "delete", "move"):
+            def contado(*a, **kw):
+                self.llamadas += 1
+                return attr(*a, **kw)
+            return contado
+        return attr
+
+def _fabrica():
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk(); root.withdraw()
+    except Exception:
+        return None, TreeviewSimulado
+    return root, lambda: ttk.Treeview(root, columns=("a", "b", "c", "d"), show="headings")
+
+def _medir(fn, repeticiones):
+    tiempos = []; llamadas = 0
+    for _ in range(repeticiones):
+        t, n = fn()
+        tiempos.append(t); llamadas += n
+    return {"repeticiones": repeticiones, "mediana_ms": statistics.median(tiempos) * 1000,
+            "p95_ms": max(tiempos) * 1000, "min_ms": min(tiempos) * 1000,
+            "llamadas_tk": llamadas / repeticiones}
+
+def medir_treeview(repeticiones=5):
+    root, nuevo_tv = _fabrica()
+    usuarios = [_fila_usuario(u) for u in crud.listar_usuarios()]
+    pagina, _ = _pagina_incs(None, None, None, False, None)
+
+    def sync_inicial():
+        tv = _Contado(nuevo_tv()); filas = FilasTreeview(tv)
+        t0 = time.perf_counter(); filas.sync(usuarios)
+        return time.perf_counter() - t0, tv.llamadas
+
+    def sync_un_cambio():
+        tv = _Contado(nuevo_tv()); filas = FilasTreeview(tv); filas.sync(usuarios)
+        cambiadas = list(usuarios); iid, v = cambiadas[len(cambiadas) // 2]
+        cambiadas[len(cambiadas) // 2] = (iid, (v[0], v[1], "otro@bench.local"))
+        tv.llamadas = 0
+        t0 = time.perf_counter(); filas.sync(cambiadas)
+        return time.perf_counter() - t0, tv.llamadas
+
+    def recarga_completa():
+        # comportamiento anterior: borrar todo e insertar todo
+        tv = _Contado(nuevo_tv()); FilasTreeview(tv).sync(usuarios); tv.llamadas = 0
+        t0 = time.perf_counter()
+        for i in tv.get_children(): tv.delete(i)
+        for iid, v in usuarios: tv.insert("", "end", iid=str(iid), values=v)
+        return time.perf_counter() - t0, tv.llamadas
+
+    def pagina_incidencias():
+        tv = _Contado(nuevo_tv()); filas = FilasTreeview(tv)
+        t0 = time.perf_counter()
+        for f in pagina: filas.upsert(f[0], f)
+        return time.perf_counter() - t0, tv.llamadas
+
+    try:
+        tk_real = root is not None
+        return [{"funcion": f"treeview.{nombre}", "tk": tk_real, **_medir(fn, repeticiones)}
+                for nombre, fn in (("sync_usuarios[inicial]", sync_inicial),
+                                   ("sync_usuarios[1 cambio]", sync_un_cambio),
+                                   ("recarga_completa_usuarios", recarga_completa),
+                                   (f"pagina_incidencias[{TAM_PAGINA}]", pagina_incidencias))]
+    finally:
+        if root is not None: root.destroy()
@@ -0,0 +1,48 @@
+# Detección de cambios hechos por otras instancias sobre el mismo app.db.
+# PRAGMA data_version cambia cuando otra conexión hace commit; leerlo cuesta
+# microsegundos y no toca tablas, así que la UI lo consulta cada segundo. Sólo si
+# cambió se lee el registro `cambios` (crud.cambios_desde), que los triggers
+# llenan con el id de cada usuario/incidencia tocado, y la UI aplica esas filas
+# en vez de recargar las tablas completas.
+# data_version es por conexión: el sondeo usa siempre la misma, sólo para esto.
+import sqlite3
+import threading
+
+from crud import cambios_desde, completar_directorio
+from db import DB_PATH
+
+class Sondeo:
+    def __init__(self, ruta=DB_PATH):
+        self.ruta = ruta
+        self._con = None; self._version = None; self._cerrado = False
+        self._lock = threading.Lock()     # lo llaman los hilos del Ejecutor
+
+    def hubo_escrituras(self) -> bool:
+        # True en la primera llamada y cada vez que alguien hizo commit desde la anterior;
+        # después de cerrar() siempre False, sin reabrir la conexión
+        with self._lock:
+            if self._cerrado: return False
+            if self._con is None:
+                self._con = sqlite3.connect(self.ruta, timeout=1, check_same_thread=False)
+            v = self._con.execute("PRAGMA data_version").fetchone()[0]
+            previa, self._version = self._version, v
+            return v != previa
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            if self._con is not None: self._con.close(); self._con = None
+
+sondeo = Sondeo()
+
+def revisar(seq: int | None):
+    # None si nadie escribió desde la última revisión; si no, crud.Cambios
+    if not sondeo.hubo_escrituras() and seq is not None:
+        return None
+    c = cambios_desde(seq)
+    completar_directorio(i.usuario_id for i in c.incidencias)    # nombre del dueño en tv_i
+    return c
+
+def cerrar():
+    # Al cerrar la app: una revisión que aún esté en un hilo ya no consulta la BD
+    sondeo.cerrar()
@@ -1,125 +1,472 @@
-from sqlalchemy import select, func
+from contextlib import contextmanager
+from typing import NamedTuple
+from sqlalchemy import (
+    select, insert, update, delete, func, table, column, literal, literal_column, or_, and_, event, case, union_all,
+    desc, Integer,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import Session, joinedload, undefer
 from db import SessionLocal
-from models import Usuario, Incidencia
+from directorio import directorio, registrar, aplicar, descartar, LIMITE_PREFIJO
+from instrumentacion import medido
+from models import (
+    Usuario, Incidencia, IncidenciaArchivada, ResumenIncidencias, Cambio, PisoCambios, ESTADOS, CERRADA,
+)
 
-# ---------- USUARIOS (CRUD) ----------
-def crear_usuario(nombre: str, email: str):
-    with SessionLocal() as s:
-        u = Usuario(nombre=nombre.strip(), email=email.strip().lower())
-        s.add(u)
+# ---------- UNIDAD DE TRABAJO ----------
+# Las operaciones de escritura sobre una sesión/transacción que maneja quien
+# llama, para agrupar muchas en un solo commit:
+#
+#   with unidad_de_trabajo() as uow:
+#       for t in tickets: uow.crear_incidencia(*t)
+#
+# Usan INSERT/UPDATE ... RETURNING en vez de commit + refresh, y dejan que las
+# FK/UNIQUE de la BD validen en vez de consultar antes (una sentencia por operación).
+event.listen(Session, "after_commit", aplicar)      # cambios de usuarios -> directorio.py
+event.listen(Session, "after_rollback", descartar)
+
+def _cerrado_en(estado: str):
+    # Al cerrar se anota la fecha (si ya estaba cerrada, se conserva); al reabrir se quita
+    if estado != CERRADA:
+        return None
+    return case((Incidencia.estado == CERRADA, func.coalesce(Incidencia.cerrado_en, func.current_timestamp())),
+                else_=func.current_timestamp())
+
+def _viola_fk(e: IntegrityError) -> bool:
+    return "FOREIGN KEY" in str(e.orig)
+
+class UnidadDeTrabajo:
+    def __init__(self, session):
+        self.s = session
+
+    def _una(self, stmt):
+        return self.s.scalar(stmt.execution_options(populate_existing=True))
+
+    def crear_usuario(self, nombre: str, email: str):
+        try:
+            u = self._una(insert(Usuario).values(nombre=nombre.strip(), email=email.strip().lower())
+                          .returning(Usuario))
+        except IntegrityError:
+            raise ValueError("El email ya existe.")
+        registrar(self.s, u)
+        return u
+
+    def editar_usuario(self, usuario_id: int, nombre: str, email: str):
         try:
-            s.commit()
+            u = self._una(update(Usuario).where(Usuario.id == usuario_id)
+                          .values(nombre=nombre.strip(), email=email.strip().lower()).returning(Usuario))
         except IntegrityError:
-            s.rollback()
             raise ValueError("El email ya existe.")
-        s.refresh(u)
+        if u: registrar(self.s, u)
         return u
 
+    def eliminar_usuario(self, usuario_id: int) -> bool:
+        # Bloquea si tiene incidencias asociadas: lo impide la FK de incidencias.usuario_id
+        try:
+            borrado = self.s.execute(delete(Usuario).where(Usuario.id == usuario_id)).rowcount > 0
+        except IntegrityError as e:
+            if _viola_fk(e): raise ValueError("No se puede eliminar: tiene incidencias asociadas.")
+            raise
+        if borrado: registrar(self.s, quitar=usuario_id)
+        return borrado
+
+    def crear_incidencia(self, titulo: str, descripcion: str, prioridad: str, usuario_id: int,
+                         estado: str = ESTADOS[0]):
+        try:
+            return self._una(insert(Incidencia).values(
+                titulo=titulo.strip(), descripcion=descripcion.strip(),
+                prioridad=prioridad.strip(), usuario_id=usuario_id, estado=estado,
+                cerrado_en=func.current_timestamp() if estado == CERRADA else None).returning(Incidencia))
+        except IntegrityError as e:
+            if _viola_fk(e): raise ValueError("Usuario no existe.")
+            raise
+
+    def editar_incidencia(self, inc_id: int, **campos):
+        if not campos:
+            return self.s.get(Incidencia, inc_id)
+        if "estado" in campos:
+            campos["cerrado_en"] = _cerrado_en(campos["estado"])
+        try:
+            return self._una(update(Incidencia).where(Incidencia.id == inc_id).values(**campos)
+                             .returning(Incidencia))
+        except IntegrityError as e:
+            if _viola_fk(e): raise ValueError("Usuario destino no existe.")
+            raise
+
+    def eliminar_incidencia(self, inc_id: int) -> bool:
+        return self.s.execute(delete(Incidencia).where(Incidencia.id == inc_id)).rowcount > 0
+
+@contextmanager
+def unidad_de_trabajo():
+    # Sesión + transacción propias: commit al salir, rollback si hay excepción
+    with SessionLocal() as s, s.begin():
+        yield UnidadDeTrabajo(s)
+
+# ---------- USUARIOS (CRUD) ----------
+@medido
+def crear_usuario(nombre: str, email: str):
+    with unidad_de_trabajo() as uow:
+        return uow.crear_usuario(nombre, email)
+
+@medido
 def listar_usuarios():
     with SessionLocal() as s:
         return list(s.scalars(select(Usuario).order_by(Usuario.nombre)))
 
+@medido
 def obtener_usuario(usuario_id: int):
     with SessionLocal() as s:
         return s.get(Usuario, usuario_id)
 
-def editar_usuario(usuario_id: int, nombre: str, email: str):
+@medido
+def cargar_directorio():
+    # Llena directorio.py con (id, nombre, email); una fila de más indica si quedó incompleto
     with SessionLocal() as s:
-        u = s.get(Usuario, usuario_id)
-        if not u:
-            return None
-        u.nombre = nombre.strip()
-        u.email  = email.strip().lower()
-        try:
-            s.commit()
-        except IntegrityError:
-            s.rollback()
-            raise ValueError("El email ya existe.")
-        s.refresh(u)
-        return u
+        filas = s.execute(select(Usuario.id, Usuario.nombre, Usuario.email)
+                          .order_by(Usuario.nombre, Usuario.id).limit(directorio.capacidad + 1)).all()
+    directorio.cargar(filas)
+    return directorio
 
-def eliminar_usuario(usuario_id: int):
+@medido
+def buscar_usuarios_prefijo(texto: str, limite: int = LIMITE_PREFIJO):
+    # Con el directorio incompleto (más de CAPACIDAD usuarios), directorio.prefijo
+    # no ve a todos: se busca en la BD y los encontrados quedan en el directorio.
+    # LIKE no distingue mayúsculas ASCII; recorre ix_usuarios_nombre en orden y
+    # se detiene al juntar `limite`.
+    p = texto.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
     with SessionLocal() as s:
-        u = s.get(Usuario, usuario_id)
-        if not u:
-            return False
-        # Bloquea si tiene incidencias asociadas (opcional)
-        cnt = s.scalar(select(func.count(Incidencia.id)).where(Incidencia.usuario_id == usuario_id))
-        if cnt and cnt > 0:
-            raise ValueError("No se puede eliminar: tiene incidencias asociadas.")
-        s.delete(u); s.commit()
-        return True
+        filas = s.execute(select(Usuario.id, Usuario.nombre, Usuario.email)
+                          .where(Usuario.nombre.like(p + "%", escape="\\"))
+                          .order_by(Usuario.nombre, Usuario.id).limit(limite)).all()
+    for f in filas: directorio.poner(f)
+    return filas
 
-# ---------- INCIDENCIAS (CRUD) ----------
-def crear_incidencia(titulo: str, descripcion: str, prioridad: str, usuario_id: int):
+@medido
+def completar_directorio(usuario_ids):
+    # Pone en el directorio incompleto a los usuarios que falten (p. ej. dueños de
+    # incidencias que llegan por cambios de otra instancia), para mostrar su nombre
+    if directorio.completo: return
+    faltan = {u for u in usuario_ids if directorio.por_id(u) is None}
+    if not faltan: return
     with SessionLocal() as s:
-        if not s.get(Usuario, usuario_id):
-            raise ValueError("Usuario no existe.")
-        inc = Incidencia(
-            titulo=titulo.strip(),
-            descripcion=descripcion.strip(),
-            prioridad=prioridad.strip(),
-            usuario_id=usuario_id
-        )
-        s.add(inc); s.commit(); s.refresh(inc)
-        return inc
-
-def listar_incidencias(usuario_id: int | None = None, prioridad: str | None = None):
-    # SELECT (búsqueda normal)
+        for f in s.execute(select(Usuario.id, Usuario.nombre, Usuario.email).where(Usuario.id.in_(faltan))):
+            directorio.poner(f)
+
+@medido
+def editar_usuario(usuario_id: int, nombre: str, email: str):
+    with unidad_de_trabajo() as uow:
+        return uow.editar_usuario(usuario_id, nombre, email)
+
+@medido
+def eliminar_usuario(usuario_id: int):
+    with unidad_de_trabajo() as uow:
+        return uow.eliminar_usuario(usuario_id)
+
+# ---------- INCIDENCIAS (CRUD) ----------
+@medido
+def crear_incidencia(titulo: str, descripcion: str, prioridad: str, usuario_id: int, estado: str = ESTADOS[0]):
+    with unidad_de_trabajo() as uow:
+        return uow.crear_incidencia(titulo, descripcion, prioridad, usuario_id, estado)
+
+# `m` es Incidencia (tabla caliente) o IncidenciaArchivada (archivo.py)
+def _filtrar(stmt, usuario_id: int | None, prioridad: str | None, m=Incidencia):
+    # Filtros combinados usuario + prioridad (compartidos por listados y exportación)
+    if usuario_id:
+        stmt = stmt.where(m.usuario_id == usuario_id)
+    if prioridad:
+        stmt = stmt.where(m.prioridad == prioridad)
+    return stmt
+
+def _paginar(stmt, limite: int | None, despues_de: int | None, m=Incidencia):
+    # Keyset sobre Incidencia.id (orden descendente): sin OFFSET, cada página
+    # arranca donde terminó la anterior usando el último id visto.
+    if despues_de is not None:
+        stmt = stmt.where(m.id < despues_de)
+    if limite is not None:
+        stmt = stmt.limit(limite)
+    return stmt
+
+def _selects_incidencias(usuario_id, prioridad, limite, despues_de, archivo):
+    # Una sentencia por tabla, cada una con su keyset y LIMIT; _mezclar une las páginas
+    return [_paginar(_filtrar(select(m).options(joinedload(m.usuario)).order_by(m.id.desc()),
+                              usuario_id, prioridad, m), limite, despues_de, m)
+            for m in ((Incidencia, IncidenciaArchivada) if archivo else (Incidencia,))]
+
+def _mezclar(paginas, limite):
+    if len(paginas) == 1: return paginas[0]
+    res = sorted((i for p in paginas for i in p), key=lambda i: i.id, reverse=True)
+    return res[:limite] if limite is not None else res
+
+@medido
+def listar_incidencias(usuario_id: int | None = None, prioridad: str | None = None,
+                       limite: int | None = None, despues_de: int | None = None, archivo: bool = False):
+    # SELECT (búsqueda normal): objetos Incidencia con su usuario. archivo=True
+    # incluye las archivadas (IncidenciaArchivada, mismos campos más archivado_en),
+    # mezcladas por id DESC con el mismo keyset.
     with SessionLocal() as s:
-        stmt = select(Incidencia).options(joinedload(Incidencia.usuario)).order_by(Incidencia.id.desc())
-        if usuario_id:
-            stmt = stmt.where(Incidencia.usuario_id == usuario_id)
-        if prioridad:
-            stmt = stmt.where(Incidencia.prioridad == prioridad)
-        return list(s.scalars(stmt))
+        return _mezclar([list(s.scalars(q)) for q in _selects_incidencias(usuario_id, prioridad, limite,
+                                                                          despues_de, archivo)], limite)
 
+@medido
 def obtener_incidencia(inc_id: int):
+    # Para el diálogo de edición: trae también la descripción (diferida en el modelo).
+    # Las archivadas no se editan: devuelve None.
     with SessionLocal() as s:
-        return s.get(Incidencia, inc_id)
+        return s.get(Incidencia, inc_id, options=[undefer(Incidencia.descripcion)])
 
+@medido
 def editar_incidencia(inc_id: int, **campos):
     # UPDATE
-    with SessionLocal() as s:
-        inc = s.get(Incidencia, inc_id)
-        if not inc:
-            return None
-        if "usuario_id" in campos and not s.get(Usuario, campos["usuario_id"]):
-            raise ValueError("Usuario destino no existe.")
-        for k, v in campos.items():
-            setattr(inc, k, v)
-        s.commit(); s.refresh(inc)
-        return inc
+    with unidad_de_trabajo() as uow:
+        return uow.editar_incidencia(inc_id, **campos)
 
+@medido
 def eliminar_incidencia(inc_id: int):
     # DELETE
-    with SessionLocal() as s:
-        inc = s.get(Incidencia, inc_id)
-        if not inc:
-            return False
-        s.delete(inc); s.commit()
-        return True
+    with unidad_de_trabajo() as uow:
+        return uow.eliminar_incidencia(inc_id)
 
 # ---------- CONSULTAS ESPECIALES ----------
-def incidencias_join_con_usuario():
-    # JOIN: Incidencia + Usuario.nombre
+def _select_join(usuario_id: int | None = None, prioridad: str | None = None, m=Incidencia,
+                 con_usuario_id: bool = False):
+    # JOIN: Incidencia + Usuario.nombre (+ usuario_id para el índice en memoria)
+    stmt = (
+        select(m.id, m.titulo, m.prioridad, m.estado, Usuario.nombre, *([m.usuario_id] if con_usuario_id else []))
+        .join(Usuario, Usuario.id == m.usuario_id)
+        .order_by(m.id.desc())
+    )
+    return _filtrar(stmt, usuario_id, prioridad, m)
+
+def _select_filas(usuario_id=None, prioridad=None, limite=None, despues_de=None, archivo: bool = False,
+                  con_usuario_id: bool = False):
+    # Listado paginado. Con archivo=True se unen la tabla caliente y la de archivo,
+    # cada una con su propio keyset y LIMIT (usan sus índices), y SQLite mezcla las
+    # dos páginas ya ordenadas (MERGE UNION ALL); sin él sólo se toca la caliente.
+    if not archivo:
+        return _paginar(_select_join(usuario_id, prioridad, con_usuario_id=con_usuario_id), limite, despues_de)
+    stmt = union_all(*(select(_paginar(_select_join(usuario_id, prioridad, m, con_usuario_id), limite, despues_de, m)
+                              .subquery(nombre))
+                       for m, nombre in ((Incidencia, "caliente"), (IncidenciaArchivada, "archivada"))))
+    stmt = stmt.order_by(desc("id"))
+    return stmt.limit(limite) if limite is not None else stmt
+
+class FilaIncidencia(NamedTuple):
+    # Fila de listado: sólo lo que muestra tv_i, como tupla inmutable (sin estado ORM)
+    id: int
+    titulo: str
+    prioridad: str
+    estado: str
+    nombre: str
+
+@medido
+def listar_filas_incidencias(usuario_id: int | None = None, prioridad: str | None = None,
+                             limite: int | None = None, despues_de: int | None = None,
+                             archivo: bool = False) -> list[FilaIncidencia]:
+    # Proyección de listar_incidencias para los listados: mismos filtros y keyset.
+    # archivo=True incluye las incidencias archivadas.
+    with SessionLocal() as s:
+        res = s.execute(_select_filas(usuario_id, prioridad, limite, despues_de, archivo))
+        return list(map(FilaIncidencia._make, res.tuples()))
+
+@medido
+def listar_filas_indice(usuario_id: int | None = None, prioridad: str | None = None,
+                        limite: int | None = None, despues_de: int | None = None,
+                        archivo: bool = False) -> list[tuple]:
+    # Como listar_filas_incidencias con usuario_id al final de cada tupla: la UI
+    # carga por lotes su índice en memoria (indice.py), que filtra por usuario
+    with SessionLocal() as s:
+        return list(s.execute(_select_filas(usuario_id, prioridad, limite, despues_de, archivo, True)).tuples())
+
+@medido
+def contar_incidencias(usuario_id: int | None = None, prioridad: str | None = None,
+                       archivo: bool = False, tope: int | None = None) -> int:
+    # Cuántas cumplen los filtros. Con `tope` cuenta a lo más tope + 1 (LIMIT): a
+    # la UI le basta saber si caben en el índice en memoria antes de leerlas.
+    total = 0
+    with SessionLocal() as s:
+        for m in (Incidencia, IncidenciaArchivada) if archivo else (Incidencia,):
+            q = _filtrar(select(m.id), usuario_id, prioridad, m)
+            if tope is not None: q = q.limit(tope + 1 - total)
+            total += s.scalar(select(func.count()).select_from(q.subquery("contadas")))
+            if tope is not None and total > tope: break
+    return total
+
+@medido
+def incidencias_join_con_usuario(limite: int | None = None, despues_de: int | None = None, archivo: bool = False):
+    # archivo=True incluye las archivadas, como en listar_filas_incidencias
+    return listar_filas_incidencias(limite=limite, despues_de=despues_de, archivo=archivo)
+
+# ---------- BÚSQUEDA DE TEXTO (FTS5) ----------
+# Tabla virtual creada por la migración 8f41c2d9e6b3 y mantenida por triggers.
+# Sólo indexa la tabla caliente: las archivadas no aparecen en búsquedas.
+_fts = table("incidencias_fts", column("rowid"))
+_fts_rank = literal_column("incidencias_fts.rank")
+# bm25 se calcula por cada coincidencia y es lo caro de la búsqueda: se ordena por
+# relevancia de a MAX_CANDIDATOS coincidencias (una "ventana"), de las más
+# recientes a las más viejas (FTS5 las entrega por rowid DESC sin calcular rank
+# de las demás). Cuando una ventana se agota la búsqueda sigue con la anterior:
+# ninguna coincidencia queda fuera, sólo se ordena dentro de su ventana.
+MAX_CANDIDATOS = 2000
+
+def _consulta_fts(texto: str) -> str:
+    # Cada palabra va entre comillas (sin operadores FTS del usuario) y con * para
+    # buscar por prefijo; todas deben aparecer (AND implícito).
+    return " ".join('"' + p.replace('"', '""') + '"*' for p in texto.split())
+
+def _select_candidatas(consulta: str, usuario_id, prioridad, ventana=None):
+    # (id, rank) de las coincidencias de una ventana: las MAX_CANDIDATOS más
+    # recientes con rowid < ventana (None: las más recientes de todas). Sólo FTS,
+    # sin el JOIN a incidencias/usuarios, que se hace con las ya elegidas
+    stmt = (select(_fts.c.rowid.label("id"), _fts_rank.label("rank")).select_from(_fts)
+            .where(literal_column("incidencias_fts").op("MATCH")(consulta)))
+    if ventana is not None:
+        stmt = stmt.where(_fts.c.rowid < ventana)
+    if usuario_id:
+        # "+ 0" evita que SQLite pase el IN a FTS5 como rowid = ? por cada id: cada
+        # búsqueda así vuelve a calcular las estadísticas de bm25 sobre todas las
+        # coincidencias. Así es un solo recorrido, filtrado con los ids del usuario.
+        stmt = stmt.where((_fts.c.rowid + 0).in_(_filtrar(select(Incidencia.id), usuario_id, prioridad)))
+    elif prioridad:
+        stmt = stmt.join(Incidencia, Incidencia.id == _fts.c.rowid).where(Incidencia.prioridad == prioridad)
+    return stmt.order_by(_fts.c.rowid.desc()).limit(MAX_CANDIDATOS)
+
+def _select_busqueda(consulta: str, usuario_id, prioridad, limite, despues_de, ventana=None):
+    # Una página de una ventana; despues_de es (rank, id) dentro de la ventana
+    c = _select_candidatas(consulta, usuario_id, prioridad, ventana).subquery("candidatas")
+    stmt = (
+        select(Incidencia.id, Incidencia.titulo, Incidencia.prioridad, Incidencia.estado, Usuario.nombre, c.c.rank,
+               literal(ventana, Integer).label("ventana"))
+        .select_from(c)
+        .join(Incidencia, Incidencia.id == c.c.id)
+        .join(Usuario, Usuario.id == Incidencia.usuario_id)
+        .order_by(c.c.rank, c.c.id)
+    )
+    if despues_de is not None:
+        rank, inc_id = despues_de
+        stmt = stmt.where(or_(c.c.rank > rank, and_(c.c.rank == rank, c.c.id > inc_id)))
+    if limite is not None:
+        stmt = stmt.limit(limite)
+    return stmt
+
+def _select_ventana(consulta: str, usuario_id, prioridad, ventana):
+    # (menor id, cuántas) de una ventana: si está llena, la siguiente es rowid < menor id
+    c = _select_candidatas(consulta, usuario_id, prioridad, ventana).subquery("candidatas")
+    return select(func.min(c.c.id), func.count()).select_from(c)
+
+def _fin_de_ventana(filas, despues_de):
+    # (menor id, cuántas) de la ventana agotada si las filas la traen entera (página
+    # desde su inicio); None si hay que consultarlo con _select_ventana
+    return None if despues_de is not None else (min((f.id for f in filas), default=None), len(filas))
+
+@medido
+def buscar_incidencias(texto: str, usuario_id: int | None = None, prioridad: str | None = None,
+                       limite: int | None = 50, despues_de: tuple[int | None, float, int] | None = None):
+    # Filas (id, titulo, prioridad, estado, nombre, rank, ventana) ordenadas por
+    # relevancia (bm25: menor es mejor) dentro de cada ventana, y por ventana de
+    # la más reciente a la más vieja; si la página no se llena con una ventana,
+    # sigue con la anterior. Paginación keyset: despues_de es (ventana, rank, id)
+    # de la última fila de la página anterior.
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return []
+    ventana, despues = (despues_de[0], despues_de[1:]) if despues_de else (None, None)
+    res = []
     with SessionLocal() as s:
-        stmt = (
-            select(Incidencia.id, Incidencia.titulo, Incidencia.prioridad, Usuario.nombre)
-            .join(Usuario, Usuario.id == Incidencia.usuario_id)
-            .order_by(Incidencia.id.desc())
-        )
-        return s.execute(stmt).all()
+        while True:
+            falta = None if limite is None else limite - len(res)
+            filas = s.execute(_select_busqueda(consulta, usuario_id, prioridad, falta, despues, ventana)).all()
+            res += filas
+            if falta is not None and len(filas) == falta:
+                return res
+            piso, n = (_fin_de_ventana(filas, despues)
+                       or s.execute(_select_ventana(consulta, usuario_id, prioridad, ventana)).one())
+            if n < MAX_CANDIDATOS:
+                return res
+            ventana, despues = piso, None
+
+def _select_conteo_por_usuario():
+    # GROUP BY: cuántas incidencias por usuario. Suma los contadores precalculados
+    # (a lo más 3 filas por usuario) en vez de contar tickets, y agrupa por id para
+    # no mezclar usuarios con el mismo nombre. Como los contadores, cuenta sólo
+    # las activas: al archivar, el trigger de DELETE las descuenta.
+    return (
+        select(Usuario.id, Usuario.nombre, func.coalesce(func.sum(ResumenIncidencias.total), 0))
+        .join(ResumenIncidencias, ResumenIncidencias.usuario_id == Usuario.id, isouter=True)
+        .group_by(Usuario.nombre, Usuario.id)
+        .order_by(Usuario.nombre, Usuario.id)
+    )
 
+def _select_conteo_por_prioridad():
+    # GROUP BY: cuántas incidencias por prioridad (requerimiento 10b)
+    return (
+        select(ResumenIncidencias.prioridad, func.sum(ResumenIncidencias.total))
+        .group_by(ResumenIncidencias.prioridad)
+        .order_by(ResumenIncidencias.prioridad)
+    )
+
+@medido
 def conteo_incidencias_por_usuario():
-    # GROUP BY: cuántas incidencias por usuario
+    # [(usuario_id, nombre, total)]
+    with SessionLocal() as s:
+        return s.execute(_select_conteo_por_usuario()).all()
+
+@medido
+def conteo_incidencias_por_prioridad():
+    # [(prioridad, total)]
+    with SessionLocal() as s:
+        return s.execute(_select_conteo_por_prioridad()).all()
+
+# ---------- CAMBIOS DE OTRAS INSTANCIAS ----------
+MAX_CAMBIOS = 1000    # más que esto desde la última revisión: conviene recargar todo
+CONSERVAR_CAMBIOS = 10 * MAX_CAMBIOS    # seqs que podar_cambios deja en `cambios`
+_select_piso = select(PisoCambios.seq).where(PisoCambios.id == 1)
+
+class Cambios(NamedTuple):
+    seq: int                          # último seq visto; se pasa en la siguiente llamada
+    usuarios: list                    # filas (id, nombre, email) creadas o editadas
+    usuarios_borrados: list[int]
+    incidencias: list                 # filas (id, titulo, prioridad, estado, usuario_id) creadas o editadas
+    incidencias_borradas: list[int]
+    recargar: bool = False            # demasiados cambios, poda o la BD fue restaurada
+
+@medido
+def cambios_desde(seq: int | None) -> Cambios:
+    # Lo que cambió en usuarios/incidencias después de `seq` (registro `cambios`,
+    # escrito por triggers). Con seq=None sólo devuelve el punto de partida.
     with SessionLocal() as s:
-        stmt = (
-            select(Usuario.nombre, func.count(Incidencia.id))
-            .join(Incidencia, Incidencia.usuario_id == Usuario.id, isouter=True)
-            .group_by(Usuario.nombre)
-            .order_by(Usuario.nombre)
-        )
-        return s.execute(stmt).all()
+        ultimo = s.scalar(select(func.max(Cambio.seq))) or 0
+        if seq is None or ultimo <= seq:
+            # seq mayor que el último: la BD se restauró desde un respaldo
+            return Cambios(ultimo, [], [], [], [], seq is not None and ultimo < seq)
+        filas = s.execute(select(Cambio.tabla, Cambio.fila_id).where(Cambio.seq > seq, Cambio.seq <= ultimo)
+                          .limit(MAX_CAMBIOS + 1)).all()
+        # el piso se lee después de las filas: si una poda se coló entre medio, se ve aquí
+        if len(filas) > MAX_CAMBIOS or seq < s.scalar(_select_piso):
+            return Cambios(ultimo, [], [], [], [], True)
+        ids = {"usuarios": set(), "incidencias": set()}
+        for tabla, fila_id in filas: ids[tabla].add(fila_id)
+        usuarios = s.execute(select(Usuario.id, Usuario.nombre, Usuario.email)
+                             .where(Usuario.id.in_(ids["usuarios"]))).all() if ids["usuarios"] else []
+        incs = s.execute(select(Incidencia.id, Incidencia.titulo, Incidencia.prioridad, Incidencia.estado,
+                                Incidencia.usuario_id)
+                         .where(Incidencia.id.in_(ids["incidencias"]))
+                         .order_by(Incidencia.id)).all() if ids["incidencias"] else []
+    # lo que ya no está en su tabla fue borrado (o archivado)
+    return Cambios(ultimo, usuarios, sorted(ids["usuarios"] - {u.id for u in usuarios}),
+                   incs, sorted(ids["incidencias"] - {i.id for i in incs}))
+
+@medido
+def podar_cambios(conservar: int = CONSERVAR_CAMBIOS) -> int:
+    # Borra de `cambios` lo anterior a los últimos `conservar` seq (>= 1: la fila
+    # más nueva queda, cambios_desde necesita el máximo) y sube el piso. Sólo
+    # escribe cuando el registro pasó del doble, así se puede llamar seguido.
+    # Devuelve cuántas filas borró.
+    with SessionLocal() as s, s.begin():
+        ultimo = s.scalar(select(func.max(Cambio.seq))) or 0
+        piso = s.scalar(_select_piso)
+        if ultimo - piso <= 2 * conservar:
+            return 0
+        piso = ultimo - conservar
+        borradas = s.execute(delete(Cambio).where(Cambio.seq <= piso)).rowcount
+        s.execute(update(PisoCambios).where(PisoCambios.id == 1).values(seq=piso))
+    return borradas
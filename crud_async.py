@@ -0,0 +1,178 @@
+# Variante asyncio de crud.py para embeber en un servicio (p. ej. un API web interno).
+# Mismos modelos y mismas sentencias que crud.py, sobre un engine aiosqlite con
+# pool de conexiones: cada corrutina toma su propia conexión, así varias lecturas
+# avanzan a la vez. Las escrituras reutilizan crud.UnidadDeTrabajo con run_sync
+# (misma validación por FK/UNIQUE, RETURNING y actualización de directorio.py).
+#
+# Requiere `aiosqlite` y greenlet (pip install "sqlalchemy[asyncio]" aiosqlite).
+# Con un escritor activo en el mismo equipo conviene TICKETS_DB_PERFIL=concurrente (WAL) para que
+# las lecturas no esperen el lock.
+#
+#   async with unidad_de_trabajo() as uow:
+#       for t in tickets: await uow.crear_incidencia(*t)
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import undefer
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from crud import (
+    FilaIncidencia, UnidadDeTrabajo, MAX_CANDIDATOS, _selects_incidencias, _mezclar, _select_filas, _consulta_fts,
+    _select_busqueda, _select_ventana, _fin_de_ventana, _select_conteo_por_usuario, _select_conteo_por_prioridad,
+)
+from db import DB_PATH
+from instrumentacion import ACTIVO, instrumentar, medido_async
+from models import Usuario, Incidencia, ESTADOS
+
+# el dialecto sqlite+aiosqlite importa aiosqlite al crear el engine
+if importlib.util.find_spec("aiosqlite") is None:
+    raise ImportError("crud_async requiere el paquete 'aiosqlite' (pip install aiosqlite).")
+
+# Conexiones del pool; cada lectura en vuelo ocupa una mientras se ejecuta
+TAM_POOL = int(os.environ.get("TICKETS_ASYNC_POOL", 8))
+
+def crear_engine(ruta=DB_PATH, tam_pool: int = TAM_POOL):
+    # Los PRAGMAs del perfil (db.py) se aplican por el listener "connect" de Engine
+    eng = create_async_engine(f"sqlite+aiosqlite:///{Path(ruta).as_posix()}", poolclass=AsyncAdaptedQueuePool,
+                              pool_size=tam_pool, max_overflow=tam_pool)
+    if ACTIVO:
+        instrumentar(eng.sync_engine)
+    return eng
+
+engine = crear_engine()
+SessionAsync = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# ---------- UNIDAD DE TRABAJO ----------
+class UnidadDeTrabajoAsync:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    async def _uow(self, metodo, *args, **kwargs):
+        return await self.s.run_sync(lambda s: getattr(UnidadDeTrabajo(s), metodo)(*args, **kwargs))
+
+    async def crear_usuario(self, nombre: str, email: str):
+        return await self._uow("crear_usuario", nombre, email)
+
+    async def editar_usuario(self, usuario_id: int, nombre: str, email: str):
+        return await self._uow("editar_usuario", usuario_id, nombre, email)
+
+    async def eliminar_usuario(self, usuario_id: int) -> bool:
+        return await self._uow("eliminar_usuario", usuario_id)
+
+    async def crear_incidencia(self, titulo: str, descripcion: str, prioridad: str, usuario_id: int,
+                               estado: str = ESTADOS[0]):
+        return await self._uow("crear_incidencia", titulo, descripcion, prioridad, usuario_id, estado)
+
+    async def editar_incidencia(self, inc_id: int, **campos):
+        return await self._uow("editar_incidencia", inc_id, **campos)
+
+    async def eliminar_incidencia(self, inc_id: int) -> bool:
+        return await self._uow("eliminar_incidencia", inc_id)
+
+@asynccontextmanager
+async def unidad_de_trabajo():
+    async with SessionAsync() as s, s.begin():
+        yield UnidadDeTrabajoAsync(s)
+
+# ---------- USUARIOS ----------
+@medido_async
+async def crear_usuario(nombre: str, email: str):
+    async with unidad_de_trabajo() as uow:
+        return await uow.crear_usuario(nombre, email)
+
+@medido_async
+async def listar_usuarios():
+    async with SessionAsync() as s:
+        return list(await s.scalars(select(Usuario).order_by(Usuario.nombre)))
+
+@medido_async
+async def obtener_usuario(usuario_id: int):
+    async with SessionAsync() as s:
+        return await s.get(Usuario, usuario_id)
+
+@medido_async
+async def editar_usuario(usuario_id: int, nombre: str, email: str):
+    async with unidad_de_trabajo() as uow:
+        return await uow.editar_usuario(usuario_id, nombre, email)
+
+@medido_async
+async def eliminar_usuario(usuario_id: int):
+    async with unidad_de_trabajo() as uow:
+        return await uow.eliminar_usuario(usuario_id)
+
+# ---------- INCIDENCIAS ----------
+@medido_async
+async def crear_incidencia(titulo: str, descripcion: str, prioridad: str, usuario_id: int, estado: str = ESTADOS[0]):
+    async with unidad_de_trabajo() as uow:
+        return await uow.crear_incidencia(titulo, descripcion, prioridad, usuario_id, estado)
+
+@medido_async
+async def listar_incidencias(usuario_id: int | None = None, prioridad: str | None = None,
+                             limite: int | None = None, despues_de: int | None = None, archivo: bool = False):
+    async with SessionAsync() as s:
+        return _mezclar([list(await s.scalars(q)) for q in _selects_incidencias(usuario_id, prioridad, limite,
+                                                                                despues_de, archivo)], limite)
+
+@medido_async
+async def listar_filas_incidencias(usuario_id: int | None = None, prioridad: str | None = None,
+                                   limite: int | None = None, despues_de: int | None = None,
+                                   archivo: bool = False) -> list[FilaIncidencia]:
+    async with SessionAsync() as s:
+        res = await s.execute(_select_filas(usuario_id, prioridad, limite, despues_de, archivo))
+        return list(map(FilaIncidencia._make, res.tuples()))
+
+@medido_async
+async def obtener_incidencia(inc_id: int):
+    async with SessionAsync() as s:
+        return await s.get(Incidencia, inc_id, options=[undefer(Incidencia.descripcion)])
+
+@medido_async
+async def editar_incidencia(inc_id: int, **campos):
+    async with unidad_de_trabajo() as uow:
+        return await uow.editar_incidencia(inc_id, **campos)
+
+@medido_async
+async def eliminar_incidencia(inc_id: int):
+    async with unidad_de_trabajo() as uow:
+        return await uow.eliminar_incidencia(inc_id)
+
+# ---------- CONSULTAS ESPECIALES ----------
+@medido_async
+async def incidencias_join_con_usuario(limite: int | None = None, despues_de: int | None = None,
+                                       archivo: bool = False):
+    return await listar_filas_incidencias(limite=limite, despues_de=despues_de, archivo=archivo)
+
+@medido_async
+async def buscar_incidencias(texto: str, usuario_id: int | None = None, prioridad: str | None = None,
+                             limite: int | None = 50, despues_de: tuple[int | None, float, int] | None = None):
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return []
+    ventana, despues = (despues_de[0], despues_de[1:]) if despues_de else (None, None)
+    res = []
+    async with SessionAsync() as s:
+        while True:
+            falta = None if limite is None else limite - len(res)
+            filas = (await s.execute(_select_busqueda(consulta, usuario_id, prioridad, falta, despues, ventana))).all()
+            res += filas
+            if falta is not None and len(filas) == falta:
+                return res
+            piso, n = (_fin_de_ventana(filas, despues)
+                       or (await s.execute(_select_ventana(consulta, usuario_id, prioridad, ventana))).one())
+            if n < MAX_CANDIDATOS:
+                return res
+            ventana, despues = piso, None
+
+@medido_async
+async def conteo_incidencias_por_usuario():
+    async with SessionAsync() as s:
+        return (await s.execute(_select_conteo_por_usuario())).all()
+
+@medido_async
+async def conteo_incidencias_por_prioridad():
+    async with SessionAsync() as s:
+        return (await s.execute(_select_conteo_por_prioridad())).all()
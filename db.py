@@ -1,18 +1,60 @@
+import os
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from pathlib import Path
+from instrumentacion import ACTIVO, instrumentar
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "app.db"
+DB_PATH = Path(os.environ.get("TICKETS_DB", BASE_DIR / "app.db"))
 DATABASE_URL = f"sqlite:///{DB_PATH.as_posix()}"
 
+# Perfiles de PRAGMAs por conexión. "local" es el comportamiento original (un solo
+# proceso). "concurrente" es para varios procesos en el MISMO equipo: WAL deja
+# leer mientras alguien escribe y busy_timeout espera el lock en vez de fallar
+# con "database is locked". WAL necesita memoria compartida entre los procesos
+# y SQLite no lo soporta sobre carpetas de red (SMB/NFS): con app.db en una
+# carpeta compartida por varias PCs se usa "red" (journal DELETE y
+# busy_timeout), nunca "concurrente".
+PERFILES = {
+    "local": {},
+    "red": {
+        "journal_mode": "DELETE",      # deshace un WAL que haya quedado activo (es persistente)
+        "busy_timeout": 5000,          # ms
+    },
+    "concurrente": {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,          # ms
+        "synchronous": "NORMAL",       # seguro con WAL; fsync sólo en checkpoint
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,      # negativo = KiB (64 MiB)
+    },
+}
+# Se elige con TICKETS_DB_PERFIL; cada PRAGMA puede sobreescribirse con
+# TICKETS_PRAGMA_<NOMBRE> (p. ej. TICKETS_PRAGMA_BUSY_TIMEOUT=10000).
+PERFIL = os.environ.get("TICKETS_DB_PERFIL", "local")
+if PERFIL not in PERFILES:
+    raise ValueError(f"Perfil de BD desconocido: {PERFIL!r} (opciones: {', '.join(PERFILES)})")
+
+def pragmas_perfil(perfil: str = PERFIL) -> dict:
+    pragmas = dict(PERFILES[perfil])
+    for k, v in os.environ.items():
+        if k.startswith("TICKETS_PRAGMA_"):
+            pragmas[k.removeprefix("TICKETS_PRAGMA_").lower()] = v
+    return pragmas
+
+PRAGMAS = pragmas_perfil()
+
 engine = create_engine(DATABASE_URL, future=True, echo=False)
+if ACTIVO:
+    instrumentar(engine)   # latencias por sentencia y bitácora de lentas
 
 @event.listens_for(Engine, "connect")
-def _fk_on(conn, _):
+def _pragmas_on(conn, _):
     cur = conn.cursor()
     cur.execute("PRAGMA foreign_keys=ON")
+    for nombre, valor in PRAGMAS.items():
+        cur.execute(f"PRAGMA {nombre}={valor}")
     cur.close()
 
 SessionLocal = sessionmaker(bind=engine, future=True, autoflush=False, expire_on_commit=False)
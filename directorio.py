@@ -0,0 +1,114 @@
+# Directorio de usuarios en memoria para la UI (combos, nombre en el listado).
+# Búsqueda O(1) por id y por email, índice ordenado por nombre normalizado para
+# autocompletar por prefijo (bisect) y memoria acotada a CAPACIDAD entradas: si
+# hay más usuarios, se cargan los primeros por nombre y el resto se descarta por
+# antigüedad de uso (LRU).
+#
+# Escritura directa: crud anota en la sesión cada alta/edición/baja de usuario
+# (registrar) y el directorio la aplica cuando esa transacción hace commit; si
+# hay rollback se descarta (crud registra aplicar/descartar como eventos de
+# Session). Así no hace falta volver a listar usuarios tras cada cambio.
+# No importa SQLAlchemy: la UI lo usa desde el arranque.
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict, namedtuple
+
+CAPACIDAD = 50_000
+LIMITE_PREFIJO = 200     # coincidencias que se devuelven por consulta de prefijo
+
+UsuarioDir = namedtuple("UsuarioDir", "id nombre email")
+
+def normalizar(texto: str) -> str:
+    # sin mayúsculas ni acentos: "José" y "jose" comparten prefijo
+    t = texto.strip().casefold()
+    if t.isascii(): return t     # lo habitual: nada que descomponer
+    t = unicodedata.normalize("NFKD", t)
+    return "".join(c for c in t if not unicodedata.combining(c))
+
+def _entrada(u) -> UsuarioDir:
+    if isinstance(u, UsuarioDir): return u
+    if isinstance(u, tuple): return UsuarioDir(*u)
+    return UsuarioDir(u.id, u.nombre, u.email)    # Usuario del ORM o Row de crud
+
+class Directorio:
+    def __init__(self, capacidad: int = CAPACIDAD):
+        self.capacidad = capacidad
+        self.completo = False    # True si contiene a todos los usuarios de la BD
+        self.version = 0         # cambia con cada modificación
+        self._lock = threading.RLock()   # crud lo actualiza desde los hilos del Ejecutor
+        self._por_id: OrderedDict[int, UsuarioDir] = OrderedDict()
+        self._por_email: dict[str, int] = {}
+        self._nombres: list[tuple[str, int]] = []    # (nombre normalizado, id), ordenada
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def cargar(self, usuarios, completo: bool = True):
+        with self._lock:
+            self._por_id.clear(); self._por_email.clear()
+            for u in usuarios:
+                if len(self._por_id) >= self.capacidad:
+                    completo = False; break
+                e = _entrada(u); self._por_id[e.id] = e; self._por_email[e.email] = e.id
+            self._nombres = sorted((normalizar(e.nombre), e.id) for e in self._por_id.values())
+            self.completo = completo; self.version += 1
+
+    def poner(self, u):
+        e = _entrada(u)
+        with self._lock:
+            self._quitar(e.id)
+            if len(self._por_id) >= self.capacidad:
+                self._quitar(next(iter(self._por_id))); self.completo = False
+            self._por_id[e.id] = e; self._por_email[e.email] = e.id
+            insort(self._nombres, (normalizar(e.nombre), e.id))
+            self.version += 1
+
+    def quitar(self, usuario_id: int):
+        with self._lock:
+            self._quitar(usuario_id); self.version += 1
+
+    def _quitar(self, usuario_id):
+        e = self._por_id.pop(usuario_id, None)
+        if e is None: return
+        if self._por_email.get(e.email) == usuario_id: del self._por_email[e.email]
+        i = bisect_left(self._nombres, (normalizar(e.nombre), usuario_id))
+        if i < len(self._nombres) and self._nombres[i][1] == usuario_id: del self._nombres[i]
+
+    def por_id(self, usuario_id) -> UsuarioDir | None:
+        with self._lock:
+            e = self._por_id.get(usuario_id)
+            if e is not None: self._por_id.move_to_end(usuario_id)
+            return e
+
+    def por_email(self, email: str) -> UsuarioDir | None:
+        with self._lock:
+            uid = self._por_email.get(email.strip().lower())
+            return None if uid is None else self.por_id(uid)
+
+    def prefijo(self, texto: str = "", limite: int = LIMITE_PREFIJO) -> list[UsuarioDir]:
+        # Usuarios cuyo nombre empieza con `texto`, en orden alfabético
+        p = normalizar(texto)
+        with self._lock:
+            i = bisect_left(self._nombres, (p,)); res = []
+            while i < len(self._nombres) and len(res) < limite and self._nombres[i][0].startswith(p):
+                res.append(self._por_id[self._nombres[i][1]]); i += 1
+            return res
+
+directorio = Directorio()
+
+# ---------- escritura directa desde crud ----------
+def registrar(session, usuario=None, quitar: int | None = None):
+    # Anota un cambio de usuario en la sesión; se aplica sólo si hace commit
+    cambio = ("quitar", quitar) if quitar is not None else ("poner", _entrada(usuario))
+    session.info.setdefault("directorio", []).append(cambio)
+
+def aplicar(session):
+    # evento after_commit de Session
+    for accion, dato in session.info.pop("directorio", ()):
+        if accion == "poner": directorio.poner(dato)
+        else: directorio.quitar(dato)
+
+def descartar(session):
+    # evento after_rollback de Session
+    session.info.pop("directorio", None)
@@ -0,0 +1,150 @@
+# Prueba de estrés multiproceso del perfil de BD (ver db.PERFILES).
+# Levanta un escritor que repite transacciones de escritura (muchos commits por
+# corrida) y varios lectores que listan incidencias sin parar, todos sobre la
+# misma BD temporal. Cada transacción escribe más páginas de las que caben en la
+# caché del escritor, como una importación o un archivado grandes: en modo
+# rollback-journal ("local") eso toma el lock exclusivo hasta el commit y los
+# lectores esperan; con el perfil "concurrente" (WAL) no deben quedar bloqueados.
+# Con --comparar se corren ambos perfiles, se muestran lado a lado y la prueba
+# falla también si "local" no sale peor: entonces no demostró nada.
+# Todos los procesos corren en este equipo: no dice nada de app.db en una carpeta
+# de red, donde WAL no está soportado (ver db.PERFILES, perfil "red").
+#
+#   python estres_concurrencia.py --lectores 4 --segundos 5 --comparar
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# db/crud se importan dentro de cada proceso, después de fijar TICKETS_DB y
+# TICKETS_DB_PERFIL, porque el engine se crea al importar db.
+
+def _entorno(ruta, perfil):
+    os.environ["TICKETS_DB"] = str(ruta); os.environ["TICKETS_DB_PERFIL"] = perfil
+
+def _preparar(ruta, perfil, usuarios=50, incidencias=20000):
+    _entorno(ruta, perfil)
+    from sqlalchemy import insert
+    from db import engine
+    from models import Base, Usuario, Incidencia
+    Base.metadata.create_all(engine)
+    with engine.begin() as c:
+        c.execute(insert(Usuario), [{"nombre": f"U{i}", "email": f"u{i}@estres"} for i in range(usuarios)])
+        c.execute(insert(Incidencia), [{"titulo": f"t{i}", "descripcion": "d", "prioridad": "Media",
+                                        "usuario_id": 1 + i % usuarios} for i in range(incidencias)])
+    engine.dispose()
+
+def _escritor(ruta, perfil, fin, retencion, filas, cache_kib, salida):
+    _entorno(ruta, perfil)
+    from sqlalchemy import insert
+    from sqlalchemy.exc import OperationalError
+    from db import SessionLocal
+    from models import Incidencia
+    commits = errores = 0; tiempos = []
+    while time.time() < fin:
+        t0 = time.perf_counter()
+        try:
+            with SessionLocal() as s, s.begin():
+                # caché chica: la transacción no cabe y se vuelca al archivo antes del commit
+                s.connection().exec_driver_sql(f"PRAGMA cache_size=-{cache_kib}")
+                s.execute(insert(Incidencia), [{"titulo": "w", "descripcion": "x" * 200, "prioridad": "Alta",
+                                                "usuario_id": 1}] * filas)
+                time.sleep(retencion)   # transacción de escritura abierta
+            commits += 1
+        except OperationalError:
+            errores += 1
+        tiempos.append(time.perf_counter() - t0)
+    salida.put(("escritor", commits, errores, tiempos))
+
+def _lector(ruta, perfil, fin, salida):
+    _entorno(ruta, perfil)
+    from sqlalchemy.exc import OperationalError
+    import crud
+    ok = errores = 0; tiempos = []
+    while time.time() < fin:
+        t0 = time.perf_counter()
+        try:
+            crud.listar_incidencias(prioridad="Alta", limite=50)
+            crud.conteo_incidencias_por_usuario()
+            ok += 1
+        except OperationalError:
+            errores += 1
+        tiempos.append(time.perf_counter() - t0)
+    salida.put(("lector", ok, errores, tiempos))
+
+def correr(perfil, lectores=4, segundos=5.0, retencion=0.3, filas=2000, cache_kib=256):
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "estres.db"
+        p = ctx.Process(target=_preparar, args=(ruta, perfil)); p.start(); p.join()
+        salida = ctx.Queue()
+        fin = time.time() + 1.5 + segundos   # margen para el arranque de los procesos
+        procs = [ctx.Process(target=_escritor, args=(ruta, perfil, fin, retencion, filas, cache_kib, salida))]
+        procs += [ctx.Process(target=_lector, args=(ruta, perfil, fin, salida)) for _ in range(lectores)]
+        for pr in procs: pr.start()
+        resultados = [salida.get() for _ in procs]
+        for pr in procs: pr.join()
+    lect = [r for r in resultados if r[0] == "lector"]
+    esc = next(r for r in resultados if r[0] == "escritor")
+    t_lect = [t for r in lect for t in r[3]] or [0.0]
+    return {
+        "perfil": perfil,
+        "lecturas": sum(r[1] for r in lect), "errores_lectura": sum(r[2] for r in lect),
+        "lectura_p50_ms": statistics.median(t_lect) * 1000,
+        "lectura_max_ms": max(t_lect) * 1000,
+        # un lector que esperó al escritor tarda al menos lo que dura la retención
+        "lecturas_bloqueadas": sum(t >= retencion for t in t_lect),
+        "commits": esc[1], "errores_escritura": esc[2],
+        "escritura_max_ms": max(esc[3] or [0.0]) * 1000,
+        "retencion_ms": retencion * 1000,
+    }
+
+def _imprimir(res):
+    print(f"{'perfil':<12} {'lecturas':>8} {'errores':>7} {'p50 ms':>7} {'max ms':>8} {'bloqueadas':>10} | "
+          f"{'commits':>7} {'errores':>7} {'max ms':>8}")
+    for r in res:
+        print(f"{r['perfil']:<12} {r['lecturas']:>8} {r['errores_lectura']:>7} {r['lectura_p50_ms']:>7.1f} "
+              f"{r['lectura_max_ms']:>8.1f} {r['lecturas_bloqueadas']:>10} | "
+              f"{r['commits']:>7} {r['errores_escritura']:>7} {r['escritura_max_ms']:>8.1f}")
+
+def _bloqueado(r):
+    return r["errores_lectura"] > 0 or r["lecturas_bloqueadas"] > 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Estrés de lectores concurrentes contra un escritor.")
+    ap.add_argument("--perfil", default="concurrente")
+    ap.add_argument("--lectores", type=int, default=4)
+    ap.add_argument("--segundos", type=float, default=5.0)
+    ap.add_argument("--retencion-ms", type=float, default=300, help="tiempo que el escritor mantiene la transacción")
+    ap.add_argument("--filas", type=int, default=2000, help="filas por transacción (una transacción por commit)")
+    ap.add_argument("--cache-kib", type=int, default=256,
+                    help="caché del escritor; con menos que lo que escribe la transacción, "
+                         "el modo rollback-journal pasa a lock exclusivo antes del commit")
+    ap.add_argument("--comparar", action="store_true", help="corre también el perfil local")
+    args = ap.parse_args(argv)
+    perfiles = ["local", args.perfil] if args.comparar and args.perfil != "local" else [args.perfil]
+    res = {p: correr(p, args.lectores, args.segundos, args.retencion_ms / 1000, args.filas, args.cache_kib)
+           for p in perfiles}
+    _imprimir(res.values())
+    fallas = []
+    if _bloqueado(res[args.perfil]):
+        fallas.append(f"con el perfil {args.perfil!r} los lectores quedaron bloqueados por el escritor")
+    if len(res) > 1:
+        local, perfil = res["local"], res[args.perfil]
+        if not (_bloqueado(local) and local["lectura_max_ms"] > perfil["lectura_max_ms"]
+                and local["lecturas_bloqueadas"] + local["errores_lectura"]
+                > perfil["lecturas_bloqueadas"] + perfil["errores_lectura"]):
+            fallas.append("el perfil local no salió peor: la prueba no distingue los perfiles "
+                          "(suba --filas o --retencion-ms, o baje --cache-kib)")
+    for f in fallas: print(f"FALLA: {f}.")
+    if not fallas:
+        print("OK: los lectores no se bloquean con un escritor activo"
+              + (" y con el perfil local sí." if len(res) > 1 else "."))
+    return 1 if fallas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
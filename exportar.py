@@ -0,0 +1,81 @@
+# Exportación en streaming del listado JOIN y de los reportes a CSV/JSONL.
+# Las filas se leen con yield_per (cursor del lado del servidor) y se escriben
+# conforme llegan, así que la memoria no crece con el número de incidencias.
+#
+#   python exportar.py incidencias.csv --prioridad Alta
+#   python exportar.py conteo.jsonl --reporte conteo_por_usuario
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from crud import _select_filas, _select_conteo_por_usuario, _select_conteo_por_prioridad
+from db import SessionLocal
+
+FORMATOS = ("csv", "jsonl")
+TAM_LOTE = 1000
+
+COLUMNAS_JOIN = ("id", "titulo", "prioridad", "estado", "usuario")
+COLUMNAS_CONTEO = ("usuario_id", "usuario", "incidencias")
+COLUMNAS_PRIORIDAD = ("prioridad", "incidencias")
+
+def _formato(ruta, formato):
+    formato = (formato or Path(ruta).suffix.lstrip(".") or "csv").lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return formato
+
+def _escribir(stmt, ruta, columnas, formato, tam_lote, on_progreso):
+    formato = _formato(ruta, formato)
+    n = 0
+    with SessionLocal() as s, open(ruta, "w", newline="", encoding="utf-8") as f:
+        filas = s.execute(stmt, execution_options={"yield_per": tam_lote, "stream_results": True})
+        w = csv.writer(f) if formato == "csv" else None
+        if w: w.writerow(columnas)
+        for fila in filas:
+            if w: w.writerow(fila)
+            else: f.write(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + "\n")
+            n += 1
+            if on_progreso and n % tam_lote == 0: on_progreso(n)
+    if on_progreso: on_progreso(n)
+    return n
+
+def exportar_incidencias(ruta, formato: str | None = None, usuario_id: int | None = None,
+                         prioridad: str | None = None, tam_lote: int = TAM_LOTE, on_progreso=None,
+                         archivo: bool = False):
+    # Listado JOIN con los mismos filtros que listar_filas_incidencias (archivo=True
+    # incluye las archivadas); devuelve filas escritas
+    return _escribir(_select_filas(usuario_id, prioridad, archivo=archivo), ruta, COLUMNAS_JOIN, formato,
+                     tam_lote, on_progreso)
+
+def exportar_conteo_por_usuario(ruta, formato: str | None = None, tam_lote: int = TAM_LOTE, on_progreso=None):
+    return _escribir(_select_conteo_por_usuario(), ruta, COLUMNAS_CONTEO, formato, tam_lote, on_progreso)
+
+def exportar_conteo_por_prioridad(ruta, formato: str | None = None, tam_lote: int = TAM_LOTE, on_progreso=None):
+    return _escribir(_select_conteo_por_prioridad(), ruta, COLUMNAS_PRIORIDAD, formato, tam_lote, on_progreso)
+
+REPORTES = {
+    "incidencias": exportar_incidencias,
+    "conteo_por_usuario": exportar_conteo_por_usuario,
+    "conteo_por_prioridad": exportar_conteo_por_prioridad,
+}
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporta listados y reportes a CSV/JSONL.")
+    ap.add_argument("archivo")
+    ap.add_argument("--reporte", choices=tuple(REPORTES), default="incidencias")
+    ap.add_argument("--formato", choices=FORMATOS, help="por defecto, según la extensión")
+    ap.add_argument("--usuario", type=int, help="id de usuario (sólo incidencias)")
+    ap.add_argument("--prioridad", choices=("Baja", "Media", "Alta"), help="sólo incidencias")
+    ap.add_argument("--archivo", action="store_true", help="incluye las archivadas (sólo incidencias)")
+    args = ap.parse_args(argv)
+    kw = ({"usuario_id": args.usuario, "prioridad": args.prioridad, "archivo": args.archivo}
+          if args.reporte == "incidencias" else {})
+    n = REPORTES[args.reporte](args.archivo, args.formato, **kw)
+    print(f"{n} filas exportadas a {args.archivo}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
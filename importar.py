@@ -0,0 +1,230 @@
+# Importación masiva de usuarios e incidencias desde CSV/JSONL.
+# Lee el archivo en streaming, agrupa en lotes y cada lote se inserta con un
+# solo executemany dentro de su propia transacción. Los errores (email repetido,
+# usuario inexistente, campos vacíos) se reportan por registro sin abortar la carga.
+#
+#   python importar.py usuarios usuarios.csv --lote 5000
+#   python importar.py incidencias tickets.jsonl
+#
+# Incidencias: titulo, descripcion, prioridad y usuario_email o usuario_id; opcionales
+# estado (Abierta por defecto), creado_en y cerrado_en en ISO 8601 (UTC si no
+# traen zona), para traer tickets viejos con sus fechas.
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from crud import podar_cambios
+from db import SessionLocal
+from models import Usuario, Incidencia, ESTADOS, CERRADA
+
+PRIORIDADES = ("Baja", "Media", "Alta")
+TAM_LOTE = 1000
+
+@dataclass
+class ResultadoImportacion:
+    leidos: int = 0
+    insertados: int = 0
+    rechazados: int = 0
+    segundos: float = 0.0
+    errores: list = field(default_factory=list)   # (n_registro, motivo) si no hay on_error
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.leidos / self.segundos if self.segundos else 0.0
+
+@dataclass
+class RegistroInvalido:
+    # Registro que no se pudo leer (p. ej. una línea JSONL mal formada): el
+    # importador lo cuenta y lo reporta como error de ese registro, y sigue
+    motivo: str
+
+# ---------- Lectura ----------
+def leer_registros(ruta):
+    # Generador de dicts; el formato se decide por extensión (.csv / .jsonl)
+    ruta = Path(ruta)
+    # utf-8-sig: Excel ("CSV UTF-8") y el Bloc de notas anteponen un BOM; con utf-8 a
+    # secas quedaría pegado al primer encabezado ("\ufeffnombre")
+    with open(ruta, newline="", encoding="utf-8-sig") as f:
+        if ruta.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for i, linea in enumerate(f, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    reg = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield RegistroInvalido(f"Línea {i}: JSON inválido ({e.msg})."); continue
+                yield reg if isinstance(reg, dict) else RegistroInvalido(f"Línea {i}: se esperaba un objeto JSON.")
+
+def _lotes(registros, tam):
+    it = iter(registros)
+    while lote := list(islice(it, tam)):
+        yield lote
+
+def _texto(reg, campo):
+    return str(reg.get(campo) or "").strip()
+
+def _ref_usuario(reg):
+    # (email, None) si el registro trae usuario_email; si no, (None, usuario_id)
+    email = _texto(reg, "usuario_email").lower()
+    if email:
+        return email, None
+    uid = _texto(reg, "usuario_id")
+    return None, int(uid) if uid.isdigit() else None
+
+def _fecha(reg, campo):
+    # datetime UTC sin zona (como CURRENT_TIMESTAMP) o None si no viene; ValueError si no es ISO 8601
+    t = _texto(reg, campo)
+    if not t:
+        return None
+    d = datetime.fromisoformat(t)
+    return d.astimezone(timezone.utc).replace(tzinfo=None) if d.tzinfo else d
+
+# ---------- Carga ----------
+class _Carga:
+    # Lleva contadores, reporte de errores y progreso comunes a ambas importaciones
+    def __init__(self, on_error, on_progreso):
+        self.res = ResultadoImportacion()
+        self.on_error = on_error; self.on_progreso = on_progreso
+        self.t0 = time.perf_counter()
+
+    def error(self, n, motivo):
+        self.res.rechazados += 1
+        if self.on_error: self.on_error(n, motivo)
+        else: self.res.errores.append((n, motivo))
+
+    def fin_lote(self, leidos, insertados):
+        self.res.leidos += leidos; self.res.insertados += insertados
+        self.res.segundos = time.perf_counter() - self.t0
+        if self.on_progreso: self.on_progreso(self.res)
+
+def _insertar_lote(s, tabla, filas, carga, motivo_integridad):
+    # filas: [(n_registro, valores)]. Primero todo junto con executemany; si la BD
+    # rechaza el lote (p. ej. otro proceso insertó el mismo email), se reintenta
+    # fila por fila con SAVEPOINT para reportar sólo las que fallan.
+    if not filas:
+        return 0
+    try:
+        with s.begin_nested():
+            s.execute(insert(tabla), [v for _, v in filas])
+        return len(filas)
+    except IntegrityError:
+        ok = 0
+        for n, v in filas:
+            try:
+                with s.begin_nested():
+                    s.execute(insert(tabla), [v])
+                ok += 1
+            except IntegrityError:
+                carga.error(n, motivo_integridad)
+        return ok
+
+def importar_usuarios(registros, tam_lote: int = TAM_LOTE, on_error=None, on_progreso=None):
+    carga = _Carga(on_error, on_progreso)
+    n = 0
+    for lote in _lotes(registros, tam_lote):
+        validos = {}
+        for reg in lote:
+            n += 1
+            if isinstance(reg, RegistroInvalido):
+                carga.error(n, reg.motivo); continue
+            nombre, email = _texto(reg, "nombre"), _texto(reg, "email").lower()
+            if not nombre or not email:
+                carga.error(n, "Nombre y email son obligatorios."); continue
+            if email in validos:
+                carga.error(n, "El email ya existe."); continue
+            validos[email] = (n, {"nombre": nombre, "email": email})
+        with SessionLocal() as s, s.begin():
+            # una sola consulta por lote para detectar emails ya registrados
+            existentes = set(s.scalars(select(Usuario.email).where(Usuario.email.in_(validos))))
+            filas = []
+            for email, (i, v) in validos.items():
+                if email in existentes: carga.error(i, "El email ya existe.")
+                else: filas.append((i, v))
+            ok = _insertar_lote(s, Usuario.__table__, filas, carga, "El email ya existe.")
+        carga.fin_lote(len(lote), ok)
+    return carga.res
+
+def importar_incidencias(registros, tam_lote: int = TAM_LOTE, on_error=None, on_progreso=None):
+    # Cada registro trae usuario_email o usuario_id para asignar el ticket
+    carga = _Carga(on_error, on_progreso)
+    n = 0
+    for lote in _lotes(registros, tam_lote):
+        pendientes = []
+        # executemany necesita las mismas columnas en todas las filas: las fechas que
+        # no vienen se ponen aquí en vez de dejarlas al default de la BD
+        ahora = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        for reg in lote:
+            n += 1
+            if isinstance(reg, RegistroInvalido):
+                carga.error(n, reg.motivo); continue
+            titulo, desc, prio = _texto(reg, "titulo"), _texto(reg, "descripcion"), _texto(reg, "prioridad")
+            if not titulo or not desc:
+                carga.error(n, "Título y descripción son obligatorios."); continue
+            if prio not in PRIORIDADES:
+                carga.error(n, f"Prioridad inválida: {prio!r}."); continue
+            estado = _texto(reg, "estado") or ESTADOS[0]
+            if estado not in ESTADOS:
+                carga.error(n, f"Estado inválido: {estado!r}."); continue
+            try:
+                creado, cerrado = _fecha(reg, "creado_en"), _fecha(reg, "cerrado_en")
+            except ValueError:
+                carga.error(n, "Fecha inválida: se espera ISO 8601 (p. ej. 2024-05-31 14:00:00)."); continue
+            if cerrado and estado != CERRADA:
+                carga.error(n, "cerrado_en sólo aplica a incidencias cerradas."); continue
+            creado = creado or ahora
+            if estado == CERRADA: cerrado = cerrado or max(creado, ahora)
+            if cerrado and cerrado < creado:
+                carga.error(n, "cerrado_en es anterior a creado_en."); continue
+            pendientes.append((n, *_ref_usuario(reg), {"titulo": titulo, "descripcion": desc, "prioridad": prio,
+                                                       "estado": estado, "creado_en": creado, "cerrado_en": cerrado}))
+        with SessionLocal() as s, s.begin():
+            # resolución de usuarios: una consulta por lote por email y otra por id
+            emails = {e for _, e, _, _ in pendientes if e}
+            ids = {u for _, _, u, _ in pendientes if u is not None}
+            por_email = {e: u for e, u in s.execute(select(Usuario.email, Usuario.id).where(Usuario.email.in_(emails)))}
+            por_id = set(s.scalars(select(Usuario.id).where(Usuario.id.in_(ids)))) if ids else set()
+            filas = []
+            for i, email, uid, v in pendientes:
+                uid = por_email.get(email) if email else (uid if uid in por_id else None)
+                if uid is None:
+                    carga.error(i, "Usuario no existe."); continue
+                filas.append((i, {**v, "usuario_id": uid}))
+            ok = _insertar_lote(s, Incidencia.__table__, filas, carga, "Usuario no existe.")
+        carga.fin_lote(len(lote), ok)
+    return carga.res
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Importación masiva desde CSV/JSONL.")
+    ap.add_argument("tipo", choices=("usuarios", "incidencias"))
+    ap.add_argument("archivo")
+    ap.add_argument("--lote", type=int, default=TAM_LOTE, help="registros por transacción")
+    args = ap.parse_args(argv)
+
+    def error(n, motivo):
+        print(f"registro {n}: {motivo}", file=sys.stderr)
+
+    def progreso(r):
+        print(f"\r{r.leidos} leídos, {r.insertados} insertados, {r.rechazados} rechazados "
+              f"({r.filas_por_segundo:,.0f} filas/s)", end="", file=sys.stderr, flush=True)
+
+    fn = importar_usuarios if args.tipo == "usuarios" else importar_incidencias
+    r = fn(leer_registros(args.archivo), tam_lote=args.lote, on_error=error, on_progreso=progreso)
+    print(file=sys.stderr)
+    podar_cambios()     # cada fila importada dejó su anotación en `cambios`
+    print(f"{r.insertados} de {r.leidos} registros importados en {r.segundos:.1f} s "
+          f"({r.filas_por_segundo:,.0f} filas/s); {r.rechazados} rechazados.")
+    return 1 if r.rechazados else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Índice en memoria de las incidencias cargadas, detrás de tv_i.
+# Una lista por campo (la posición es la fila) y, por cada columna ordenable,
+# una permutación precalculada con las posiciones en orden. Filtrar por usuario,
+# prioridad o texto y ordenar por columna recorre estas listas sin volver a
+# SQLite; la UI consulta la BD sólo si la ventana cargada no cubre los filtros
+# pedidos (cubre()). El texto de "Buscar" se busca aquí en el título y el nombre
+# del usuario, mientras se escribe; la búsqueda FTS de la BD (que también mira la
+# descripción) queda para cuando se pide con Enter o no hay índice.
+#
+# Altas, ediciones y bajas no compactan: la fila vieja queda muerta y la nueva
+# se agrega al final, insertándola en cada permutación (bisect).
+# Memoria por fila (~400 B, unos 40 MB con MAX_FILAS): ids y permutaciones en
+# array; prioridad, estado y nombre de usuario se guardan una vez por valor
+# distinto y se comparten.
+# No importa SQLAlchemy, igual que directorio.py.
+from array import array
+from bisect import insort
+
+from directorio import normalizar
+
+ORDENES = ("id", "titulo", "prioridad", "estado", "usuario")     # columnas de tv_i
+RANGO_PRIORIDAD = {"Baja": 0, "Media": 1, "Alta": 2}
+RANGO_ESTADO = {"Abierta": 0, "En proceso": 1, "Cerrada": 2}
+MAX_FILAS = 100_000      # más que esto no se indexa: la UI sigue paginando contra la BD
+
+def palabras(texto) -> tuple[str, ...]:
+    # como se compara el texto de "Buscar": sin mayúsculas ni acentos, por palabra
+    return tuple(normalizar(texto).split()) if texto else ()
+
+def _refina(nuevas, previas) -> bool:
+    # ¿Toda fila que cumple `nuevas` cumple `previas`? Sí si cada palabra previa está
+    # dentro de alguna nueva (p. ej. "impr" -> "impresora", o se agregó una palabra)
+    return all(any(v in w for w in nuevas) for v in previas)
+
+class IndiceIncidencias:
+    def __init__(self, filas=(), base=(None, None, False), completo: bool = True):
+        # filas: (id, titulo, prioridad, estado, nombre, usuario_id) de crud.listar_filas_indice
+        # base: (usuario_id, prioridad, archivo) con que se leyeron de la BD
+        self.base = base; self.completo = completo
+        self.ids = array("q"); self.usuarios = array("q")
+        self.titulos = []; self.prioridades = []; self.estados = []; self.nombres = []
+        self._titulos_n = []; self._nombres_n = []     # normalizados, para ordenar
+        self._comun: dict[str, str] = {}               # valor -> la única copia que se guarda
+        self._normal: dict[str, str] = {}              # nombre -> nombre normalizado
+        self._vivo = bytearray()
+        self._pos: dict[int, int] = {}                 # id -> posición vigente
+        self._ultima = None    # (usuario_id, prioridad, palabras, posiciones) de la consulta anterior
+        for f in filas: self._agregar(*f)
+        self._perm = {c: array("l", sorted(range(len(self.ids)), key=self._clave(c))) for c in ORDENES}
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __contains__(self, inc_id):
+        return inc_id in self._pos
+
+    def _clave(self, col):
+        if col == "id": return self.ids.__getitem__
+        if col == "titulo": return self._titulos_n.__getitem__
+        if col == "usuario": return self._nombres_n.__getitem__
+        if col == "prioridad": return lambda p: RANGO_PRIORIDAD.get(self.prioridades[p], -1)
+        return lambda p: RANGO_ESTADO.get(self.estados[p], -1)
+
+    def _agregar(self, inc_id, titulo, prioridad, estado, nombre, usuario_id):
+        comun = self._comun.setdefault
+        nombre = comun(nombre or "", nombre or "")
+        n = self._normal.get(nombre)
+        if n is None: n = self._normal[nombre] = normalizar(nombre)
+        self._pos[inc_id] = len(self.ids)
+        self.ids.append(inc_id); self.usuarios.append(usuario_id)
+        self.titulos.append(titulo); self.prioridades.append(comun(prioridad, prioridad))
+        self.estados.append(comun(estado, estado)); self.nombres.append(nombre)
+        t = normalizar(titulo)
+        self._titulos_n.append(titulo if t == titulo else t); self._nombres_n.append(n)
+        self._vivo.append(1)
+
+    def cubre(self, usuario_id, prioridad, archivo) -> bool:
+        # ¿Están cargadas todas las incidencias que cumplen estos filtros de BD?
+        bu, bp, ba = self.base
+        return self.completo and ba == archivo and bu in (None, usuario_id) and bp in (None, prioridad)
+
+    def fila(self, pos) -> tuple:
+        # valores de tv_i
+        return (self.ids[pos], self.titulos[pos], self.prioridades[pos], self.estados[pos], self.nombres[pos])
+
+    def consultar(self, usuario_id: int | None = None, prioridad: str | None = None,
+                  orden: str = "id", descendente: bool = True, texto: str | None = None) -> list[int]:
+        # Posiciones de las filas vivas que cumplen los filtros, en el orden pedido.
+        # texto: cada palabra debe aparecer en el título o en el nombre del usuario.
+        u = self._ultima; n = len(self.ids); pal = palabras(texto)
+        if u and u[:2] == (usuario_id, prioridad) and _refina(pal, u[2]):
+            # mismos filtros (p. ej. otro orden) o el texto siguió escribiéndose: se
+            # parte de las posiciones ya filtradas y sólo se prueban las palabras nuevas
+            pos = u[3]; nuevas = [w for w in pal if w not in u[2]]
+        else:
+            vivo = self._vivo; nuevas = pal
+            pos = [p for p in range(n) if vivo[p]]
+            if usuario_id is not None:
+                us = self.usuarios; pos = [p for p in pos if us[p] == usuario_id]
+            if prioridad is not None:
+                pr = self.prioridades; pos = [p for p in pos if pr[p] == prioridad]
+        if nuevas:
+            tn = self._titulos_n; nn = self._nombres_n
+            for w in nuevas:
+                # los nombres se repiten: la palabra se busca una vez entre los distintos
+                m = {v for v in self._normal.values() if w in v}
+                pos = [p for p in pos if nn[p] in m or w in tn[p]] if m else [p for p in pos if w in tn[p]]
+        self._ultima = (usuario_id, prioridad, pal, pos)
+        perm = self._perm[orden]
+        if len(pos) == len(self._pos):
+            vivo = self._vivo; res = [p for p in perm if vivo[p]]     # sin filtros
+        elif len(pos) * 8 < n:
+            res = sorted(pos, key=self._clave(orden))     # pocas: se ordenan directo
+        else:
+            # muchas: se recorre la permutación precalculada
+            marca = bytearray(n)
+            for p in pos: marca[p] = 1
+            res = [p for p in perm if marca[p]]
+        if descendente: res.reverse()
+        return res
+
+    def poner(self, inc_id, titulo, prioridad, estado, nombre, usuario_id):
+        # Alta o edición; si ya no cumple los filtros de la base, la quita
+        self.quitar(inc_id)
+        bu, bp, _ba = self.base
+        if bu not in (None, usuario_id) or bp not in (None, prioridad): return
+        self._agregar(inc_id, titulo, prioridad, estado, nombre, usuario_id)
+        p = len(self.ids) - 1
+        for c in ORDENES: insort(self._perm[c], p, key=self._clave(c))
+
+    def quitar(self, inc_id):
+        p = self._pos.pop(inc_id, None)
+        if p is not None: self._vivo[p] = 0
+        self._ultima = None
+
+    def renombrar_usuario(self, usuario_id, nombre):
+        nombre = self._comun.setdefault(nombre, nombre); n = normalizar(nombre); cambio = False
+        self._normal[nombre] = n
+        for p, u in enumerate(self.usuarios):
+            if u == usuario_id and self._vivo[p]:
+                self.nombres[p] = nombre; self._nombres_n[p] = n; cambio = True
+        if cambio:
+            perm = self._perm["usuario"]
+            perm[:] = array("l", sorted(perm, key=self._clave("usuario"))); self._ultima = None
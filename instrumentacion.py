@@ -0,0 +1,227 @@
+# Instrumentación de consultas y logging por niveles.
+# Con los eventos before/after_cursor_execute del engine se mide cada sentencia:
+# histograma de latencias por (función de crud, SQL), filas afectadas y, para
+# las lentas, el lugar del código que la disparó (bitácora de consultas lentas).
+# Las que fallan llegan por handle_error: cuentan como errores y, si tardaron
+# (p. ej. "database is locked" tras esperar todo el busy_timeout), van a la bitácora.
+# El decorador `medido` lleva contadores por función pública de crud.
+#
+#   TICKETS_LOG=DEBUG               nivel del logging (por defecto WARNING)
+#   TICKETS_SQL_LENTO_MS=100        umbral de consulta lenta
+#   TICKETS_SQL_LENTO_LOG=lento.log además de stderr, a este archivo
+#   TICKETS_SQL_LENTO_PARAMS=1      incluye los valores de los parámetros (pueden traer datos de usuarios)
+#   TICKETS_INSTRUMENTAR=0          desactiva la medición
+#
+# La bitácora de lentas sólo se escribe si se pidió: configurar_logging() (la UI)
+# o TICKETS_SQL_LENTO_LOG. Las herramientas de línea de comandos (importar,
+# exportar, archivo, ...) no configuran logging y no la muestran.
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from functools import wraps
+from pathlib import Path
+
+log = logging.getLogger("tickets")
+log_lento = logging.getLogger("tickets.sql.lento")
+log_lento.addHandler(logging.NullHandler())    # sin configurar: nada a stderr
+
+# Límites superiores (ms) de las cubetas del histograma; la última es "más de 2.5 s"
+LIMITES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+UMBRAL_LENTO_MS = float(os.environ.get("TICKETS_SQL_LENTO_MS", 100))
+PARAMS_LENTO = os.environ.get("TICKETS_SQL_LENTO_PARAMS") == "1"
+MAX_SENTENCIAS = 500    # sentencias distintas que se guardan; el resto va a "(otras)"
+ACTIVO = os.environ.get("TICKETS_INSTRUMENTAR", "1") != "0"
+
+class Histograma:
+    __slots__ = ("cubetas", "n", "total_ms", "max_ms", "filas", "errores", "sentencias")
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES_MS) + 1)
+        self.n = 0; self.total_ms = 0.0; self.max_ms = 0.0
+        self.filas = 0; self.errores = 0; self.sentencias = 0
+
+    def agregar(self, ms, filas=0):
+        self.cubetas[bisect_left(LIMITES_MS, ms)] += 1
+        self.n += 1; self.total_ms += ms; self.filas += filas
+        if ms > self.max_ms: self.max_ms = ms
+
+    def percentil(self, p):
+        # cota superior de la cubeta donde cae el percentil p (0..1)
+        objetivo = p * self.n; acum = 0
+        for i, c in enumerate(self.cubetas):
+            acum += c
+            if c and acum >= objetivo:
+                return min(LIMITES_MS[i], self.max_ms) if i < len(LIMITES_MS) else self.max_ms
+        return self.max_ms
+
+    def como_dict(self):
+        return {"llamadas": self.n, "total_ms": round(self.total_ms, 3),
+                "media_ms": round(self.total_ms / self.n, 3) if self.n else 0.0,
+                "p50_ms": round(self.percentil(0.5), 3), "p95_ms": round(self.percentil(0.95), 3),
+                "max_ms": round(self.max_ms, 3), "filas": self.filas,
+                "errores": self.errores, "sentencias": self.sentencias,
+                "cubetas": dict(zip([*map(str, LIMITES_MS), "inf"], self.cubetas))}
+
+_lock = threading.Lock()
+_local = threading.local()       # función de crud en curso y sentencias del hilo
+_sentencias: dict[tuple[str, str], Histograma] = {}
+_funciones: dict[str, Histograma] = {}
+_bitacora = {"activa": False, "archivo": None}    # bitácora de lentas (configurar_logging / _bitacora_archivo)
+
+def _origen():
+    # primer cuadro de la pila fuera de SQLAlchemy y de este módulo
+    for f in reversed(traceback.extract_stack()):
+        if (f.filename != __file__ and not f.filename.startswith("<")
+                and f"{os.sep}sqlalchemy{os.sep}" not in f.filename):
+            return f"{Path(f.filename).name}:{f.lineno} {f.name}"
+    return "?"
+
+def _antes(conn, cursor, sql, params, context, executemany):
+    # pila por conexión: (cursor, t0); la saca _despues o, si la sentencia falla, _error
+    conn.info.setdefault("instr_t0", []).append((cursor, time.perf_counter()))
+
+def _despues(conn, cursor, sql, params, context, executemany):
+    ms = (time.perf_counter() - conn.info["instr_t0"].pop()[1]) * 1000
+    _registrar(sql, params, ms, max(cursor.rowcount, 0))   # SQLite da -1 en SELECT: ahí cuenta `medido`
+
+def _error(ctx):
+    # handle_error: sólo si la sentencia alcanzó a pasar por _antes (el tope de la
+    # pila es su cursor); un error al conectar o al preparar no dejó nada que sacar
+    pila = ctx.connection.info.get("instr_t0") if ctx.connection is not None else None
+    cursor = ctx.execution_context.cursor if ctx.execution_context is not None else None
+    if not pila or cursor is None or pila[-1][0] is not cursor:
+        return
+    ms = (time.perf_counter() - pila.pop()[1]) * 1000
+    e = ctx.original_exception
+    _registrar(ctx.statement or "?", ctx.parameters, ms, 0, f"{type(e).__name__}: {e}")
+
+def _registrar(sql, params, ms, filas, error=None):
+    funcion = getattr(_local, "funcion", None) or "-"
+    _local.sentencias = getattr(_local, "sentencias", 0) + 1
+    with _lock:
+        h = _sentencias.get((funcion, sql))
+        if h is None:
+            clave = (funcion, sql) if len(_sentencias) < MAX_SENTENCIAS else (funcion, "(otras)")
+            h = _sentencias.setdefault(clave, Histograma())
+        h.agregar(ms, filas)
+        if error: h.errores += 1
+    if ms >= UMBRAL_LENTO_MS and _bitacora["activa"] and log_lento.isEnabledFor(logging.WARNING):
+        log_lento.warning("%.1f ms, %s, %s [%s]\n    %s%s", ms, f"ERROR {error}" if error else f"{filas} filas",
+                          _origen(), funcion, " ".join(sql.split()),
+                          f"\n    params={params!r:.300}" if PARAMS_LENTO else "")
+
+# sqlalchemy se importa dentro de las funciones: main importa este módulo al
+# arrancar y no debe pagar el import de SQLAlchemy antes de mostrar la ventana
+def instrumentar(engine):
+    from sqlalchemy import event
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+        event.listen(engine, "after_cursor_execute", _despues)
+        event.listen(engine, "handle_error", _error)
+
+def desinstrumentar(engine):
+    from sqlalchemy import event
+    if event.contains(engine, "before_cursor_execute", _antes):
+        event.remove(engine, "before_cursor_execute", _antes)
+        event.remove(engine, "after_cursor_execute", _despues)
+        event.remove(engine, "handle_error", _error)
+
+def medido(fn):
+    # Contador por función de crud: llamadas, latencia, sentencias, filas devueltas
+    nombre = fn.__name__
+    @wraps(fn)
+    def envoltura(*args, **kwargs):
+        if not ACTIVO:
+            return fn(*args, **kwargs)
+        previa = getattr(_local, "funcion", None); _local.funcion = nombre
+        s0 = getattr(_local, "sentencias", 0); r = None; error = False
+        t0 = time.perf_counter()
+        try:
+            r = fn(*args, **kwargs)
+            return r
+        except Exception:
+            error = True
+            raise
+        finally:
+            _local.funcion = previa
+            _anotar(nombre, t0, r, error, getattr(_local, "sentencias", 0) - s0)
+    return envoltura
+
+def medido_async(fn):
+    # Igual que `medido` para corrutinas (crud_async). Las sentencias no se
+    # atribuyen a la función: varias corrutinas se intercalan en el mismo hilo.
+    nombre = f"async.{fn.__name__}"
+    @wraps(fn)
+    async def envoltura(*args, **kwargs):
+        if not ACTIVO:
+            return await fn(*args, **kwargs)
+        r = None; error = False
+        t0 = time.perf_counter()
+        try:
+            r = await fn(*args, **kwargs)
+            return r
+        except Exception:
+            error = True
+            raise
+        finally:
+            _anotar(nombre, t0, r, error, 0)
+    return envoltura
+
+def _anotar(nombre, t0, r, error, sentencias):
+    ms = (time.perf_counter() - t0) * 1000
+    filas = len(r) if isinstance(r, list) else int(r is not None and r is not False)
+    with _lock:
+        h = _funciones.get(nombre) or _funciones.setdefault(nombre, Histograma())
+        h.sentencias += sentencias
+        h.agregar(ms, filas)
+        if error: h.errores += 1
+
+# ---------- consulta de los contadores ----------
+def estadisticas() -> dict:
+    with _lock:
+        return {
+            "funciones": {n: h.como_dict() for n, h in sorted(_funciones.items())},
+            "sentencias": [{"funcion": f, "sql": " ".join(sql.split()), **h.como_dict()}
+                           for (f, sql), h in sorted(_sentencias.items(), key=lambda kv: -kv[1].total_ms)],
+        }
+
+def reiniciar():
+    with _lock:
+        _sentencias.clear(); _funciones.clear()
+
+def reporte(top: int = 15) -> str:
+    datos = estadisticas()
+    lineas = [f"{'función':<34}{'llamadas':>9}{'media ms':>10}{'p95 ms':>9}{'max ms':>9}{'sql':>7}{'filas':>9}"]
+    for n, h in datos["funciones"].items():
+        lineas.append(f"{n:<34}{h['llamadas']:>9}{h['media_ms']:>10.2f}{h['p95_ms']:>9g}"
+                      f"{h['max_ms']:>9.1f}{h['sentencias']:>7}{h['filas']:>9}")
+    lineas += ["", f"Sentencias con más tiempo acumulado (top {top}):"]
+    for s in datos["sentencias"][:top]:
+        lineas.append(f"{s['total_ms']:>10.1f} ms  x{s['llamadas']:<6} p95={s['p95_ms']:g}ms  [{s['funcion']}] {s['sql'][:120]}")
+    return "\n".join(lineas)
+
+def volcar(ruta) -> Path:
+    ruta = Path(ruta)
+    ruta.write_text(json.dumps(estadisticas(), indent=2, ensure_ascii=False), encoding="utf-8")
+    return ruta
+
+def _bitacora_archivo():
+    # TICKETS_SQL_LENTO_LOG: las lentas van también (o, sin configurar_logging, sólo) a ese archivo
+    archivo = os.environ.get("TICKETS_SQL_LENTO_LOG")
+    if archivo and _bitacora["archivo"] is None:
+        h = logging.FileHandler(archivo, encoding="utf-8")
+        h.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        log_lento.addHandler(h); _bitacora["archivo"] = h
+    _bitacora["activa"] |= bool(archivo)
+
+def configurar_logging(nivel: str | None = None):
+    nivel = (nivel or os.environ.get("TICKETS_LOG", "WARNING")).upper()
+    logging.basicConfig(level=nivel, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    _bitacora["activa"] = True
+    _bitacora_archivo()
+
+_bitacora_archivo()
@@ -1,12 +1,69 @@
+import time
+T0 = time.perf_counter()     # arranque: import de main + primer pintado de la ventana
+import bisect
+import importlib
+import json
+import logging
+import sys
+from collections import Counter
 import tkinter as tk
-from tkinter import ttk, messagebox
-from crud import (
-    listar_usuarios, crear_usuario, editar_usuario, eliminar_usuario, obtener_usuario,
-    listar_incidencias, crear_incidencia, editar_incidencia, eliminar_incidencia,
-    obtener_incidencia, conteo_incidencias_por_usuario, incidencias_join_con_usuario
-)
+from tkinter import ttk, messagebox, filedialog
+from directorio import directorio
+from indice import IndiceIncidencias, MAX_FILAS as MAX_INDICE
+from tareas import Ejecutor
+from instrumentacion import configurar_logging, reporte, reiniciar as reiniciar_estadisticas
+
+def _diferida(modulo, nombre):
+    # crud, exportar y respaldo importan SQLAlchemy (~0.4 s): se importan en el
+    # primer uso, que ocurre en un hilo del Ejecutor y no antes de mostrar la ventana
+    def llamar(*args, **kwargs):
+        return getattr(importlib.import_module(modulo), nombre)(*args, **kwargs)
+    llamar.__name__ = nombre
+    return llamar
+
+def _con_dueno(fn):
+    # La tarea además deja en el directorio al dueño de la incidencia que devuelve:
+    # con más de CAPACIDAD usuarios puede no estar (crud.completar_directorio)
+    def llamar(*args, **kwargs):
+        inc = fn(*args, **kwargs)
+        if inc is not None: completar_directorio([inc.usuario_id])
+        return inc
+    llamar.__name__ = fn.__name__
+    return llamar
+
+(listar_usuarios, crear_usuario, editar_usuario, eliminar_usuario, obtener_usuario,
+ listar_filas_incidencias, crear_incidencia, editar_incidencia, eliminar_incidencia,
+ obtener_incidencia, conteo_incidencias_por_usuario, conteo_incidencias_por_prioridad,
+ buscar_incidencias, cargar_directorio, listar_filas_indice, buscar_usuarios_prefijo,
+ completar_directorio, contar_incidencias) = (_diferida("crud", n) for n in (
+    "listar_usuarios", "crear_usuario", "editar_usuario", "eliminar_usuario", "obtener_usuario",
+    "listar_filas_incidencias", "crear_incidencia", "editar_incidencia", "eliminar_incidencia",
+    "obtener_incidencia", "conteo_incidencias_por_usuario", "conteo_incidencias_por_prioridad",
+    "buscar_incidencias", "cargar_directorio", "listar_filas_indice", "buscar_usuarios_prefijo",
+    "completar_directorio", "contar_incidencias"))
+crear_incidencia, editar_incidencia, obtener_incidencia = map(
+    _con_dueno, (crear_incidencia, editar_incidencia, obtener_incidencia))
+exportar_incidencias = _diferida("exportar", "exportar_incidencias")
+respaldar, restaurar = _diferida("respaldo", "respaldar"), _diferida("respaldo", "restaurar")
+revisar_cambios, cerrar_cambios = _diferida("cambios", "revisar"), _diferida("cambios", "cerrar")
+podar_cambios = _diferida("crud", "podar_cambios")
+archivar = _diferida("archivo", "archivar")
+T_IMPORT = time.perf_counter()
 
 PRIORIDADES = ["Baja", "Media", "Alta"]
+ESTADOS = ["Abierta", "En proceso", "Cerrada"]   # models.ESTADOS
+DIAS_ARCHIVO = 90            # cerradas hace más de esto se mueven al archivo (archivo.py)
+RESPALDOS_A_CONSERVAR = 10   # rotación de respaldos en la carpeta destino
+TAM_PAGINA = 200      # filas por página en el listado de incidencias
+UMBRAL_SCROLL = 0.9   # fracción del scroll a partir de la cual se pide la siguiente página
+INTERVALO_CAMBIOS_MS = 1000   # cada cuánto se revisa si otra instancia escribió en app.db
+DEBOUNCE_MS = 250     # pausa al escribir en "Buscar" antes de filtrar (búsqueda FTS en la BD)
+DEBOUNCE_INDICE_MS = 50   # ídem con el índice en memoria: filtrar ahí es barato, sólo se juntan teclas seguidas
+LOTE_INDICE = 10_000  # filas por consulta al cargar el índice en memoria (indice.py)
+
+# Mensajes de depuración: TICKETS_LOG=DEBUG para verlos (ver instrumentacion.py)
+log = logging.getLogger("tickets.ui")
+log_arranque = logging.getLogger("tickets.arranque")    # tiempos de arranque (nivel INFO)
 
 # ---- Diálogos simples ----
 class UsuarioDialog(tk.Toplevel):
@@ -55,29 +112,30 @@ class UsuarioDialog(tk.Toplevel):
         n = self.var_nombre.get().strip()
         e = self.var_email.get().strip()
         
-        print(f"DEBUG: UsuarioDialog._ok() - Nombre: '{n}', Email: '{e}'")  # DEBUG
+        log.debug("UsuarioDialog._ok() - Nombre: %r, Email: %r", n, e)
         
         if not n or not e:
             messagebox.showwarning("Validación", "Nombre y email son obligatorios.", parent=self)
             return
             
         self.result = (n, e)
-        print(f"DEBUG: UsuarioDialog._ok() - Resultado establecido: {self.result}")  # DEBUG
+        log.debug("UsuarioDialog._ok() - Resultado establecido: %s", self.result)
         self.destroy()
 
     def _cancel(self):
-        print("DEBUG: UsuarioDialog._cancel() - Diálogo cancelado")  # DEBUG
+        log.debug("UsuarioDialog._cancel() - Diálogo cancelado")
         self.result = None
         self.destroy()
 
 class IncidenciaDialog(tk.Toplevel):
-    def __init__(self, master, usuarios, incidencia=None):
+    def __init__(self, master, incidencia=None):
         super().__init__(master); self.title("Incidencia"); self.resizable(False, False)
-        self.result = None; self.usuarios = usuarios
+        self.result = None
         tk.Label(self, text="Título:").grid(row=0, column=0, sticky="e", padx=6, pady=6)
         tk.Label(self, text="Descripción:").grid(row=1, column=0, sticky="ne", padx=6, pady=6)
         tk.Label(self, text="Prioridad:").grid(row=2, column=0, sticky="e", padx=6, pady=6)
-        tk.Label(self, text="Usuario:").grid(row=3, column=0, sticky="e", padx=6, pady=6)
+        tk.Label(self, text="Estado:").grid(row=3, column=0, sticky="e", padx=6, pady=6)
+        tk.Label(self, text="Usuario:").grid(row=4, column=0, sticky="e", padx=6, pady=6)
 
         self.var_titulo = tk.StringVar(value=getattr(incidencia, "titulo", ""))
         self.txt_desc   = tk.Text(self, width=40, height=5)
@@ -85,22 +143,21 @@ class IncidenciaDialog(tk.Toplevel):
 
         self.cmb_pri = ttk.Combobox(self, values=PRIORIDADES, state="readonly", width=14)
         self.cmb_pri.set(getattr(incidencia, "prioridad", PRIORIDADES[0]))
+        self.cmb_est = ttk.Combobox(self, values=ESTADOS, state="readonly", width=14)
+        self.cmb_est.set(getattr(incidencia, "estado", ESTADOS[0]))
 
-        nombres = [u.nombre for u in usuarios]
-        self.cmb_usr = ttk.Combobox(self, values=nombres, state="readonly", width=25)
-        if incidencia:
-            # seleccionar usuario actual
-            for idx, u in enumerate(usuarios):
-                if u.id == incidencia.usuario_id: self.cmb_usr.current(idx); break
-        elif usuarios:
-            self.cmb_usr.current(0)
+        # escribir filtra por prefijo; se selecciona el usuario actual o el primero
+        self.cmb_usr = ComboUsuarios(self, buscar=master.buscar_usuarios, width=25)
+        if incidencia: self.cmb_usr.seleccionar(incidencia.usuario_id)
+        elif self.cmb_usr.ids: self.cmb_usr.current(0)
 
         tk.Entry(self, textvariable=self.var_titulo, width=45).grid(row=0, column=1, padx=6, pady=6)
         self.txt_desc.grid(row=1, column=1, padx=6, pady=6)
         self.cmb_pri.grid(row=2, column=1, padx=6, pady=6)
-        self.cmb_usr.grid(row=3, column=1, padx=6, pady=6)
+        self.cmb_est.grid(row=3, column=1, padx=6, pady=6)
+        self.cmb_usr.grid(row=4, column=1, padx=6, pady=6)
 
-        frm = tk.Frame(self); frm.grid(row=4, column=0, columnspan=2, pady=6)
+        frm = tk.Frame(self); frm.grid(row=5, column=0, columnspan=2, pady=6)
         ttk.Button(frm, text="Guardar", command=self._ok).pack(side="left", padx=6)
         ttk.Button(frm, text="Cancelar", command=self.destroy).pack(side="left")
         self.grab_set(); self.wait_visibility(); self.focus()
@@ -109,19 +166,317 @@ class IncidenciaDialog(tk.Toplevel):
         t = self.var_titulo.get().strip()
         d = self.txt_desc.get("1.0", "end").strip()
         p = self.cmb_pri.get().strip()
-        i = self.cmb_usr.current()
-        if not t or not d or i < 0:
+        e = self.cmb_est.get()
+        uid = self.cmb_usr.usuario_id()
+        if not t or not d or uid is None:
             messagebox.showwarning("Validación", "Completa los campos requeridos.", parent=self); return
-        self.result = (t, d, p, self.usuarios[i].id); self.destroy()
+        self.result = (t, d, p, e, uid); self.destroy()
+
+class ComboUsuarios(ttk.Combobox):
+    # Combobox con autocompletado sobre directorio.py: al escribir, `values` pasa a
+    # ser las coincidencias por prefijo (acotadas, sin lag con miles de usuarios).
+    # La posición elegida se traduce a id con self.ids, así los homónimos no se
+    # confunden; a éstos se les agrega el email para distinguirlos.
+    # Si el directorio quedó incompleto, además se busca el prefijo en la BD
+    # (`buscar(texto, listo)`, en el Ejecutor) y se muestra lo que traiga.
+    def __init__(self, master, todos=None, buscar=None, **kw):
+        super().__init__(master, **kw)
+        self.todos = todos    # texto de la opción "sin filtro", p. ej. "(Todos)"
+        self.buscar = buscar
+        self.ids = []
+        self.bind("<KeyRelease>", self._on_tecla)
+        self.bind("<Return>", self._on_enter, add="+")
+        self.refrescar()
+
+    def refrescar(self, texto=""):
+        self._mostrar(texto)
+        if texto and self.buscar and not directorio.completo:
+            # buscar_usuarios_prefijo deja lo encontrado en el directorio; se muestra
+            # si el texto sigue siendo el mismo
+            self.buscar(texto, lambda _u: self.get() == texto and self._mostrar(texto))
+
+    def _mostrar(self, texto):
+        usuarios = directorio.prefijo(texto)
+        repetidos = {n for n, c in Counter(u.nombre for u in usuarios).items() if c > 1}
+        etiquetas = [f"{u.nombre} <{u.email}>" if u.nombre in repetidos else u.nombre for u in usuarios]
+        extra = [self.todos] if self.todos else []
+        self.ids = [None] * len(extra) + [u.id for u in usuarios]
+        self["values"] = extra + etiquetas
+
+    def _on_tecla(self, e):
+        if e.keysym in ("Up", "Down", "Return", "Escape", "Tab") or self.current() >= 0: return
+        self.refrescar(self.get())
+
+    def _on_enter(self, _e):
+        # texto a medias: se toma la primera coincidencia
+        if self.current() < 0 and len(self.ids) > (1 if self.todos else 0):
+            self.current(1 if self.todos else 0); self.event_generate("<<ComboboxSelected>>")
+
+    def usuario_id(self):
+        i = self.current()
+        return self.ids[i] if 0 <= i < len(self.ids) else None
+
+    def seleccionar(self, uid):
+        u = directorio.por_id(uid) if uid is not None else None
+        if u is None:
+            self.refrescar(); self.set(self.todos or ""); return
+        self.refrescar(u.nombre)
+        if uid in self.ids: self.current(self.ids.index(uid))
+
+# ---- Treeview incremental ----
+class FilasTreeview:
+    # Lleva iid -> versión (los valores mostrados) de cada fila, para tocar en el
+    # Treeview sólo las filas que cambian en vez de borrarlo y llenarlo de nuevo.
+    def __init__(self, tv):
+        self.tv = tv; self.ver = {}
+
+    def __len__(self):
+        return len(self.ver)
+
+    def __contains__(self, iid):
+        return str(iid) in self.ver
+
+    def upsert(self, iid, values, index="end"):
+        iid = str(iid); values = tuple(values)
+        prev = self.ver.get(iid)
+        if prev is None:
+            self.tv.insert("", index, iid=iid, values=values)
+        elif prev != values:
+            self.tv.item(iid, values=values)
+        else:
+            return False
+        self.ver[iid] = values
+        return True
+
+    def remove(self, iid):
+        iid = str(iid)
+        if self.ver.pop(iid, None) is not None:
+            self.tv.delete(iid)
+
+    def clear(self):
+        if self.ver: self.tv.delete(*self.ver)
+        self.ver.clear()
+
+    def sync(self, filas):
+        # filas: [(iid, values)] en el orden deseado; compara por id y versión
+        nuevos = {str(iid): tuple(v) for iid, v in filas}
+        for iid in [i for i in self.ver if i not in nuevos]:
+            self.remove(iid)
+        cambios = sum(self.upsert(iid, v) for iid, v in nuevos.items())
+        actual = list(self.tv.get_children()); deseado = list(nuevos)
+        if actual != deseado:
+            for idx, iid in enumerate(deseado):
+                if actual[idx] != iid:
+                    self.tv.move(iid, "", idx)
+                    actual.remove(iid); actual.insert(idx, iid)
+        return cambios
+
+def _fila_usuario(u):
+    return u.id, (u.id, u.nombre, u.email)
+
+def _pagina_incs(uid, prio, texto, archivo, cursor, limite=TAM_PAGINA):
+    # Corre en un hilo del Ejecutor: devuelve (tuplas listas para el Treeview, cursor
+    # de la página siguiente). El cursor es el último id, o (ventana, rank, id) al buscar.
+    if texto:
+        # búsqueda de texto completo, ordenada por relevancia (sólo tabla caliente)
+        res = buscar_incidencias(texto, uid, prio, limite=limite, despues_de=cursor)
+        return [tuple(f[:5]) for f in res], ((res[-1].ventana, res[-1].rank, res[-1].id) if res else cursor)
+    # proyección JOIN: tuplas (id, titulo, prioridad, estado, nombre), sin objetos ORM ni descripción
+    filas = listar_filas_incidencias(uid, prio, limite=limite, despues_de=cursor, archivo=archivo)
+    return filas, (filas[-1][0] if filas else cursor)
+
+def _ventana_incs(uid, prio, archivo, lote=LOTE_INDICE):
+    # Corre en un hilo del Ejecutor: lee por lotes (keyset) todo lo que cumple los
+    # filtros de BD y arma el índice en memoria. Si pasa de MAX_INDICE filas queda
+    # incompleto y la UI sigue paginando contra la BD; se cuenta antes (con LIMIT)
+    # para no leer filas que se van a descartar.
+    if contar_incidencias(uid, prio, archivo, tope=MAX_INDICE) > MAX_INDICE:
+        return IndiceIncidencias((), (uid, prio, archivo), completo=False)
+    filas = []; cursor = None
+    while len(filas) <= MAX_INDICE:
+        pag = listar_filas_indice(uid, prio, limite=lote, despues_de=cursor, archivo=archivo)
+        filas += pag
+        if len(pag) < lote: return IndiceIncidencias(filas, (uid, prio, archivo))
+        cursor = pag[-1][0]
+    return IndiceIncidencias((), (uid, prio, archivo), completo=False)
+
+def _precalentar():
+    # Corre en el Ejecutor después de la primera página: deja importado el resto
+    # y los mappers configurados, para que la primera acción del usuario no lo pague
+    for m in ("crud", "exportar", "respaldo"): importlib.import_module(m)
+    from sqlalchemy.orm import configure_mappers
+    configure_mappers()
 
 # ---- App principal (2 pestañas) ----
 class App(tk.Tk):
-    def __init__(self):
-        super().__init__(); self.title("Tickets EC0835"); self.geometry("880x520")
-        nb = ttk.Notebook(self); nb.pack(fill="both", expand=True, padx=8, pady=8)
-        self.tab_inc = tk.Frame(nb); self.tab_usr = tk.Frame(nb)
-        nb.add(self.tab_inc, text="Incidencias"); nb.add(self.tab_usr, text="Usuarios")
-        self._build_usuarios_tab(); self._build_incidencias_tab(); self._reload_all()
+    def __init__(self, medir_arranque=False):
+        super().__init__(); self.title("Tickets EC0835"); self.geometry("880x540")
+        # ms desde T0; con medir_arranque se imprime en JSON y se cierra tras la primera página
+        self.arranque = {"import_ms": (T_IMPORT - T0) * 1000}; self._medir_arranque = medir_arranque
+        self.bind("<Expose>", self._on_expose, add="+")
+        # las consultas corren en hilos; el resultado vuelve por after()
+        self.ejec = Ejecutor(self, on_ocupado=self._on_ocupado)
+        status = tk.Frame(self); status.pack(side="bottom", fill="x", padx=8, pady=(0,6))
+        self.lbl_estado = tk.Label(status, text="", anchor="w"); self.lbl_estado.pack(side="left")
+        self.pb = ttk.Progressbar(status, mode="indeterminate", length=120)
+        menu = tk.Menu(self); self.config(menu=menu)
+        m_bd = tk.Menu(menu, tearoff=False); menu.add_cascade(label="Base de datos", menu=m_bd)
+        m_bd.add_command(label="Respaldar...", command=self._db_backup)
+        m_bd.add_command(label="Restaurar...", command=self._db_restore)
+        m_bd.add_command(label=f"Archivar cerradas (más de {DIAS_ARCHIVO} días)...", command=self._db_archivar)
+        m_bd.add_separator()
+        m_bd.add_command(label="Estadísticas de consultas...", command=self._db_stats)
+        self.nb = ttk.Notebook(self); self.nb.pack(fill="both", expand=True, padx=8, pady=8)
+        self.tab_inc = tk.Frame(self.nb); self.tab_usr = tk.Frame(self.nb)
+        self.nb.add(self.tab_inc, text="Incidencias"); self.nb.add(self.tab_usr, text="Usuarios")
+        self._build_usuarios_tab(); self._build_incidencias_tab()
+        # Sólo la pestaña visible carga datos al arrancar; la otra, al elegirla
+        self._tabs_cargadas = set()
+        self.nb.bind("<<NotebookTabChanged>>", lambda _e: self._cargar_tab())
+        # el seq de partida se pide antes que las cargas: lo que cambie mientras
+        # tanto se vuelve a aplicar, y aplicar dos veces no cambia nada
+        self._seq = None; self._after_cambios = None; self._revisar_cambios()
+        # el registro `cambios` crece con cada escritura: se poda al arrancar (si pasó del doble)
+        self.ejec.enviar(podar_cambios, clave="podar", silenciosa=True,
+                         on_error=lambda e: log.warning("No se pudo podar el registro de cambios: %s", e))
+        self._reload_inc_filters(); self._cargar_tab()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    # ---------- Arranque ----------
+    def _cargar_tab(self):
+        tab = self.nametowidget(self.nb.select())
+        if tab in self._tabs_cargadas: return
+        self._tabs_cargadas.add(tab)
+        if tab is self.tab_inc: self._reload_incs()
+        else: self._reload_users()
+
+    def _marcar_arranque(self, evento):
+        if evento in self.arranque: return
+        self.arranque[evento] = (time.perf_counter() - T0) * 1000
+        if evento == "primera_pagina_ms":
+            log_arranque.info("arranque: %s", ", ".join(f"{k}={v:.0f}" for k, v in self.arranque.items()))
+            self.ejec.enviar(_precalentar, clave="precalentar", silenciosa=True)
+            if self._medir_arranque:
+                print(json.dumps(self.arranque)); self.after_idle(self._on_close)
+
+    def _on_expose(self, e):
+        # primer pintado de la ventana principal
+        if e.widget is self: self._marcar_arranque("primer_pintado_ms")
+
+    # ---------- Cambios de otras instancias (cambios.py) ----------
+    def _revisar_cambios(self):
+        # sondeo silencioso; el siguiente se agenda al volver el resultado, así no se acumulan
+        self._after_cambios = None
+        self.ejec.enviar(revisar_cambios, self._seq, clave="cambios", silenciosa=True,
+                         on_ok=self._aplicar_cambios, on_error=self._error_cambios)
+
+    def _error_cambios(self, e):
+        # p. ej. la BD bloqueada por otro equipo más de 1 s: se reintenta en la próxima vuelta
+        log.warning("No se pudieron revisar cambios: %s", e)
+        self._after_cambios = self.after(INTERVALO_CAMBIOS_MS, self._revisar_cambios)
+
+    def _aplicar_cambios(self, c):
+        self._after_cambios = self.after(INTERVALO_CAMBIOS_MS, self._revisar_cambios)
+        if c is None: return
+        primera = self._seq is None; self._seq = c.seq
+        if primera: return
+        if c.recargar:
+            log.info("Cambios externos: recarga completa")
+            return self._reload_all()
+        if not (c.usuarios or c.usuarios_borrados or c.incidencias or c.incidencias_borradas): return
+        log.debug("Cambios externos: %d/%d usuarios, %d/%d incidencias (seq %d)", len(c.usuarios),
+                  len(c.usuarios_borrados), len(c.incidencias), len(c.incidencias_borradas), c.seq)
+        releer = False     # releer lo cargado de tv_i (nombres de dueño cambiados, archivo)
+        for u in c.usuarios:
+            previo = directorio.por_id(u.id)
+            if previo is not None and previo.nombre != u.nombre:
+                releer = True; self._al_indice(lambda ix, u=u: ix.renombrar_usuario(u.id, u.nombre))
+            directorio.poner(u)
+            if self.tab_usr in self._tabs_cargadas: self._u_upsert(u)
+        for uid in c.usuarios_borrados:
+            directorio.quitar(uid); self.rows_u.remove(uid)
+        if c.usuarios or c.usuarios_borrados: self._fill_inc_filters()
+        if self.tab_inc in self._tabs_cargadas:
+            for inc in c.incidencias: self._indice_poner(inc)
+            # con el archivo a la vista, una borrada puede haber sido archivada: se relee
+            if c.incidencias_borradas and self._inc_filtros[3]:
+                releer = True; self._descartar_indice()
+            else:
+                for iid in c.incidencias_borradas: self._al_indice(lambda ix, iid=iid: ix.quitar(iid))
+            # se compara contra lo cargado: sólo se tocan las filas que cambiaron
+            if releer: return self._reload_incs()
+            if self._vista is not None: return self._mostrar_indice()
+            for inc in c.incidencias:
+                if inc.id in self.rows_i: self._i_upsert(inc, indice=False); continue
+                # fila que no estaba: se ubica por id DESC, salvo que caiga después de
+                # lo cargado (llegará con el scroll)
+                ids = [int(i) for i in self.tv_i.get_children()]
+                pos = sum(1 for i in ids if i > inc.id)
+                if pos < len(ids) or self._inc_fin: self._i_upsert(inc, index=pos, indice=False)
+            for iid in c.incidencias_borradas: self.rows_i.remove(iid)
+
+    # ---------- Tareas en segundo plano ----------
+    def _run(self, fn, *args, on_ok=None, clave=None, **kwargs):
+        return self.ejec.enviar(fn, *args, on_ok=on_ok, on_error=self._on_error, clave=clave, **kwargs)
+
+    def _on_error(self, e):
+        messagebox.showerror("Error", str(e), parent=self)
+
+    def _on_ocupado(self, pendientes):
+        if pendientes:
+            if not self.lbl_estado.cget("text"): self.lbl_estado.config(text="Cargando...")
+            if not self.pb.winfo_ismapped(): self.pb.pack(side="right"); self.pb.start(12)
+        else:
+            self.lbl_estado.config(text="")
+            if self.pb.winfo_ismapped(): self.pb.stop(); self.pb.pack_forget()
+
+    def _progreso(self, texto):
+        # devuelve un callback (hechas, total) seguro para llamarse desde el hilo de la tarea
+        def cb(hechas, total):
+            pct = 100 * hechas // total if total else 100
+            self.ejec.en_ui(self.lbl_estado.config, {"text": f"{texto}... {pct}%"})
+        return cb
+
+    # ---------- Respaldo (requerimiento 12) ----------
+    def _db_backup(self):
+        destino = filedialog.askdirectory(parent=self, title="Carpeta destino del respaldo (USB)")
+        if not destino: return
+        self._run(respaldar, destino, "gzip", RESPALDOS_A_CONSERVAR, clave="respaldo",
+                  on_progreso=self._progreso("Respaldando"),
+                  on_ok=lambda ruta: messagebox.showinfo("Respaldo", f"Respaldo creado:\n{ruta}", parent=self))
+
+    def _db_restore(self):
+        ruta = filedialog.askopenfilename(
+            parent=self, title="Restaurar respaldo",
+            filetypes=[("Respaldos", "*.db *.db.gz *.db.zst"), ("Todos", "*.*")])
+        if not ruta: return
+        if not messagebox.askyesno("Confirmar", "Se reemplazarán todos los datos actuales. ¿Continuar?", parent=self): return
+        self._run(restaurar, ruta, clave="respaldo", on_progreso=self._progreso("Restaurando"),
+                  on_ok=lambda _: (self._reload_all(), messagebox.showinfo("Restaurar", "Base de datos restaurada.", parent=self)))
+
+    def _db_archivar(self):
+        if not messagebox.askyesno("Archivar", f"Se moverán al archivo las incidencias cerradas hace más de "
+                                   f"{DIAS_ARCHIVO} días. ¿Continuar?", parent=self): return
+        self._run(archivar, DIAS_ARCHIVO, clave="archivar", on_progreso=self._progreso("Archivando"),
+                  on_ok=lambda n: (self._refrescar_incs(),
+                                   messagebox.showinfo("Archivar", f"{n} incidencias archivadas.", parent=self)))
+
+    def _db_stats(self):
+        # Contadores de instrumentacion.py: tiempos por función de crud y sentencias más costosas
+        win = tk.Toplevel(self); win.title("Estadísticas de consultas"); win.geometry("900x420")
+        txt = tk.Text(win, wrap="none", font="TkFixedFont"); txt.pack(fill="both", expand=True)
+        def refrescar():
+            txt.config(state="normal"); txt.delete("1.0", "end")
+            txt.insert("1.0", reporte()); txt.config(state="disabled")
+        frm = tk.Frame(win); frm.pack(fill="x", pady=4)
+        ttk.Button(frm, text="Refrescar", command=refrescar).pack(side="left", padx=6)
+        ttk.Button(frm, text="Reiniciar", command=lambda: (reiniciar_estadisticas(), refrescar())).pack(side="left")
+        refrescar()
+
+    def _on_close(self):
+        # primero el sondeo de cambios: que no agende otra vuelta ni consulte la BD mientras se destruye la ventana
+        if self._after_cambios is not None: self.after_cancel(self._after_cambios); self._after_cambios = None
+        self.ejec.cerrar(); cerrar_cambios(); self.destroy()
 
     # ---------- Usuarios ----------
     def _build_usuarios_tab(self):
@@ -130,6 +485,7 @@ class App(tk.Tk):
         for c, t, w in (("id","ID",60),("nombre","Nombre",220),("email","Email",280)):
             self.tv_u.heading(c, text=t); self.tv_u.column(c, width=w)
         self.tv_u.pack(fill="both", expand=True, padx=6, pady=6)
+        self.rows_u = FilasTreeview(self.tv_u)
 
         frm = tk.Frame(self.tab_usr); frm.pack(fill="x", padx=6, pady=(0,6))
         ttk.Button(frm, text="Nuevo",   command=self._u_new).pack(side="left", padx=4)
@@ -142,115 +498,135 @@ class App(tk.Tk):
         return int(sel[0]) if sel else None
 
     def _u_new(self):
-        print("DEBUG: Iniciando creación de usuario...")  # DEBUG
+        log.debug("Iniciando creación de usuario...")
         dlg = UsuarioDialog(self)
         
         # Forzar el procesamiento de eventos antes de continuar
         dlg.focus_force()
         self.wait_window(dlg)
         
-        print(f"DEBUG: Diálogo cerrado. Resultado: {getattr(dlg, 'result', 'No result')}")  # DEBUG
+        log.debug("Diálogo cerrado. Resultado: %s", getattr(dlg, 'result', 'No result'))
         
         if hasattr(dlg, 'result') and dlg.result:
-            print(f"DEBUG: Datos del formulario: {dlg.result}")  # DEBUG
-            try:
-                usuario_creado = crear_usuario(*dlg.result)
-                print(f"DEBUG: Usuario creado exitosamente: {usuario_creado.id} - {usuario_creado.nombre}")  # DEBUG
-                
-                # Forzar actualización
-                self.update()  # Procesar eventos pendientes
-                self._reload_users()
-                self._reload_inc_filters()
-                
-                messagebox.showinfo("Éxito", f"Usuario '{usuario_creado.nombre}' creado exitosamente.")
-            except Exception as e:
-                print(f"DEBUG: Error al crear usuario: {e}")  # DEBUG
-                messagebox.showerror("Error", str(e), parent=self)
+            log.debug("Datos del formulario: %s", dlg.result)
+            self._run(crear_usuario, *dlg.result, on_ok=self._u_created)
         else:
-            print("DEBUG: Diálogo cancelado o sin datos")  # DEBUG
+            log.debug("Diálogo cancelado o sin datos")
+
+    def _u_created(self, usuario_creado):
+        log.debug("Usuario creado exitosamente: %s - %s", usuario_creado.id, usuario_creado.nombre)
+        self._u_upsert(usuario_creado)
+        self._fill_inc_filters()   # crud ya actualizó el directorio al hacer commit
+        messagebox.showinfo("Éxito", f"Usuario '{usuario_creado.nombre}' creado exitosamente.")
 
     def _u_edit(self):
         uid = self._u_sel()
         if not uid: return messagebox.showwarning("Atención","Selecciona un usuario.",parent=self)
-        u = obtener_usuario(uid)
+        self._run(obtener_usuario, uid, on_ok=lambda u: self._u_edit_dialog(uid, u))
+
+    def _u_edit_dialog(self, uid, u):
         dlg = UsuarioDialog(self, u)
         self.wait_window(dlg)  # Esperar a que el diálogo se cierre
-        
         if dlg.result:
-            try:
-                editar_usuario(uid, *dlg.result)
-                self._reload_users()
-                self._reload_inc_filters()
-                self._reload_incs()
-                messagebox.showinfo("Éxito", "Usuario editado exitosamente.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e), parent=self)
+            self._run(editar_usuario, uid, *dlg.result, on_ok=self._u_edited)
+
+    def _u_edited(self, u):
+        if u:
+            self._u_upsert(u); self._al_indice(lambda ix: ix.renombrar_usuario(u.id, u.nombre))
+        # el nombre aparece en el listado de incidencias: se compara contra lo cargado
+        self._fill_inc_filters(); self._reload_incs()
+        messagebox.showinfo("Éxito", "Usuario editado exitosamente.")
+
+    def _u_deleted(self, uid):
+        # con incidencias asociadas no se puede borrar, así que tv_i no cambia
+        self.rows_u.remove(uid); self._fill_inc_filters()
+        messagebox.showinfo("Éxito", "Usuario eliminado exitosamente.")
+
+    def _u_upsert(self, u):
+        # Inserta/actualiza una sola fila y la coloca en su lugar (orden por nombre)
+        iid, values = _fila_usuario(u)
+        self.rows_u.upsert(iid, values)
+        hermanos = [i for i in self.tv_u.get_children() if i != str(iid)]
+        nombres = [self.rows_u.ver[i][1] for i in hermanos]
+        self.tv_u.move(str(iid), "", bisect.bisect_right(nombres, u.nombre))
 
     def _u_del(self):
         uid = self._u_sel()
         if not uid: return messagebox.showwarning("Atención","Selecciona un usuario.",parent=self)
         if not messagebox.askyesno("Confirmar", f"¿Eliminar usuario {uid}?", parent=self): return
-        try:
-            eliminar_usuario(uid)
-            self._reload_users()
-            self._reload_inc_filters()
-            self._reload_incs()
-            messagebox.showinfo("Éxito", "Usuario eliminado exitosamente.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e), parent=self)
+        self._run(eliminar_usuario, uid, on_ok=lambda ok: ok and self._u_deleted(uid))
 
     def _reload_users(self):
-        print("DEBUG: Recargando lista de usuarios...")  # DEBUG
-        
+        log.debug("Recargando lista de usuarios...")
+        self._run(listar_usuarios, on_ok=self._fill_users, clave="usuarios")
+
+    def _fill_users(self, usuarios):
         try:
-            # Limpiar TreeView
-            children = self.tv_u.get_children()
-            print(f"DEBUG: Eliminando {len(children)} elementos del TreeView")  # DEBUG
-            for i in children:
-                self.tv_u.delete(i)
-            
-            # Obtener usuarios de la base de datos
-            usuarios = listar_usuarios()
-            print(f"DEBUG: Usuarios obtenidos de la BD: {len(usuarios)}")  # DEBUG
-            
-            # Agregar usuarios al TreeView
-            for u in usuarios:
-                print(f"DEBUG: Insertando usuario: {u.id} - {u.nombre} - {u.email}")  # DEBUG
-                self.tv_u.insert("", "end", iid=str(u.id), values=(u.id, u.nombre, u.email))
-            
-            # Forzar actualización visual
-            self.tv_u.update_idletasks()
+            log.debug("Usuarios obtenidos de la BD: %d", len(usuarios))
             
-            final_count = len(self.tv_u.get_children())
-            print(f"DEBUG: TreeView ahora tiene {final_count} elementos")  # DEBUG
+            # Sólo se tocan las filas nuevas, modificadas o eliminadas
+            cambios = self.rows_u.sync(_fila_usuario(u) for u in usuarios)
+            log.debug("Filas actualizadas en el TreeView: %d", cambios)
             
-            if final_count != len(usuarios):
-                print(f"DEBUG: ¡ADVERTENCIA! Discrepancia: BD={len(usuarios)}, TreeView={final_count}")
+            # El recuento recorre todo el Treeview: sólo con DEBUG activo
+            if log.isEnabledFor(logging.DEBUG):
+                final_count = len(self.tv_u.get_children())
+                log.debug("TreeView ahora tiene %d elementos", final_count)
+                if final_count != len(usuarios):
+                    log.warning("Discrepancia: BD=%d, TreeView=%d", len(usuarios), final_count)
                 
-        except Exception as e:
-            print(f"DEBUG: Error en _reload_users: {e}")  # DEBUG
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            log.exception("Error en _fill_users")
 
     # ---------- Incidencias ----------
     def _build_incidencias_tab(self):
         # filtros
         top = tk.Frame(self.tab_inc); top.pack(fill="x", padx=6, pady=6)
         tk.Label(top, text="Usuario:").pack(side="left"); 
-        self.cmb_u = ttk.Combobox(top, state="readonly", width=28); self.cmb_u.pack(side="left", padx=6)
+        self.cmb_u = ComboUsuarios(top, todos="(Todos)", buscar=self.buscar_usuarios, width=28); self.cmb_u.pack(side="left", padx=6)
         tk.Label(top, text="Prioridad:").pack(side="left", padx=(12,0))
         self.cmb_p = ttk.Combobox(top, values=["(Todas)","Baja","Media","Alta"], state="readonly", width=12); 
         self.cmb_p.set("(Todas)"); self.cmb_p.pack(side="left", padx=6)
-        ttk.Button(top, text="Aplicar", command=self._reload_incs).pack(side="left", padx=6)
-        ttk.Button(top, text="Limpiar", command=self._clear_filters).pack(side="left")
-
-        cols = ("id","titulo","prioridad","usuario")
+        tk.Label(top, text="Buscar:").pack(side="left", padx=(12,0))
+        self.var_buscar = tk.StringVar()
+        ent = tk.Entry(top, textvariable=self.var_buscar, width=22); ent.pack(side="left", padx=6)
+        # Mientras se escribe filtra lo cargado por título y usuario (indice.py); Enter
+        # busca en la BD también en la descripción (FTS). Sin índice, siempre FTS.
+        self._buscar_after = None; self._buscar_bd = False
+        self.var_buscar.trace_add("write", lambda *_: self._buscar_diferido())
+        ent.bind("<Return>", lambda _e: self._buscar_en_bd())
+        self.lbl_buscar = tk.Label(top, text="", fg="gray"); self.lbl_buscar.pack(side="left")
+        # por defecto sólo la tabla caliente; el archivo se consulta a pedido
+        self.var_archivo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="Incluir archivo", variable=self.var_archivo,
+                        command=self._reload_incs).pack(side="left", padx=(12,0))
+        # cambiar un filtro recarga de inmediato; la recarga previa queda obsoleta
+        self.cmb_u.bind("<<ComboboxSelected>>", lambda _e: self._reload_incs())
+        self.cmb_p.bind("<<ComboboxSelected>>", lambda _e: self._reload_incs())
+        ttk.Button(top, text="Limpiar", command=self._clear_filters).pack(side="left", padx=6)
+
+        cols = ("id","titulo","prioridad","estado","usuario")
         self.tv_i = ttk.Treeview(self.tab_inc, columns=cols, show="headings", height=16)
         self.tv_i.heading("id", text="ID");            self.tv_i.column("id", width=60, anchor="center")
-        self.tv_i.heading("titulo", text="Título");    self.tv_i.column("titulo", width=420)
-        self.tv_i.heading("prioridad", text="Prior."); self.tv_i.column("prioridad", width=90, anchor="center")
+        self.tv_i.heading("titulo", text="Título");    self.tv_i.column("titulo", width=340)
+        self.tv_i.heading("prioridad", text="Prior."); self.tv_i.column("prioridad", width=80, anchor="center")
+        self.tv_i.heading("estado", text="Estado");    self.tv_i.column("estado", width=90, anchor="center")
         self.tv_i.heading("usuario", text="Usuario");  self.tv_i.column("usuario", width=200)
-        self.tv_i.pack(fill="both", expand=True, padx=6, pady=6)
+        # clic en un encabezado: ordena por esa columna (en memoria, ver indice.py)
+        self._titulos_i = {c: self.tv_i.heading(c, "text") for c in cols}
+        for c in cols: self.tv_i.heading(c, command=lambda c=c: self._ordenar(c))
+        # Treeview virtualizado: sólo se cargan páginas conforme el usuario hace scroll
+        mid = tk.Frame(self.tab_inc); mid.pack(fill="both", expand=True, padx=6, pady=6)
+        self.sb_i = ttk.Scrollbar(mid, orient="vertical", command=self.tv_i.yview)
+        self.tv_i.configure(yscrollcommand=self._on_inc_scroll)
+        self.tv_i.pack(in_=mid, side="left", fill="both", expand=True)
+        self.sb_i.pack(side="right", fill="y")
+        self.rows_i = FilasTreeview(self.tv_i)
+        self._inc_filtros = (None, None, None, False); self._inc_cursor = None
+        self._inc_fin = True; self._inc_pendiente = False
+        # índice en memoria de la ventana cargada; _vista: posiciones mostradas (None = paginando en la BD)
+        self.indice = None; self._vista = None; self._orden = ("id", True)
+        self._indice_cargando = None; self._indice_pendientes = []; self._indice_grande = set()
 
         bottom = tk.Frame(self.tab_inc); bottom.pack(fill="x", padx=6, pady=(0,6))
         ttk.Button(bottom, text="Nueva",   command=self._i_new).pack(side="left", padx=4)
@@ -258,93 +634,281 @@ class App(tk.Tk):
         ttk.Button(bottom, text="Eliminar",command=self._i_del).pack(side="left", padx=4)
         ttk.Separator(bottom, orient="vertical").pack(side="left", fill="y", padx=8)
         ttk.Button(bottom, text="Resumen (GROUP BY)", command=self._i_summary).pack(side="left", padx=4)
-        ttk.Button(bottom, text="Refrescar", command=self._reload_incs).pack(side="right")
+        ttk.Button(bottom, text="Exportar", command=self._i_export).pack(side="left", padx=4)
+        ttk.Button(bottom, text="Refrescar", command=self._refrescar_incs).pack(side="right")
 
     def _i_sel(self):
         sel = self.tv_i.selection()
         return int(sel[0]) if sel else None
 
     def _i_new(self):
-        if not self._u_cache:
+        if not len(directorio):
             return messagebox.showinfo("Info","Primero crea un usuario.", parent=self)
-        dlg = IncidenciaDialog(self, self._u_cache)
+        dlg = IncidenciaDialog(self)
         self.wait_window(dlg)  # Esperar a que el diálogo se cierre
         
         if dlg.result:
-            t, d, p, uid = dlg.result
-            try:
-                incidencia_creada = crear_incidencia(t, d, p, uid)
-                self._reload_incs()
-                messagebox.showinfo("Éxito", f"Incidencia '{incidencia_creada.titulo}' creada exitosamente.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e), parent=self)
+            t, d, p, e, uid = dlg.result
+            self._run(crear_incidencia, t, d, p, uid, e, on_ok=self._i_created)
+
+    def _i_created(self, incidencia_creada):
+        self._i_upsert(incidencia_creada, index=0)
+        messagebox.showinfo("Éxito", f"Incidencia '{incidencia_creada.titulo}' creada exitosamente.")
 
     def _i_edit(self):
         iid = self._i_sel()
         if not iid: return messagebox.showwarning("Atención","Selecciona una incidencia.", parent=self)
-        inc = obtener_incidencia(iid)
-        dlg = IncidenciaDialog(self, self._u_cache, incidencia=inc)
+        self._run(obtener_incidencia, iid, on_ok=lambda inc: self._i_edit_dialog(iid, inc))
+
+    def _i_edit_dialog(self, iid, inc):
+        if inc is None:
+            return messagebox.showwarning("Atención", "La incidencia está archivada o ya no existe.", parent=self)
+        dlg = IncidenciaDialog(self, incidencia=inc)
         self.wait_window(dlg)  # Esperar a que el diálogo se cierre
-        
         if dlg.result:
-            t, d, p, uid = dlg.result
-            try:
-                editar_incidencia(iid, titulo=t, descripcion=d, prioridad=p, usuario_id=uid)
-                self._reload_incs()
-                messagebox.showinfo("Éxito", "Incidencia editada exitosamente.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e), parent=self)
+            t, d, p, e, uid = dlg.result
+            self._run(editar_incidencia, iid, titulo=t, descripcion=d, prioridad=p, estado=e, usuario_id=uid,
+                      on_ok=self._i_edited)
+
+    def _i_edited(self, inc):
+        if inc: self._i_upsert(inc)
+        messagebox.showinfo("Éxito", "Incidencia editada exitosamente.")
+
+    def _i_deleted(self, iid):
+        self._al_indice(lambda ix: ix.quitar(iid))
+        if self._vista is not None: self._mostrar_indice()
+        else: self.rows_i.remove(iid)
+        messagebox.showinfo("Éxito", "Incidencia eliminada exitosamente.")
+
+    def _i_upsert(self, inc, index="end", indice=True):
+        # Aplica una alta/edición a su fila sin recargar; si ya no cumple los filtros, la quita
+        if indice:
+            self._indice_poner(inc)
+            if self._vista is not None: return self._mostrar_indice()
+        uid, prio, texto, _archivo = self._inc_filtros
+        if (uid and inc.usuario_id != uid) or (prio and inc.prioridad != prio):
+            return self.rows_i.remove(inc.id)
+        if texto and inc.id not in self.rows_i:
+            return   # no sabemos si coincide con la búsqueda: aparecerá al refrescar
+        u = directorio.por_id(inc.usuario_id); nombre = u.nombre if u else ""
+        self.rows_i.upsert(inc.id, (inc.id, inc.titulo, inc.prioridad, inc.estado, nombre), index=index)
 
     def _i_del(self):
         iid = self._i_sel()
         if not iid: return messagebox.showwarning("Atención","Selecciona una incidencia.", parent=self)
         if not messagebox.askyesno("Confirmar", f"¿Eliminar incidencia {iid}?", parent=self): return
-        if eliminar_incidencia(iid):
-            self._reload_incs()
-            messagebox.showinfo("Éxito", "Incidencia eliminada exitosamente.")
+        self._run(eliminar_incidencia, iid,
+                  on_ok=lambda ok: ok and self._i_deleted(iid))
 
     def _i_summary(self):
         # GROUP BY
-        datos = conteo_incidencias_por_usuario()
-        if not datos: return messagebox.showinfo("Resumen", "Sin datos.")
-        txt = "\n".join(f"{n}: {c}" for n, c in datos)
-        messagebox.showinfo("Incidencias por usuario", txt)
+        self._run(lambda: (conteo_incidencias_por_usuario(), conteo_incidencias_por_prioridad()),
+                  on_ok=self._show_summary, clave="resumen")
+
+    def _show_summary(self, datos):
+        por_usuario, por_prioridad = datos
+        if not por_usuario: return messagebox.showinfo("Resumen", "Sin datos.")
+        pri = dict(por_prioridad)
+        txt = "\n".join(f"{n} (#{uid}): {c}" for uid, n, c in por_usuario)
+        txt += "\n\nPor prioridad:\n" + "\n".join(f"{p}: {pri.get(p, 0)}" for p in PRIORIDADES)
+        # resumen_incidencias sólo cuenta la tabla caliente
+        txt += "\n\n(Sin las archivadas.)"
+        messagebox.showinfo("Incidencias activas por usuario y prioridad", txt)
+
+    def _i_export(self):
+        # Exporta el listado con los filtros actuales; se escribe en streaming en segundo plano
+        ruta = filedialog.asksaveasfilename(
+            parent=self, title="Exportar incidencias", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not ruta: return
+        uid, prio = self._get_user_filter(), self._get_prio_filter()
+        self._run(exportar_incidencias, ruta, usuario_id=uid, prioridad=prio, archivo=self.var_archivo.get(),
+                  clave="exportar",
+                  on_ok=lambda n: messagebox.showinfo("Exportar", f"{n} incidencias exportadas a\n{ruta}", parent=self))
 
     def _reload_inc_filters(self):
-        self._u_cache = listar_usuarios()
-        self.cmb_u["values"] = ["(Todos)"] + [u.nombre for u in self._u_cache]
-        self.cmb_u.set("(Todos)")
+        self._run(cargar_directorio, on_ok=lambda _d: self._fill_inc_filters(), clave="filtros")
+
+    def buscar_usuarios(self, texto, listo):
+        # ComboUsuarios con el directorio incompleto
+        self._run(buscar_usuarios_prefijo, texto, on_ok=listo, clave="prefijo")
+
+    def _fill_inc_filters(self):
+        # conserva el usuario elegido si sigue existiendo
+        self.cmb_u.seleccionar(self.cmb_u.usuario_id())
 
     def _clear_filters(self):
-        self.cmb_u.set("(Todos)"); self.cmb_p.set("(Todas)"); self._reload_incs()
+        self.cmb_u.seleccionar(None); self.cmb_p.set("(Todas)"); self.var_buscar.set("")
+        self.var_archivo.set(False); self._reload_incs()
 
     def _get_user_filter(self):
-        sel = self.cmb_u.get()
-        if sel == "(Todos)" or not sel: return None
-        for u in self._u_cache:
-            if u.nombre == sel: return u.id
-        return None
+        # por posición en el combo (no por nombre: puede haber homónimos)
+        return self.cmb_u.usuario_id()
 
     def _get_prio_filter(self):
         sel = self.cmb_p.get()
         return None if sel in ("", "(Todas)") else sel
 
+    def _get_texto_filter(self):
+        return self.var_buscar.get().strip() or None
+
+    def _buscar_diferido(self):
+        if self._buscar_after: self.after_cancel(self._buscar_after)
+        self._buscar_bd = False
+        uid, prio, _texto, archivo = self._inc_filtros
+        en_memoria = self.indice is not None and self.indice.cubre(uid, prio, archivo)
+        self._buscar_after = self.after(DEBOUNCE_INDICE_MS if en_memoria else DEBOUNCE_MS, self._reload_incs)
+
+    def _buscar_en_bd(self):
+        # Enter: búsqueda completa en la BD (título y descripción), por relevancia
+        self._buscar_bd = True; self._reload_incs()
+
+    def _refrescar_incs(self):
+        # "Refrescar": vuelve a leer de la BD, también el índice en memoria
+        self._descartar_indice(); self._reload_incs()
+
     def _reload_incs(self):
-        # JOIN para mostrar el nombre del usuario
-        uid = self._get_user_filter(); prio = self._get_prio_filter()
-        for i in self.tv_i.get_children(): self.tv_i.delete(i)
-        if uid or prio:
-            # si hay filtro, usamos consulta normal (select) y leemos la relación
-            for inc in listar_incidencias(uid, prio):
-                self.tv_i.insert("", "end", iid=str(inc.id),
-                                 values=(inc.id, inc.titulo, inc.prioridad, inc.usuario.nombre if inc.usuario else ""))
-        else:
-            # sin filtros, demostraremos JOIN explícito
-            for inc_id, titulo, pri, nombre in incidencias_join_con_usuario():
-                self.tv_i.insert("", "end", iid=str(inc_id), values=(inc_id, titulo, pri, nombre or ""))
+        if self._buscar_after: self.after_cancel(self._buscar_after); self._buscar_after = None
+        filtros = (self._get_user_filter(), self._get_prio_filter(), self._get_texto_filter(), self.var_archivo.get())
+        if (not filtros[2] or not self._buscar_bd) and self.indice is not None \
+                and self.indice.cubre(filtros[0], filtros[1], filtros[3]):
+            # lo cargado alcanza: se filtra y ordena en memoria, sin consultar la BD
+            return self._mostrar_indice(filtros)
+        self._vista = None
+        self.lbl_buscar.config(text="título y descripción, por relevancia" if filtros[2] else "")
+        if filtros == self._inc_filtros and len(self.rows_i):
+            # Mismos filtros: se vuelve a leer lo ya cargado y se aplica sólo la diferencia
+            n = max(len(self.rows_i), TAM_PAGINA)
+            self._inc_pendiente = True
+            self._run(_pagina_incs, *filtros, None, n, clave="incs",
+                      on_ok=lambda pag: self._sync_incs(pag, n))
+            return
+        # Filtros nuevos: reinicia el cursor y carga sólo la primera página
+        self._inc_filtros = filtros
+        self._inc_cursor = None; self._inc_fin = False
+        self.rows_i.clear()
+        self._load_more_incs()
+
+    def _sync_incs(self, pagina, n):
+        filas, self._inc_cursor = pagina
+        self._inc_pendiente = False
+        self.rows_i.sync((f[0], f) for f in filas)
+        self._inc_fin = len(filas) < n
+        self._cargar_indice()     # p. ej. tras "Refrescar", que descartó el índice
+
+    def _load_more_incs(self):
+        # Pide la siguiente página en segundo plano; con la misma clave "incs", una
+        # recarga por cambio de filtros deja obsoleta cualquier página en vuelo.
+        if self._inc_fin: return
+        if self._vista is not None:
+            # desde el índice: la siguiente tanda de la vista ya filtrada y ordenada
+            n = len(self.rows_i); ix = self.indice
+            for p in self._vista[n:n + TAM_PAGINA]: self.rows_i.upsert(ix.ids[p], ix.fila(p))
+            self._inc_fin = len(self.rows_i) >= len(self._vista)
+            return
+        self._inc_pendiente = True
+        self._run(_pagina_incs, *self._inc_filtros, self._inc_cursor, on_ok=self._add_incs_page, clave="incs")
+
+    def _add_incs_page(self, pagina):
+        filas, self._inc_cursor = pagina
+        self._inc_pendiente = False
+        self._marcar_arranque("primera_pagina_ms")
+        for inc_id, titulo, pri, estado, nombre in filas:
+            self.rows_i.upsert(inc_id, (inc_id, titulo, pri, estado, nombre or ""))
+        if len(filas) < TAM_PAGINA: self._inc_fin = True
+        self._cargar_indice()
+
+    def _on_inc_scroll(self, first, last):
+        # yscrollcommand del Treeview: cerca del final se agenda la siguiente página
+        self.sb_i.set(first, last)
+        if not self._inc_fin and not self._inc_pendiente and float(last) >= UMBRAL_SCROLL:
+            self._load_more_incs()
+
+    # ---------- Índice en memoria (indice.py) ----------
+    def _cargar_indice(self):
+        # Tras una página de la BD, carga en segundo plano todo lo que cumplen los
+        # filtros de BD. Primero sin usuario ni prioridad (cubre cualquier
+        # combinación); si eso no cabe en MAX_INDICE, con los filtros actuales.
+        uid, prio, _texto, archivo = self._inc_filtros
+        if self.indice is not None and self.indice.cubre(uid, prio, archivo): return
+        base = (None, None, archivo)
+        if base in self._indice_grande: base = (uid, prio, archivo)
+        if base in self._indice_grande or base == self._indice_cargando: return
+        self._indice_cargando = base; self._indice_pendientes = []
+        self.ejec.enviar(_ventana_incs, *base, clave="indice", silenciosa=True,
+                         on_ok=self._indice_cargado, on_error=self._error_indice)
+
+    def _indice_cargado(self, ix):
+        self._indice_cargando = None
+        for fn in self._indice_pendientes: fn(ix)     # cambios llegados mientras se leía
+        self._indice_pendientes = []
+        if not ix.completo:
+            log.info("Índice en memoria: más de %d incidencias con %s, se sigue paginando en la BD", MAX_INDICE, ix.base)
+            self._indice_grande.add(ix.base)
+            return self._cargar_indice()
+        log.debug("Índice en memoria: %d incidencias con %s", len(ix), ix.base)
+        self.indice = ix
+        uid, prio, texto, archivo = self._inc_filtros
+        if (not texto or not self._buscar_bd) and ix.cubre(uid, prio, archivo): self._mostrar_indice()
+
+    def _error_indice(self, e):
+        self._indice_cargando = None
+        log.warning("No se pudo cargar el índice en memoria: %s", e)
+
+    def _descartar_indice(self):
+        self.ejec.cancelar("indice")
+        self.indice = None; self._indice_cargando = None; self._indice_pendientes = []
+        self._indice_grande.clear()
+
+    def _al_indice(self, fn):
+        # aplica un cambio al índice; si se está cargando otro, se repite sobre él al llegar
+        if self.indice is not None: fn(self.indice)
+        if self._indice_cargando is not None: self._indice_pendientes.append(fn)
+
+    def _indice_poner(self, inc):
+        u = directorio.por_id(inc.usuario_id)
+        fila = (inc.id, inc.titulo, inc.prioridad, inc.estado, u.nombre if u else "", inc.usuario_id)
+        self._al_indice(lambda ix: ix.poner(*fila))
+
+    def _mostrar_indice(self, filtros=None):
+        # Vista en memoria: filtra y ordena lo cargado; en tv_i sólo se despliega
+        # hasta donde llegó el scroll y se tocan únicamente las filas que cambian
+        filtros = filtros or self._inc_filtros
+        n = max(len(self.rows_i), TAM_PAGINA) if filtros == self._inc_filtros else TAM_PAGINA
+        self._inc_filtros = filtros; self._inc_pendiente = False
+        uid, prio, texto, _archivo = filtros; ix = self.indice
+        self._vista = ix.consultar(uid, prio, *self._orden, texto)
+        self.rows_i.sync((ix.ids[p], ix.fila(p)) for p in self._vista[:n])
+        self._inc_fin = n >= len(self._vista)
+        self.lbl_buscar.config(text=f"{len(self._vista)} en título/usuario · Enter: también descripción"
+                               if texto else "")
+
+    def _ordenar(self, col):
+        # Clic en un encabezado: la misma columna alterna el sentido. El id arranca
+        # descendente (más recientes primero), el resto ascendente.
+        previa, desc = self._orden
+        uid, prio, texto, archivo = self._inc_filtros
+        if texto and self._vista is None:
+            return messagebox.showinfo("Ordenar", "La búsqueda en la BD (Enter, o antes de cargar el índice) se ordena "
+                                       "por relevancia: edita el texto para filtrar lo cargado y ordenar por columna.", parent=self)
+        if (self.indice is None or not self.indice.cubre(uid, prio, archivo)) and (uid, prio, archivo) in self._indice_grande:
+            return messagebox.showinfo("Ordenar", f"Hay más de {MAX_INDICE} incidencias con estos filtros: "
+                                       "filtra por usuario o prioridad para poder ordenar.", parent=self)
+        self._orden = (col, not desc if col == previa else col == "id")
+        for c, titulo in self._titulos_i.items():
+            flecha = (" ▼" if self._orden[1] else " ▲") if c == col else ""
+            self.tv_i.heading(c, text=titulo + flecha)
+        # sin índice que cubra los filtros se sigue en la BD (por id) hasta que termine de cargarse
+        self._reload_incs()
 
     def _reload_all(self):
-        self._reload_inc_filters(); self._reload_users(); self._reload_incs()
+        # las pestañas que aún no se abrieron cargarán al elegirlas
+        self._descartar_indice()
+        self._reload_inc_filters()
+        if self.tab_inc in self._tabs_cargadas: self._reload_incs()
+        if self.tab_usr in self._tabs_cargadas: self._reload_users()
 
 if __name__ == "__main__":
-    App().mainloop()
\ No newline at end of file
+    # --medir-arranque: imprime los tiempos de arranque en JSON y sale (bench arranque)
+    configurar_logging()
+    App(medir_arranque="--medir-arranque" in sys.argv).mainloop()
\ No newline at end of file
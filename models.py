@@ -1,20 +1,86 @@
-from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy.orm import declarative_base, relationship, deferred
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Index, DateTime, func
 
 Base = declarative_base()
 
+ESTADOS = ("Abierta", "En proceso", "Cerrada")
+CERRADA = "Cerrada"
+
 class Usuario(Base):
     __tablename__ = "usuarios"
     id = Column(Integer, primary_key=True)
-    nombre = Column(String(120), nullable=False)
+    nombre = Column(String(120), nullable=False, index=True)
     email  = Column(String(180), unique=True, nullable=False)
     incidencias = relationship("Incidencia", back_populates="usuario")
 
 class Incidencia(Base):
     __tablename__ = "incidencias"
+    # un id nunca se reutiliza (migración f2b8d4a6c913): las archivadas lo conservan
+    __table_args__ = {"sqlite_autoincrement": True}
     id = Column(Integer, primary_key=True)
     titulo = Column(String(150), nullable=False)
-    descripcion = Column(Text, nullable=False)
-    prioridad = Column(String(20), nullable=False)   # Baja/Media/Alta
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    # diferida: los listados no la necesitan; se carga al abrir la edición (crud.obtener_incidencia)
+    descripcion = deferred(Column(Text, nullable=False))
+    prioridad = Column(String(20), nullable=False, index=True)   # Baja/Media/Alta
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     usuario = relationship("Usuario", back_populates="incidencias")
+    estado = Column(String(20), nullable=False, server_default=ESTADOS[0])
+    # Fechas en UTC (CURRENT_TIMESTAMP). creado_en se llena al insertar; cerrado_en
+    # lo pone crud al pasar a "Cerrada" y lo quita si se reabre.
+    creado_en = Column(DateTime, default=func.current_timestamp())
+    cerrado_en = Column(DateTime)
+
+# Filtro combinado usuario + prioridad ya ordenado por id DESC (listado paginado)
+Index("ix_incidencias_usuario_prioridad_id",
+      Incidencia.usuario_id, Incidencia.prioridad, Incidencia.id.desc())
+# Candidatas a archivar (archivo.py): cerradas, por fecha de cierre
+Index("ix_incidencias_estado_cerrado_en", Incidencia.estado, Incidencia.cerrado_en)
+
+class IncidenciaArchivada(Base):
+    # Incidencias cerradas hace tiempo, movidas por archivo.py: sacarlas de
+    # `incidencias` mantiene chicos la tabla caliente, sus índices y el FTS.
+    # Conservan su id; sólo se leen con archivo=True en los listados de crud.
+    __tablename__ = "incidencias_archivo"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    titulo = Column(String(150), nullable=False)
+    descripcion = deferred(Column(Text, nullable=False))
+    prioridad = Column(String(20), nullable=False)
+    estado = Column(String(20), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    usuario = relationship("Usuario", viewonly=True)     # sólo lectura: las escribe archivo.py
+    creado_en = Column(DateTime)
+    cerrado_en = Column(DateTime)
+    archivado_en = Column(DateTime, nullable=False, default=func.current_timestamp())
+
+# usuario_id va primero: lo usa la FK al borrar usuarios y el listado filtrado por usuario
+Index("ix_incidencias_archivo_usuario_id", IncidenciaArchivada.usuario_id, IncidenciaArchivada.id.desc())
+
+class ResumenIncidencias(Base):
+    # Contadores por usuario y prioridad mantenidos por triggers (migración
+    # 5d7a9b1e2c84); los reportes GROUP BY leen de aquí en vez de contar tickets.
+    __tablename__ = "resumen_incidencias"
+    usuario_id = Column(Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True)
+    prioridad = Column(String(20), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+Index("ix_resumen_prioridad", ResumenIncidencias.prioridad, ResumenIncidencias.total)
+
+class Cambio(Base):
+    # Registro de cambios escrito por triggers (migración a4c8e1f3b6d2): una fila
+    # por usuario/incidencia tocado, con el seq de su último cambio. Cada instancia
+    # de la app lee de aquí lo que otras cambiaron desde su último seq (cambios.py).
+    __tablename__ = "cambios"
+    __table_args__ = {"sqlite_autoincrement": True}    # un seq nunca se reutiliza
+    seq = Column(Integer, primary_key=True)
+    tabla = Column(String(20), nullable=False)
+    fila_id = Column(Integer, nullable=False)
+
+Index("ux_cambios_tabla_fila", Cambio.tabla, Cambio.fila_id, unique=True)
+
+class PisoCambios(Base):
+    # Una sola fila (migración c5f0a7d2e418): hasta qué seq se podó `cambios`
+    # (crud.podar_cambios). Quien leyó por última vez un seq menor perdió
+    # anotaciones y tiene que recargar todo.
+    __tablename__ = "cambios_piso"
+    id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
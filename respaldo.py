@@ -0,0 +1,153 @@
+# Respaldo en caliente de app.db (requerimiento 12).
+# Usa la API de backup en línea de SQLite: copia por bloques de páginas y entre
+# bloques suelta el lock, así la app puede seguir escribiendo mientras tanto.
+# El resultado se verifica con PRAGMA integrity_check, se comprime opcionalmente
+# (gzip, o zstd si está instalado `zstandard`) y se conservan sólo los N más recientes.
+#
+#   python respaldo.py E:/respaldos --comprimir gzip --conservar 10
+#   python respaldo.py --restaurar E:/respaldos/app_20261018_101500.db.gz
+import argparse
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from db import DB_PATH, engine
+
+PAGINAS_POR_PASO = 256
+PREFIJO = "app_"
+EXTENSIONES = {None: ".db", "gzip": ".db.gz", "zstd": ".db.zst"}
+# Sólo los archivos con este nombre exacto son respaldos propios: rotar() nunca
+# toca otros archivos de la carpeta (p. ej. un app_viejo.db del usuario)
+NOMBRE_RESPALDO = re.compile(rf"{re.escape(PREFIJO)}\d{{8}}_\d{{6}}(?:{'|'.join(map(re.escape, EXTENSIONES.values()))})")
+
+def _zstd():
+    # zstd es opcional: sólo se importa si se pide
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Para zstd instala el paquete 'zstandard'.")
+    return zstandard
+
+def _abrir_comprimido(ruta, modo, compresion):
+    if compresion == "gzip":
+        return gzip.open(ruta, modo)
+    if compresion == "zstd":
+        zstandard = _zstd()
+        if "w" in modo:
+            return zstandard.ZstdCompressor().stream_writer(open(ruta, modo))
+        return zstandard.ZstdDecompressor().stream_reader(open(ruta, modo))
+    return open(ruta, modo)
+
+def _compresion_de(ruta) -> str | None:
+    nombre = str(ruta).lower()
+    return "gzip" if nombre.endswith(".gz") else "zstd" if nombre.endswith(".zst") else None
+
+def _verificar(ruta):
+    con = sqlite3.connect(ruta)
+    try:
+        resultado = con.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        con.close()
+    if resultado != "ok":
+        raise ValueError(f"El respaldo no pasó integrity_check: {resultado}")
+
+class _Reiniciado(Exception):
+    pass
+
+def _copiar_en_linea(origen, destino, paginas, on_progreso):
+    # on_progreso(copiadas, total) se llama después de cada paso. Si otra conexión
+    # escribe durante la copia, SQLite la reinicia desde cero; para que un flujo
+    # constante de escrituras no la haga eterna, al primer reinicio se termina en
+    # un solo paso (en WAL eso no bloquea a los escritores).
+    src = sqlite3.connect(origen); dst = sqlite3.connect(destino)
+    restantes_prev = [None]
+    def progreso(_status, restantes, total):
+        if restantes_prev[0] is not None and restantes > restantes_prev[0]:
+            raise _Reiniciado()
+        restantes_prev[0] = restantes
+        if on_progreso: on_progreso(total - restantes, total)
+    try:
+        try:
+            src.backup(dst, pages=paginas, progress=progreso, sleep=0.005)
+        except _Reiniciado:
+            src.backup(dst, pages=-1)
+            if on_progreso: on_progreso(1, 1)
+    finally:
+        dst.close(); src.close()
+
+def respaldos(directorio) -> list[Path]:
+    # Respaldos existentes, del más nuevo al más viejo (el nombre lleva la fecha)
+    return sorted((p for p in Path(directorio).glob(f"{PREFIJO}*")
+                   if p.is_file() and NOMBRE_RESPALDO.fullmatch(p.name)), reverse=True)
+
+def rotar(directorio, conservar: int) -> list[Path]:
+    borrados = respaldos(directorio)[conservar:]
+    for p in borrados:
+        p.unlink()
+    return borrados
+
+def respaldar(directorio, compresion: str | None = None, conservar: int | None = None,
+              paginas_por_paso: int = PAGINAS_POR_PASO, on_progreso=None, origen=None) -> Path:
+    if compresion not in EXTENSIONES:
+        raise ValueError(f"Compresión no soportada: {compresion}")
+    if compresion == "zstd": _zstd()
+    directorio = Path(directorio); directorio.mkdir(parents=True, exist_ok=True)
+    sello = datetime.now().strftime("%Y%m%d_%H%M%S")
+    final = directorio / f"{PREFIJO}{sello}{EXTENSIONES[compresion]}"
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = Path(tmp) / "respaldo.db"
+        _copiar_en_linea(origen or DB_PATH, copia, paginas_por_paso, on_progreso)
+        _verificar(copia)
+        # se escribe con nombre temporal en el destino y se renombra al terminar,
+        # así un respaldo a medias nunca queda con el nombre definitivo
+        parcial = final.with_name(final.name + ".parcial")
+        with open(copia, "rb") as f, _abrir_comprimido(parcial, "wb", compresion) as out:
+            shutil.copyfileobj(f, out, 1024 * 1024)
+        os.replace(parcial, final)
+    if conservar:
+        rotar(directorio, conservar)
+    return final
+
+def restaurar(respaldo, destino=None, paginas_por_paso: int = PAGINAS_POR_PASO, on_progreso=None) -> Path:
+    # Descomprime, verifica y copia con la misma API de backup sobre la BD viva
+    destino = Path(destino or DB_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = Path(tmp) / "restaurar.db"
+        with _abrir_comprimido(respaldo, "rb", _compresion_de(respaldo)) as f, open(copia, "wb") as out:
+            shutil.copyfileobj(f, out, 1024 * 1024)
+        _verificar(copia)
+        _copiar_en_linea(copia, destino, paginas_por_paso, on_progreso)
+    if destino.resolve() == DB_PATH.resolve():
+        engine.dispose()   # las conexiones del pool vuelven a abrir la BD restaurada
+    return destino
+
+# ---------- CLI ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Respaldo en caliente de app.db.")
+    ap.add_argument("directorio", nargs="?", help="carpeta destino (p. ej. la USB)")
+    ap.add_argument("--comprimir", choices=("gzip", "zstd"))
+    ap.add_argument("--conservar", type=int, help="cuántos respaldos mantener")
+    ap.add_argument("--restaurar", metavar="RESPALDO", help="restaura app.db desde un respaldo")
+    args = ap.parse_args(argv)
+
+    def progreso(hechas, total):
+        print(f"\r{hechas}/{total} páginas", end="", file=sys.stderr, flush=True)
+
+    if args.restaurar:
+        restaurar(args.restaurar, on_progreso=progreso)
+        print(f"\nBD restaurada desde {args.restaurar}")
+    elif args.directorio:
+        ruta = respaldar(args.directorio, args.comprimir, args.conservar, on_progreso=progreso)
+        print(f"\nRespaldo creado: {ruta}")
+    else:
+        ap.error("indica un directorio destino o --restaurar")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# Verificación y reconstrucción de los contadores de resumen_incidencias.
+# Los triggers los mantienen al día; esto sirve para auditar que coinciden con un
+# conteo real sobre incidencias y para recalcularlos si alguna vez no coinciden
+# (p. ej. una BD restaurada de antes de la migración o editada a mano).
+#
+#   python resumen.py                 # sólo verifica
+#   python resumen.py --reconstruir   # recalcula los contadores
+import argparse
+import sys
+
+from sqlalchemy import delete, func, insert, select
+from db import SessionLocal
+from models import Incidencia, ResumenIncidencias
+
+def _conteo_real():
+    return (
+        select(Incidencia.usuario_id, Incidencia.prioridad, func.count())
+        .group_by(Incidencia.usuario_id, Incidencia.prioridad)
+    )
+
+def diferencias() -> list[tuple[int, str, int, int]]:
+    # [(usuario_id, prioridad, esperado, guardado)] donde el contador no coincide
+    with SessionLocal() as s:
+        esperado = {(u, p): n for u, p, n in s.execute(_conteo_real())}
+        guardado = {(u, p): n for u, p, n in s.execute(
+            select(ResumenIncidencias.usuario_id, ResumenIncidencias.prioridad, ResumenIncidencias.total))}
+    claves = sorted(set(esperado) | set(guardado))
+    return [(u, p, esperado.get((u, p), 0), guardado.get((u, p), 0)) for u, p in claves
+            if esperado.get((u, p), 0) != guardado.get((u, p), 0)]
+
+def reconstruir() -> int:
+    # Recalcula todos los contadores en una sola transacción; devuelve filas escritas
+    with SessionLocal() as s, s.begin():
+        s.execute(delete(ResumenIncidencias))
+        res = s.execute(insert(ResumenIncidencias).from_select(
+            ["usuario_id", "prioridad", "total"], _conteo_real()))
+        return res.rowcount
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Verifica/reconstruye los contadores de resumen.")
+    ap.add_argument("--reconstruir", action="store_true")
+    args = ap.parse_args(argv)
+    if args.reconstruir:
+        print(f"{reconstruir()} contadores recalculados.")
+    difs = diferencias()
+    for u, p, esperado, guardado in difs:
+        print(f"usuario {u} / {p}: esperado {esperado}, guardado {guardado}")
+    print("OK: contadores consistentes." if not difs else f"{len(difs)} contador(es) inconsistentes.")
+    return 1 if difs else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# Ejecuta llamadas a crud fuera del hilo de Tk.
+# Cada función de crud abre su propia sesión con db.SessionLocal, así que basta
+# con correrla en un hilo del pool; el resultado vuelve a la UI por una cola que
+# el loop de Tk revisa con after().
+import queue
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+class Ejecutor:
+    def __init__(self, root, max_workers: int = 2, intervalo_ms: int = 40, on_ocupado=None):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.on_ocupado = on_ocupado          # callback(n_pendientes) para el indicador
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crud")
+        self._cola = queue.Queue()
+        self._avisos = queue.Queue()          # llamadas desde hilos hacia la UI (progreso)
+        self._generacion = {}                 # clave -> última generación enviada
+        self._futuros = {}                    # clave -> futuro vigente
+        self._pendientes = 0
+        self._silenciosas = 0                 # pendientes que no encienden el indicador
+        self._after_id = None
+
+    def enviar(self, fn, *args, on_ok=None, on_error=None, clave=None, silenciosa=False, **kwargs):
+        # `clave` agrupa tareas equivalentes (p. ej. "incs"): al enviar una nueva,
+        # la anterior se cancela si aún no arrancó y su resultado se descarta.
+        # `silenciosa`: tarea de fondo (sondeo, precarga) que no cuenta para on_ocupado.
+        gen = None
+        if clave is not None:
+            gen = self._generacion.get(clave, 0) + 1
+            self._generacion[clave] = gen
+            previo = self._futuros.get(clave)
+            if previo is not None:
+                previo.cancel()
+        fut = self._pool.submit(fn, *args, **kwargs)
+        if clave is not None:
+            self._futuros[clave] = fut
+        self._pendientes += 1; self._silenciosas += silenciosa
+        self._notificar()
+        fut.add_done_callback(lambda f: self._cola.put((f, clave, gen, on_ok, on_error, silenciosa)))
+        self._programar()
+        return fut
+
+    def en_ui(self, fn, *args):
+        # Seguro desde cualquier hilo: `fn(*args)` corre en el hilo de Tk en el
+        # próximo drenado (p. ej. para reportar progreso de una tarea larga).
+        self._avisos.put((fn, args))
+
+    def cancelar(self, clave):
+        # Invalida la tarea vigente de `clave` sin enviar otra
+        self._generacion[clave] = self._generacion.get(clave, 0) + 1
+        fut = self._futuros.pop(clave, None)
+        if fut is not None:
+            fut.cancel()
+
+    def ocupado(self, clave=None) -> bool:
+        if clave is None:
+            return self._pendientes > 0
+        fut = self._futuros.get(clave)
+        return fut is not None and not fut.done()
+
+    def cerrar(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id); self._after_id = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- lado Tk ----------
+    def _programar(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        self._after_id = None
+        while True:
+            try:
+                fn, args = self._avisos.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+        while True:
+            try:
+                fut, clave, gen, on_ok, on_error, silenciosa = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            self._pendientes -= 1; self._silenciosas -= silenciosa
+            if clave is not None:
+                if self._futuros.get(clave) is fut:
+                    del self._futuros[clave]
+                if self._generacion.get(clave) != gen:
+                    continue   # resultado obsoleto: hubo otra petición después
+            try:
+                resultado = fut.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                if on_error: on_error(e)
+                continue
+            if on_ok: on_ok(resultado)
+        self._notificar()
+        if self._pendientes > 0:
+            self._programar()
+
+    def _notificar(self):
+        if self.on_ocupado: self.on_ocupado(self._pendientes - self._silenciosas)
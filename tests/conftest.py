@@ -0,0 +1,24 @@
+# Los módulos de la app están en la raíz del repo (sin paquete): con `pytest`
+# solo, la raíz no queda en sys.path.
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@pytest.fixture
+def bd(tmp_path):
+    # BD temporal con `alembic upgrade head` (sin tocar el logging, como el
+    # generador de bench); crud y SessionLocal apuntan a ella durante la prueba,
+    # nunca a app.db
+    from sqlalchemy import create_engine
+    from bench.generador import crear_esquema
+    from db import SessionLocal, engine as engine_app
+    engine = create_engine(crear_esquema(tmp_path / "prueba.db"), future=True)
+    SessionLocal.configure(bind=engine)
+    try:
+        yield engine
+    finally:
+        SessionLocal.configure(bind=engine_app)
+        engine.dispose()
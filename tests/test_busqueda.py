@@ -0,0 +1,44 @@
+# crud.buscar_incidencias: bm25 se ordena por ventanas de MAX_CANDIDATOS; al
+# paginar, ninguna coincidencia vieja debe quedar fuera.
+import pytest
+
+import crud
+
+@pytest.fixture
+def tickets(bd, monkeypatch):
+    monkeypatch.setattr(crud, "MAX_CANDIDATOS", 3)
+    u = crud.crear_usuario("Ana", "ana@x.com")
+    otro = crud.crear_usuario("Beto", "beto@x.com")
+    ids = [crud.crear_incidencia(f"impresora {i}", "no imprime" + " papel" * i, "Alta" if i % 2 else "Baja",
+                                 u.id if i % 3 else otro.id).id for i in range(10)]
+    crud.crear_incidencia("correo", "no llega", "Alta", u.id)
+    return u, ids
+
+def _paginas(limite, **filtros):
+    vistos = []; cursor = None
+    while True:
+        pag = crud.buscar_incidencias("impresora", limite=limite, despues_de=cursor, **filtros)
+        vistos += [f.id for f in pag]
+        if len(pag) < limite: return vistos
+        cursor = (pag[-1].ventana, pag[-1].rank, pag[-1].id)
+
+@pytest.mark.parametrize("limite", [1, 2, 3, 4, 50])
+def test_pagina_por_todas_las_ventanas(tickets, limite):
+    _, ids = tickets
+    vistos = _paginas(limite)
+    assert sorted(vistos) == ids and len(vistos) == len(set(vistos))
+
+def test_sin_limite_trae_todas(tickets):
+    _, ids = tickets
+    filas = crud.buscar_incidencias("impresora", limite=None)
+    assert sorted(f.id for f in filas) == ids
+    # las más recientes primero por ventana; dentro de cada una, por relevancia
+    assert [f.ventana for f in filas[:3]] == [None] * 3 and {f.id for f in filas[:3]} == set(ids[-3:])
+    for a, b in zip(filas, filas[1:]):
+        assert (a.ventana == b.ventana and (a.rank, a.id) <= (b.rank, b.id)) or a.ventana != b.ventana
+
+def test_filtros_por_usuario_y_prioridad(tickets):
+    u, ids = tickets
+    esperadas = [i for n, i in enumerate(ids) if n % 3 and n % 2]
+    assert sorted(_paginas(2, usuario_id=u.id, prioridad="Alta")) == esperadas
+    assert sorted(_paginas(2, prioridad="Baja")) == [i for n, i in enumerate(ids) if not n % 2]
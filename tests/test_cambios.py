@@ -0,0 +1,22 @@
+# cambios.py: el sondeo de data_version y su cierre al salir de la app.
+import sqlite3
+
+from cambios import Sondeo
+
+def test_hubo_escrituras(tmp_path):
+    ruta = tmp_path / "c.db"
+    otra = sqlite3.connect(ruta); otra.execute("CREATE TABLE t (x)"); otra.commit()
+    s = Sondeo(ruta)
+    assert s.hubo_escrituras()                 # la primera llamada siempre
+    assert not s.hubo_escrituras()
+    otra.execute("INSERT INTO t VALUES (1)"); otra.commit()
+    assert s.hubo_escrituras() and not s.hubo_escrituras()
+    s.cerrar(); otra.close()
+
+def test_cerrar_no_reabre(tmp_path):
+    ruta = tmp_path / "c.db"
+    s = Sondeo(ruta)
+    assert s.hubo_escrituras()
+    s.cerrar()
+    assert s._con is None
+    assert not s.hubo_escrituras() and s._con is None
@@ -0,0 +1,51 @@
+# directorio.py: el índice por prefijo y el de email deben seguir al LRU cuando
+# se descartan entradas por capacidad.
+from directorio import Directorio, UsuarioDir
+
+def _dir(capacidad=3):
+    d = Directorio(capacidad)
+    d.cargar([(1, "Ana", "ana@x.com"), (2, "Andrés", "andres@x.com"), (3, "Beto", "beto@x.com")])
+    return d
+
+def _consistente(d):
+    assert d._nombres == sorted(d._nombres)
+    assert {i for _, i in d._nombres} == set(d._por_id)
+    assert set(d._por_email.values()) == set(d._por_id)
+
+def test_cargar_de_mas_queda_incompleto():
+    d = Directorio(2)
+    d.cargar([(1, "a", "a@x"), (2, "b", "b@x"), (3, "c", "c@x")])
+    assert len(d) == 2 and not d.completo
+    _consistente(d)
+
+def test_lru_descarta_el_menos_usado():
+    d = _dir()
+    assert d.completo
+    d.por_id(1)                                       # Ana pasa a ser la más reciente
+    d.poner(UsuarioDir(4, "Andrea", "andrea@x.com"))
+    assert d.por_id(2) is None and d.por_email("andres@x.com") is None
+    assert [u.nombre for u in d.prefijo("an")] == ["Ana", "Andrea"]
+    assert not d.completo
+    _consistente(d)
+    d.poner(UsuarioDir(5, "Carla", "carla@x.com"))    # ahora sale Beto, no la recién usada
+    assert d.por_id(3) is None and d.por_id(1) is not None
+    _consistente(d)
+
+def test_editar_no_deja_nombre_viejo():
+    d = _dir()
+    d.poner(UsuarioDir(3, "Zoila", "beto@x.com"))
+    assert d.prefijo("be") == [] and [u.id for u in d.prefijo("zo")] == [3]
+    assert len(d) == 3 and d.completo
+    _consistente(d)
+
+def test_quitar():
+    d = _dir()
+    d.quitar(2)
+    assert [u.id for u in d.prefijo("a")] == [1] and d.por_email("andres@x.com") is None
+    _consistente(d)
+
+def test_prefijo_sin_acentos_ni_mayusculas_y_limite():
+    d = _dir(10)
+    assert [u.id for u in d.prefijo("ANDRES")] == [2]
+    assert [u.id for u in d.prefijo("")] == [1, 2, 3]
+    assert len(d.prefijo("a", limite=1)) == 1
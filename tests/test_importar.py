@@ -0,0 +1,28 @@
+# importar.py: lectura de CSV/JSONL tal como los guardan Excel y otros editores.
+from sqlalchemy import select
+
+from importar import RegistroInvalido, importar_usuarios, leer_registros
+from models import Usuario
+
+def test_csv_con_bom(tmp_path, bd):
+    # Excel, "CSV UTF-8": el archivo empieza con un BOM
+    ruta = tmp_path / "usuarios.csv"
+    ruta.write_bytes("nombre,email\r\nÁngela,angela@x.com\r\nBruno,bruno@x.com\r\n".encode("utf-8-sig"))
+    assert next(leer_registros(ruta)) == {"nombre": "Ángela", "email": "angela@x.com"}
+    r = importar_usuarios(leer_registros(ruta))
+    assert (r.insertados, r.rechazados) == (2, 0)
+    with bd.connect() as conn:
+        assert sorted(conn.scalars(select(Usuario.nombre))) == ["Bruno", "Ángela"]
+
+def test_csv_sin_bom(tmp_path):
+    ruta = tmp_path / "usuarios.csv"
+    ruta.write_text("nombre,email\nAna,ana@x.com\n", encoding="utf-8")
+    assert list(leer_registros(ruta)) == [{"nombre": "Ana", "email": "ana@x.com"}]
+
+def test_jsonl_con_bom_y_linea_mala(tmp_path):
+    ruta = tmp_path / "usuarios.jsonl"
+    ruta.write_bytes('{"nombre": "Ana", "email": "ana@x.com"}\n{"nombre": \n[1]\n'.encode("utf-8-sig"))
+    primero, *malos = leer_registros(ruta)
+    assert primero == {"nombre": "Ana", "email": "ana@x.com"}
+    assert [type(m) for m in malos] == [RegistroInvalido, RegistroInvalido]
+    assert malos[0].motivo.startswith("Línea 2:") and malos[1].motivo.startswith("Línea 3:")
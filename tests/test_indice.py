@@ -0,0 +1,123 @@
+# indice.py: las permutaciones precalculadas deben dar el mismo orden que
+# ordenar de cero después de altas, ediciones, bajas y renombres, y el texto
+# debe filtrar igual al escribirlo de a poco que de una vez.
+import random
+
+import pytest
+
+from directorio import normalizar
+from indice import IndiceIncidencias, ORDENES
+
+PRIORIDADES = ("Baja", "Media", "Alta")
+ESTADOS = ("Abierta", "En proceso", "Cerrada")
+NOMBRES = {1: "Ana", 2: "bruno", 3: "Álvaro", 4: "Zoe"}
+
+def _fila(i, rnd):
+    uid = rnd.choice(list(NOMBRES))
+    return (i, rnd.choice(("Impresora", "correo", "VPN", "Teclado", "éxito")) + f" {i % 7}",
+            rnd.choice(PRIORIDADES), rnd.choice(ESTADOS), NOMBRES[uid], uid)
+
+def _indice(n=60, semilla=1, **kw):
+    rnd = random.Random(semilla)
+    return IndiceIncidencias([_fila(i, rnd) for i in range(1, n + 1)], **kw), rnd
+
+def _esperado(ix, usuario_id=None, prioridad=None, orden="id", descendente=True, texto=None):
+    # lo mismo que consultar(), ordenando de cero las filas vivas
+    pal = normalizar(texto or "").split()
+    vivas = [p for p in ix._pos.values()
+             if (usuario_id is None or ix.usuarios[p] == usuario_id)
+             and (prioridad is None or ix.prioridades[p] == prioridad)
+             and all(w in normalizar(ix.titulos[p]) or w in normalizar(ix.nombres[p]) for w in pal)]
+    res = sorted(sorted(vivas), key=ix._clave(orden))
+    return res[::-1] if descendente else res
+
+def _revisar(ix):
+    for orden in ORDENES:
+        for descendente in (True, False):
+            for filtros in ((None, None), (1, None), (None, "Alta"), (2, "Media")):
+                for texto in (None, "Exito", "impresora 3", "ana"):
+                    ix._ultima = None
+                    assert (ix.consultar(*filtros, orden, descendente, texto)
+                            == _esperado(ix, *filtros, orden, descendente, texto))
+
+def test_orden_inicial():
+    ix, _ = _indice()
+    _revisar(ix)
+
+def test_poner_quitar_mantienen_permutaciones():
+    ix, rnd = _indice()
+    for i in range(61, 101):
+        ix.poner(*_fila(i, rnd))                 # altas
+    for i in rnd.sample(range(1, 101), 20):
+        ix.poner(*_fila(i, rnd))                 # ediciones: la fila vieja queda muerta
+    for i in rnd.sample(range(1, 101), 15):
+        ix.quitar(i)
+    assert len(ix) == len(set(ix._pos)) == 85
+    _revisar(ix)
+
+def test_edicion_reemplaza_la_fila():
+    ix, _ = _indice(5)
+    ix.poner(3, "nuevo título", "Alta", "Cerrada", "Zoe", 4)
+    assert len(ix) == 5 and 3 in ix
+    p = ix._pos[3]
+    assert ix.fila(p) == (3, "nuevo título", "Alta", "Cerrada", "Zoe")
+    assert [ix.ids[q] for q in ix.consultar()].count(3) == 1
+
+def test_poner_fuera_de_la_base_la_quita():
+    ix, _ = _indice(base=(1, None, False))
+    ix.poner(1000, "x", "Alta", "Abierta", "Ana", 1)
+    ix.poner(1000, "x", "Alta", "Abierta", "bruno", 2)     # cambió de dueño: ya no cumple la base
+    assert 1000 not in ix
+    ix.poner(1001, "y", "Baja", "Abierta", "bruno", 2)
+    assert 1001 not in ix
+
+def test_renombrar_usuario_reordena():
+    ix, _ = _indice()
+    ix.renombrar_usuario(4, "aaron")
+    assert all(ix.nombres[p] == "aaron" for p in ix._pos.values() if ix.usuarios[p] == 4)
+    primero = ix.consultar(orden="usuario", descendente=False)[0]
+    assert ix.usuarios[primero] == 4
+    ix.poner(500, "z", "Baja", "Abierta", "aaron", 4)
+    _revisar(ix)
+
+def test_ultima_reutiliza_el_filtro_al_cambiar_de_orden():
+    ix, _ = _indice()
+    ix.consultar(None, "Alta", "id")
+    filtradas = ix._ultima[3]
+    res = ix.consultar(None, "Alta", "titulo", False)
+    assert ix._ultima[3] is filtradas
+    assert res == _esperado(ix, None, "Alta", "titulo", False)
+
+def test_texto_por_titulo_y_usuario_sin_acentos():
+    ix, _ = _indice(5)
+    ix.poner(100, "Falla de IMPRESIÓN", "Alta", "Abierta", "Álvaro", 3)
+    for texto in ("impresion", "  alvaro  falla", "ÁLV"):
+        assert [ix.ids[p] for p in ix.consultar(texto=texto)] == [100]
+    assert ix.consultar(texto="impresion zzz") == []
+    assert ix.consultar(texto="   ") == ix.consultar()
+
+def test_texto_escrito_de_a_poco():
+    # cada tecla parte del resultado anterior si lo refina; si no (borrar), de cero
+    ix, _ = _indice(200, semilla=3)
+    pasos = (("i", 0), ("im", 1), ("imp", 1), ("impresora", 1), ("impresora 4", 1),
+             ("impresora", 0), ("im", 0), ("", 0), ("cor", 1), ("corb", 1))
+    for texto, refina in pasos:
+        previo = ix._ultima
+        res = ix.consultar(2, None, "titulo", True, texto)
+        assert res == _esperado(ix, 2, None, "titulo", True, texto), texto
+        if refina: assert set(ix._ultima[3]) <= set(previo[3]), texto
+
+@pytest.mark.parametrize("cambio", ["poner", "quitar", "renombrar"])
+def test_ultima_se_invalida_con_cambios(cambio):
+    ix, _ = _indice()
+    ix.consultar(None, "Alta", texto="a")
+    if cambio == "poner": ix.poner(999, "nueva", "Alta", "Abierta", "Ana", 1)
+    elif cambio == "quitar": ix.quitar(ix.ids[ix.consultar(None, "Alta")[0]])
+    else: ix.renombrar_usuario(1, "Zacarías")
+    assert ix.consultar(None, "Alta", "usuario", texto="a") == _esperado(ix, None, "Alta", "usuario", texto="a")
+
+def test_cubre():
+    ix, _ = _indice(base=(None, "Alta", False))
+    assert ix.cubre(None, "Alta", False) and ix.cubre(3, "Alta", False)
+    assert not ix.cubre(None, None, False) and not ix.cubre(None, "Alta", True)
+    assert not IndiceIncidencias((), (None, None, False), completo=False).cubre(None, None, False)
@@ -0,0 +1,64 @@
+# instrumentacion.py: una sentencia que falla no debe dejar su t0 en la conexión,
+# y cuenta como error (y como lenta si tardó).
+import logging
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+import instrumentacion as instr
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setitem(instr._bitacora, "activa", True)
+    eng = create_engine(f"sqlite:///{(tmp_path / 'i.db').as_posix()}", connect_args={"timeout": 0.3})
+    instr.instrumentar(eng)
+    with eng.begin() as c:
+        c.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        c.execute(text("INSERT INTO t VALUES (1)"))
+    instr.reiniciar()
+    yield eng
+    instr.desinstrumentar(eng)
+    eng.dispose()
+    instr.reiniciar()
+
+def _hist(sql):
+    return next(s for s in instr.estadisticas()["sentencias"] if s["sql"] == sql)
+
+def test_error_saca_t0_y_cuenta(engine):
+    with engine.connect() as c:
+        for _ in range(3):
+            with pytest.raises(IntegrityError):
+                c.execute(text("INSERT INTO t VALUES (1)"))
+            c.rollback()
+        assert c.connection.info["instr_t0"] == []
+        c.execute(text("SELECT 1"))            # la siguiente se mide con su propio t0
+        assert c.connection.info["instr_t0"] == []
+    h = _hist("INSERT INTO t VALUES (1)")
+    assert (h["llamadas"], h["errores"]) == (3, 3)
+    assert _hist("SELECT 1")["errores"] == 0
+
+def test_bloqueo_lento_va_a_la_bitacora(engine, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(instr, "UMBRAL_LENTO_MS", 100)
+    otra = sqlite3.connect(tmp_path / "i.db")
+    otra.execute("BEGIN EXCLUSIVE")
+    try:
+        with caplog.at_level(logging.WARNING, logger="tickets.sql.lento"), engine.connect() as c:
+            with pytest.raises(OperationalError):
+                c.execute(text("SELECT count(*) FROM t"))
+            assert c.connection.info["instr_t0"] == []
+    finally:
+        otra.rollback(); otra.close()
+    h = _hist("SELECT count(*) FROM t")
+    assert h["errores"] == 1 and h["max_ms"] >= 250
+    assert any("ERROR OperationalError: database is locked" in r.getMessage() for r in caplog.records)
+
+def test_error_antes_de_ejecutar_no_saca_nada(engine):
+    # falla al conectar/compilar: no pasó por before_cursor_execute
+    with engine.connect() as c:
+        c.connection.info["instr_t0"] = [(object(), 0.0)]
+        with pytest.raises(Exception):
+            c.execute(text("SELECT :a"), {"b": 1})
+        assert len(c.connection.info["instr_t0"]) == 1
+        c.connection.info["instr_t0"].clear()
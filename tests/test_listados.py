@@ -0,0 +1,50 @@
+# crud: los listados con archivo=True mezclan calientes y archivadas por id DESC.
+import pytest
+
+import archivo
+import crud
+from models import IncidenciaArchivada
+
+@pytest.fixture
+def incidencias(bd):
+    u = crud.crear_usuario("Ana", "ana@x.com")
+    ids = [crud.crear_incidencia(f"t{i}", "d", "Alta" if i % 2 else "Baja", u.id,
+                                 "Cerrada" if i % 3 == 0 else "Abierta").id for i in range(9)]
+    with bd.begin() as conn:
+        conn.exec_driver_sql("UPDATE incidencias SET cerrado_en = datetime('now', '-1 year') WHERE estado = 'Cerrada'")
+    archivo.archivar(dias=30)
+    archivadas = ids[::3]
+    return u, ids, archivadas
+
+def _paginas(fn, limite, **kw):
+    vistos = []; cursor = None
+    while True:
+        pag = fn(limite=limite, despues_de=cursor, **kw)
+        vistos += pag
+        if len(pag) < limite: return vistos
+        cursor = pag[-1].id
+
+def test_sin_archivo_solo_activas(incidencias):
+    _, ids, archivadas = incidencias
+    assert [i.id for i in crud.listar_incidencias()] == sorted(set(ids) - set(archivadas), reverse=True)
+    assert [f.id for f in crud.incidencias_join_con_usuario()] == sorted(set(ids) - set(archivadas), reverse=True)
+
+@pytest.mark.parametrize("limite", [1, 2, 4, 50])
+def test_listar_incidencias_con_archivo(incidencias, limite):
+    u, ids, archivadas = incidencias
+    res = _paginas(crud.listar_incidencias, limite, archivo=True)
+    assert [i.id for i in res] == sorted(ids, reverse=True)
+    assert {i.id for i in res if isinstance(i, IncidenciaArchivada)} == set(archivadas)
+    assert all(i.usuario.nombre == "Ana" for i in res)      # cargado con la sesión ya cerrada
+
+def test_filtros_con_archivo(incidencias):
+    u, ids, _ = incidencias
+    res = crud.listar_incidencias(u.id, "Alta", archivo=True)
+    assert [i.id for i in res] == [i for n, i in sorted(enumerate(ids), reverse=True) if n % 2]
+
+@pytest.mark.parametrize("limite", [1, 3, 50])
+def test_join_con_archivo(incidencias, limite):
+    _, ids, archivadas = incidencias
+    res = _paginas(crud.incidencias_join_con_usuario, limite, archivo=True)
+    assert [f.id for f in res] == sorted(ids, reverse=True)
+    assert {f.estado for f in res if f.id in archivadas} == {"Cerrada"}
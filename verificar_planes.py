@@ -0,0 +1,171 @@
+# Verifica con EXPLAIN QUERY PLAN que las consultas de crud.py usen índices.
+# Crea una BD temporal con `alembic upgrade head`, ejecuta cada función de crud
+# capturando el SQL emitido (SELECT y también INSERT/UPDATE/DELETE) y falla si
+# alguna recae en un recorrido de tabla (SCAN sin índice), en un índice
+# automático o en un ordenamiento temporal.
+# EXPLAIN QUERY PLAN no muestra las búsquedas de filas hijas que SQLite hace por
+# cada FK al borrar o cambiar un padre (p. ej. eliminar_usuario): por eso se
+# verifica aparte, para cada FK del esquema, el SELECT equivalente sobre la hija.
+#
+#   python verificar_planes.py
+import sys
+import tempfile
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event
+
+import archivo
+import crud
+from db import BASE_DIR, SessionLocal, engine as engine_app
+
+# Recorridos completos aceptados: el listado sin filtros recorre la PK en orden
+# (con LIMIT se detiene en la primera página) y los reportes deben visitar a
+# todos los usuarios.
+RECORRIDOS_PERMITIDOS = {
+    ("incidencias_join_con_usuario", "incidencias"),
+    ("listar_incidencias", "incidencias"),
+    ("listar_incidencias[archivo]", "incidencias"),
+    ("listar_incidencias[archivo]", "incidencias_archivo"),
+    ("incidencias_join_con_usuario[archivo]", "incidencias"),
+    ("incidencias_join_con_usuario[archivo]", "incidencias_archivo"),
+    ("listar_filas_incidencias", "incidencias"),
+    ("listar_filas_incidencias[archivo]", "incidencias"),
+    ("listar_filas_incidencias[archivo]", "incidencias_archivo"),
+    ("listar_filas_indice", "incidencias"),
+    ("listar_filas_indice[archivo]", "incidencias"),
+    ("listar_filas_indice[archivo]", "incidencias_archivo"),
+}
+# Ordenar por relevancia (bm25) siempre requiere ordenar las coincidencias; con el
+# archivo, cada rama de la unión ordena su página (a lo más `limite` filas)
+ORDEN_TEMPORAL_PERMITIDO = {"buscar_incidencias", "buscar_incidencias[prioridad]", "buscar_incidencias[ventana]",
+                            "listar_filas_incidencias[archivo]", "listar_filas_incidencias[usuario+archivo]",
+                            "listar_filas_indice[archivo]", "incidencias_join_con_usuario[archivo]"}
+# Subconsultas de crud._select_filas(archivo=True), crud._select_busqueda y
+# crud.contar_incidencias: recorren una página o un conjunto ya limitado
+SUBCONSULTAS = {"caliente", "archivada", "candidatas", "contadas"}
+SENTENCIAS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+def _consultas(uid, inc_id):
+    # (nombre, llamada); los filtros se combinan como en la UI
+    return [
+        ("listar_usuarios", lambda: crud.listar_usuarios()),
+        ("obtener_usuario", lambda: crud.obtener_usuario(uid)),
+        ("buscar_usuarios_prefijo", lambda: crud.buscar_usuarios_prefijo("Pla")),
+        ("completar_directorio", lambda: (crud.directorio.quitar(uid), crud.completar_directorio([uid]))),
+        ("listar_incidencias", lambda: crud.listar_incidencias(limite=50)),
+        ("listar_incidencias[usuario]", lambda: crud.listar_incidencias(uid, limite=50, despues_de=inc_id + 1)),
+        ("listar_incidencias[prioridad]", lambda: crud.listar_incidencias(prioridad="Alta", limite=50)),
+        ("listar_incidencias[usuario+prioridad]", lambda: crud.listar_incidencias(uid, "Alta", limite=50)),
+        ("listar_incidencias[archivo]", lambda: crud.listar_incidencias(limite=50, archivo=True)),
+        ("listar_incidencias[usuario+archivo]", lambda: crud.listar_incidencias(uid, limite=50, archivo=True)),
+        ("listar_filas_incidencias", lambda: crud.listar_filas_incidencias(limite=50)),
+        ("listar_filas_incidencias[usuario]", lambda: crud.listar_filas_incidencias(uid, limite=50)),
+        ("listar_filas_incidencias[prioridad]", lambda: crud.listar_filas_incidencias(prioridad="Alta", limite=50)),
+        ("listar_filas_incidencias[usuario+prioridad]", lambda: crud.listar_filas_incidencias(uid, "Alta", limite=50)),
+        ("listar_filas_incidencias[archivo]", lambda: crud.listar_filas_incidencias(limite=50, archivo=True)),
+        ("listar_filas_incidencias[usuario+archivo]", lambda: crud.listar_filas_incidencias(uid, limite=50, archivo=True)),
+        ("listar_filas_indice", lambda: crud.listar_filas_indice(limite=50)),
+        ("listar_filas_indice[usuario]", lambda: crud.listar_filas_indice(uid, limite=50)),
+        ("listar_filas_indice[archivo]", lambda: crud.listar_filas_indice(limite=50, archivo=True)),
+        ("contar_incidencias", lambda: crud.contar_incidencias(tope=50)),
+        ("contar_incidencias[usuario]", lambda: crud.contar_incidencias(uid, tope=50)),
+        ("contar_incidencias[usuario+prioridad]", lambda: crud.contar_incidencias(uid, "Alta", tope=50)),
+        ("contar_incidencias[archivo]", lambda: crud.contar_incidencias(archivo=True, tope=50)),
+        ("obtener_incidencia", lambda: crud.obtener_incidencia(inc_id)),
+        ("incidencias_join_con_usuario", lambda: crud.incidencias_join_con_usuario(limite=50)),
+        ("incidencias_join_con_usuario[archivo]", lambda: crud.incidencias_join_con_usuario(limite=50, archivo=True)),
+        ("buscar_incidencias", lambda: crud.buscar_incidencias("t", limite=50)),
+        ("buscar_incidencias[prioridad]", lambda: crud.buscar_incidencias("t", prioridad="Alta", limite=50)),
+        # página a mitad de una ventana anterior: también cuenta la ventana para saber si sigue otra
+        ("buscar_incidencias[ventana]", lambda: crud.buscar_incidencias("t", limite=50, despues_de=(inc_id + 1, -1e9, 0))),
+        ("conteo_incidencias_por_usuario", lambda: crud.conteo_incidencias_por_usuario()),
+        ("conteo_incidencias_por_prioridad", lambda: crud.conteo_incidencias_por_prioridad()),
+        ("cambios_desde", lambda: crud.cambios_desde(0)),
+        ("podar_cambios", lambda: crud.podar_cambios(1)),
+        ("archivar", lambda: archivo.archivar(dias=0)),
+        ("eliminar_usuario", lambda: crud.eliminar_usuario(uid)),
+    ]
+
+def _base_temporal(directorio: Path):
+    url = f"sqlite:///{(directorio / 'planes.db').as_posix()}"
+    cfg = Config(str(BASE_DIR / "alembic.ini"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    command.upgrade(cfg, "head")
+    return create_engine(url, future=True)
+
+def _problemas(conn, nombre, sql, params):
+    malos = []
+    for fila in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params):
+        detalle = fila[-1]
+        if detalle.startswith("SCAN ") and " USING " not in detalle and "VIRTUAL TABLE INDEX" not in detalle:
+            # las variantes con filtro ("nombre[...]") nunca pueden recorrer la tabla
+            tabla = detalle.split()[1]
+            if (nombre, tabla) not in RECORRIDOS_PERMITIDOS and tabla not in SUBCONSULTAS:
+                malos.append(detalle)
+        elif "AUTOMATIC" in detalle:
+            malos.append(detalle)
+        elif "USE TEMP B-TREE" in detalle and nombre not in ORDEN_TEMPORAL_PERMITIDO:
+            malos.append(detalle)
+    return malos
+
+def _fk_hijas(conn) -> list[tuple[str, str, str]]:
+    # Por cada FK (hija.col -> padre), la búsqueda que SQLite hace al borrar el padre
+    fallos = []
+    tablas = [t for (t,) in conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'")]
+    for hija in tablas:
+        for fk in conn.exec_driver_sql(f"PRAGMA foreign_key_list({hija})"):
+            padre, col = fk[2], fk[3]
+            sql = f"SELECT 1 FROM {hija} WHERE {col} = ?"
+            for (*_, detalle) in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", (1,)):
+                if not detalle.startswith("SEARCH"):
+                    fallos.append((f"fk {hija}.{col} -> {padre}", detalle, sql))
+    return fallos
+
+def verificar() -> list[tuple[str, str, str]]:
+    fallos = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _base_temporal(Path(tmp))
+        SessionLocal.configure(bind=engine)
+        try:
+            u = crud.crear_usuario("Planes", "planes@example.com")
+            # cerrada hace un año: archivar emite su INSERT ... SELECT y su DELETE
+            vieja = crud.crear_incidencia("v", "d", "Baja", u.id, "Cerrada")
+            with engine.begin() as conn:
+                conn.exec_driver_sql("UPDATE incidencias SET cerrado_en = datetime('now', '-1 year') WHERE id = ?",
+                                     (vieja.id,))
+            inc = crud.crear_incidencia("t", "d", "Alta", u.id)
+            capturadas = []
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def _capturar(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith(SENTENCIAS):
+                    capturadas.append((statement, parameters[0] if executemany else parameters))
+
+            for nombre, llamada in _consultas(u.id, inc.id):
+                capturadas.clear()
+                try:
+                    llamada()
+                except ValueError:
+                    pass  # p. ej. eliminar_usuario con incidencias: basta con su SELECT
+                sentencias = list(capturadas)
+                with engine.connect() as conn:
+                    for sql, params in sentencias:
+                        for detalle in _problemas(conn, nombre, sql, params):
+                            fallos.append((nombre, detalle, sql))
+            event.remove(engine, "before_cursor_execute", _capturar)
+            with engine.connect() as conn:
+                fallos += _fk_hijas(conn)
+        finally:
+            SessionLocal.configure(bind=engine_app)
+            engine.dispose()
+    return fallos
+
+if __name__ == "__main__":
+    fallos = verificar()
+    for nombre, detalle, sql in fallos:
+        print(f"[{nombre}] {detalle}\n    {' '.join(sql.split())}")
+    print("OK: todas las consultas usan índices." if not fallos else f"{len(fallos)} consulta(s) sin índice.")
+    sys.exit(1 if fallos else 0)